@@ -93,6 +93,17 @@ async function fetchAPI(endpoint) {
   }
 }
 
+/* Initial page data: drivers and standings in one request (predictions are fetched on click, and no progression is charted) */
+
+async function loadBootstrap() {
+  const data = await fetchAPI('/bootstrap?progression=0&predictions=0');
+  if (!data) return false;
+
+  cache.drivers = data.drivers;
+  cache.standings = data.standings;
+  return true;
+}
+
 /* Drivers-html card */
 
 async function loadDriverCards() {
@@ -106,7 +117,11 @@ async function loadDriverCards() {
     return;
   }
 
-  if (loadingState.drivers || cache.drivers) return;
+  if (loadingState.drivers) return;
+  if (cache.drivers) {
+    renderDriverCards(cache.drivers);
+    return;
+  }
 
   loadingState.drivers = true;
   showLoading('driver-segment');
@@ -164,6 +179,11 @@ async function loadStandings() {
   const tableBody = document.getElementById('all-rows');
   if (!tableBody || loadingState.standings) return;
 
+  if (cache.standings) {
+    renderStandings(cache.standings);
+    return;
+  }
+
   loadingState.standings = true;
 
   const standings = await fetchAPI('/standings');
@@ -652,6 +672,9 @@ document.addEventListener('DOMContentLoaded', async () => {
   addComparisonFeature();
 
   try {
+    // One request for everything below; the individual endpoints remain as fallback
+    await loadBootstrap();
+
     // load standings from backend
     await loadStandings();
     
@@ -762,8 +785,9 @@ async function fetchPredictions() {
         predictStatus.textContent = 'Running ML model...';
         predictStatus.className = 'text-blue-500 text-sm mt-4';
 
-        // Fetch predictions from API
-        const response = await fetch('http://127.0.0.1:5000/api/predict-podium');
+        // Revalidate on every click so a newly activated model shows up; the
+        // ETag makes unchanged predictions a 304
+        const response = await fetch('http://127.0.0.1:5000/api/predict-podium', { cache: 'no-cache' });
         
         if (!response.ok) {
             throw new Error('Failed to fetch predictions');
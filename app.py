@@ -1,29 +1,134 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, redirect, Response, stream_with_context
 from flask_cors import CORS
-import pandas as pd
 from datetime import datetime
-import requests
-from services.DataProcessor import DataProcessor
-from services.RacePredictionService import RacePredictionService
+import importlib
+import os
+import threading
+from services.LazyService import LazyService
+from services.Metrics import metrics, instrument_app, recent_profiles
+from services.ResponseCache import ResponseCache
+from services.JsonProvider import FastJSONProvider
+from services.DashboardService import DashboardService, DEFAULT_PROGRESSION_DRIVERS, MAX_PROGRESSION_DRIVERS
+from services.HistoryService import HISTORY_MAX_AGE
+
+# Upper bound on simulations a single request may ask for
+MAX_SIMULATIONS = 200000
+
+# Upper bounds on one /api/predict-podium/batch request
+MAX_SCENARIOS = 50
+MAX_SCENARIO_DRIVERS = 40
+
+# Upper bound on drivers in one /api/compare/matrix request
+MAX_COMPARE_DRIVERS = 40
+
+# How long browsers may reuse a podium prediction (features are re-checked about this often)
+PREDICTION_MAX_AGE = 30
+
+# 'eager' (default) builds every service at import. 'background' returns from import
+# right away and builds them (pandas, NumPy, scikit-learn included) in a warm-up
+# thread; a request that needs a service first builds it on the spot.
+STARTUP_MODE = os.environ.get('F1_STARTUP', 'eager')
 
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
+def _service(module, factory):
+    """A service from services.<module>, imported and built on first use"""
+    return LazyService(module, lambda: factory(importlib.import_module(f'services.{module}')))
+
 # Initialize services
-data_processor = DataProcessor()
-ml_predictor = RacePredictionService()
+data_processor = _service('DataProcessor', lambda m: m.DataProcessor())
+feature_engineer = _service('FeatureEngineer', lambda m: m.FeatureEngineer(data_processor.get()))
+ml_predictor = _service('RacePredictionService', lambda m: m.RacePredictionService(feature_source=feature_engineer.get()))
+championship_simulator = _service('ChampionshipSimulator', lambda m: m.ChampionshipSimulator(data_processor.get(), ml_predictor.get()))
+session_store = _service('SessionStore', lambda m: m.SessionStore())
+history_service = _service('HistoryService', lambda m: m.HistoryService(data_processor.results_store))
+live_timing = _service('LiveTiming', lambda m: m.LiveTimingServer(session_store.get(), lock_dir=data_processor.cache.lock_dir))
+refresh_scheduler = _service('RefreshScheduler', lambda m: m.RefreshScheduler(data_processor.get(), feature_engineer.get(), ml_predictor.get()))
+dashboard_service = DashboardService(data_processor, ml_predictor)
+response_cache = ResponseCache()
+
+SERVICES = [data_processor, feature_engineer, ml_predictor, championship_simulator, session_store, history_service, live_timing, refresh_scheduler]
+warm_up_state = {'started': None, 'finished': None, 'error': None}
+
+def warm_up():
+    """Build every service that is not built yet"""
+    warm_up_state['started'] = warm_up_state['started'] or datetime.now().isoformat()
+    try:
+        for service in SERVICES:
+            service.get()
+        warm_up_state['finished'] = datetime.now().isoformat()
+    except Exception as e:
+        warm_up_state['error'] = str(e)
+        print(f"Warm-up Error: {e}")
+
+def start_background_services():
+    """
+    Warm-up (background mode), the calendar-driven refresh scheduler
+    (F1_REFRESH_SCHEDULER=0 disables) and the live timing stream (F1_LIVE_TIMING=0 disables)
+    """
+    def run():
+        warm_up()
+        if warm_up_state['error']:
+            return
+        if os.environ.get('F1_REFRESH_SCHEDULER', '1') != '0':
+            refresh_scheduler.start()
+        if os.environ.get('F1_LIVE_TIMING', '1') != '0':
+            live_timing.start()
+    
+    if STARTUP_MODE == 'background':
+        threading.Thread(target=run, name='warm-up', daemon=True).start()
+    else:
+        run()
+
+# Simulation pool workers (forkserver/spawn) re-import the main script as __mp_main__
+# when it is `python app.py`; they only need the module, not the services or threads
+if __name__ != '__mp_main__':
+    if STARTUP_MODE != 'background':
+        warm_up()
+    
+    # A preloading gunicorn master must not start threads before forking; gunicorn.conf.py starts them per worker
+    if os.environ.get('F1_BACKGROUND_START') != 'post_fork':
+        start_background_services()
+
+instrument_app(app)
+response_cache.init_app(app)
+
+def _cache_hit_ratios():
+    if not (data_processor.loaded and ml_predictor.loaded):
+        return {}
+    upstream = data_processor.get_cache_stats()
+    predictions = ml_predictor.cache_stats
+    lookups = predictions['hits'] + predictions['misses']
+    return {
+        'upstream': upstream['hit_ratio'],
+        'predictions': round(predictions['hits'] / lookups, 4) if lookups else 0.0
+    }
+
+def _circuit_open():
+    if not data_processor.loaded:
+        return {}
+    return int(data_processor.get_upstream_status()['state'] != 'closed')
+
+metrics.gauge('f1_cache_hit_ratio', 'Share of lookups answered from cache', ['cache'], fn=_cache_hit_ratios)
+metrics.gauge('f1_upstream_circuit_open', '1 while the Ergast circuit breaker is open', fn=_circuit_open)
+metrics.gauge('f1_live_connections', 'Open live timing connections', fn=lambda: live_timing.get_status()['connections'] if live_timing.loaded else {})
 
 @app.route('/api/drivers', methods=['GET'])
 def get_drivers():
     """Fetch all F1 drivers with their details"""
     try:
-        drivers = data_processor.get_drivers()
-        return jsonify({
-            'success': True,
-            'data': drivers,
-            'count': len(drivers)
-        })
+        def build():
+            drivers = data_processor.get_drivers()
+            return {
+                'success': True,
+                'data': drivers,
+                'count': len(drivers)
+            }
+        
+        return response_cache.respond('drivers', build, lambda: data_processor.get_data_version('drivers'))
     except Exception as e:
         return jsonify({
             'success': False,
@@ -35,12 +140,44 @@ def get_standings():
     """Fetch current driver standings"""
     try:
         year = request.args.get('year', datetime.now().year)
-        standings = data_processor.get_driver_standings(year)
+        
+        def build():
+            return {
+                'success': True,
+                'data': data_processor.get_driver_standings(year),
+                'year': year
+            }
+        
+        return response_cache.respond(f'standings:{year}', build, lambda: data_processor.get_data_version('standings', year))
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': standings,
-            'year': year
-        })
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """Drivers, standings, predictions (?predictions=0 leaves them out) and top-N progression for the initial page load in one response"""
+    try:
+        year = int(request.args.get('year', datetime.now().year))
+        progression = max(0, min(int(request.args.get('progression', DEFAULT_PROGRESSION_DRIVERS)), MAX_PROGRESSION_DRIVERS))
+        predictions = request.args.get('predictions') not in ('0', 'false')
+        
+        def build():
+            return {
+                'success': True,
+                'data': dashboard_service.get_bootstrap(year, progression, predictions)
+            }
+        
+        return response_cache.respond(
+            f'bootstrap:{year}:{progression}:{int(predictions)}', build,
+            lambda: dashboard_service.get_data_version(year, progression, predictions)
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -120,30 +257,439 @@ def get_points_progression(driver_id):
             'error': str(e)
         }), 500
 
+@app.route('/api/points-progression', methods=['GET'])
+def get_bulk_points_progression():
+    """Cumulative points for several drivers (?drivers=a,b,c) or the whole grid (?drivers=all)"""
+    try:
+        year = int(request.args.get('year', datetime.now().year))
+        drivers = request.args.get('drivers', 'all')
+        driver_ids = 'all' if drivers == 'all' else [d for d in drivers.split(',') if d]
+        
+        return jsonify({
+            'success': True,
+            'data': data_processor.get_bulk_progression(driver_ids, year)
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/compare/matrix', methods=['POST'])
+def compare_driver_matrix():
+    """Head-to-head points/wins/avgPoints differences for N drivers ({"drivers": [...] or "all"})"""
+    try:
+        data = request.get_json(silent=True) or {}
+        driver_ids = data.get('drivers')
+        
+        if driver_ids != 'all' and (
+            not isinstance(driver_ids, list) or not 2 <= len(driver_ids) <= MAX_COMPARE_DRIVERS
+            or not all(isinstance(d, str) and d for d in driver_ids)
+        ):
+            return jsonify({
+                'success': False,
+                'error': f'drivers must be "all" or a list of 2 to {MAX_COMPARE_DRIVERS} driver IDs'
+            }), 400
+        
+        try:
+            year = int(data['year']) if data.get('year') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'year must be an integer'
+            }), 400
+        
+        # A ValueError past validation means valid but unknown driver IDs
+        return jsonify({
+            'success': True,
+            'data': data_processor.compare_many(driver_ids, year)
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/predict-podium', methods=['GET'])
 def predict_podium():
     """ML-based prediction for next race podium"""
     try:
-        predictions = ml_predictor.predict_next_race_podium()
+        def build():
+            predictions = ml_predictor.predict_next_race_podium()
+            return {
+                'success': True,
+                'data': predictions,
+                'model': 'Random Forest Classifier',
+                'modelVersion': ml_predictor.metadata.get('version'),
+                'featuresVersion': ml_predictor.features_version,
+                'features_used': ['avg_points_per_race', 'recent_form', 'team_performance', 'wins', 'podiums']
+            }
+        
+        return response_cache.respond('predict-podium', build, lambda: (ml_predictor.get_data_version(), PREDICTION_MAX_AGE))
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _scenarios_error(scenarios):
+    """What is wrong with a batch request's scenarios, or None"""
+    if len(scenarios) > MAX_SCENARIOS:
+        return f'At most {MAX_SCENARIOS} scenarios per request'
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            return f'scenarios[{i}] must be an object'
+        drivers = scenario.get('drivers')
+        overrides = scenario.get('overrides', {})
+        if drivers is not None:
+            if not isinstance(drivers, list) or not drivers or not all(isinstance(d, dict) for d in drivers):
+                return f'scenarios[{i}].drivers must be a non-empty list of objects'
+            if len(drivers) > MAX_SCENARIO_DRIVERS:
+                return f'At most {MAX_SCENARIO_DRIVERS} drivers per scenario'
+        if not isinstance(overrides, dict) or not all(isinstance(o, dict) for o in overrides.values()):
+            return f'scenarios[{i}].overrides must map driver names to objects'
+    return None
+
+@app.route('/api/predict-podium/batch', methods=['POST'])
+def predict_podium_batch():
+    """Score several what-if scenarios or upcoming races in one call"""
+    try:
+        data = request.get_json(silent=True) or {}
+        scenarios = data.get('scenarios')
+        
+        if not isinstance(scenarios, list) or not scenarios:
+            return jsonify({
+                'success': False,
+                'error': 'A non-empty scenarios list is required'
+            }), 400
+        
+        error = _scenarios_error(scenarios)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        results = ml_predictor.predict_scenarios(scenarios)
+        return jsonify({
+            'success': True,
+            'data': results,
+            'modelVersion': ml_predictor.metadata.get('version')
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/championship-odds', methods=['GET'])
+def get_championship_odds():
+    """Monte Carlo title probabilities; ?stream=1 sends progressive estimates as Server-Sent Events"""
+    try:
+        year = int(request.args.get('year', datetime.now().year))
+        from services.ChampionshipSimulator import DEFAULT_SIMULATIONS
+        simulations = min(int(request.args.get('simulations', DEFAULT_SIMULATIONS)), MAX_SIMULATIONS)
+        source = request.args.get('source', 'results')
+        
+        if simulations <= 0 or source not in ('results', 'model'):
+            return jsonify({
+                'success': False,
+                'error': 'simulations must be positive and source one of: results, model'
+            }), 400
+        
+        if request.args.get('stream') in ('1', 'true'):
+            def events():
+                for estimate in championship_simulator.stream_odds(year, simulations, source):
+                    yield f"data: {app.json.dumps(estimate)}\n\n"
+            return Response(stream_with_context(events()), mimetype='text/event-stream')
+        
+        return jsonify({
+            'success': True,
+            'data': championship_simulator.get_odds(year, simulations, source)
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/sessions', methods=['GET'])
+def list_sessions():
+    """Sessions available in the local FastF1 cache"""
+    return jsonify({
+        'success': True,
+        'data': session_store.list_sessions()
+    })
+
+@app.route('/api/sessions/<int:year>/<event>/<session>/<table>', methods=['GET'])
+def get_session_data(year, event, session, table):
+    """Lap times, stints (per driver) or weather for a cached session"""
+    try:
+        driver = request.args.get('driver')
+        
+        if table == 'weather':
+            data = session_store.get_weather(year, event, session)
+        elif table in ('laps', 'stints'):
+            if not driver:
+                return jsonify({
+                    'success': False,
+                    'error': 'A driver number or code is required'
+                }), 400
+            if table == 'laps':
+                data = session_store.get_lap_times(year, event, session, driver)
+            else:
+                data = session_store.get_stints(year, event, session, driver)
+        else:
+            return jsonify({
+                'success': False,
+                'error': f'Unknown session data: {table}'
+            }), 404
+        
         return jsonify({
             'success': True,
-            'data': predictions,
-            'model': 'Random Forest Classifier',
-            'features_used': ['avg_points_per_race', 'recent_form', 'team_performance', 'wins', 'podiums']
+            'data': data,
+            'driver': driver
         })
+    except (FileNotFoundError, KeyError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/live', methods=['GET'])
+def get_live_status():
+    """Live timing server state and the replays currently streaming"""
+    return jsonify({
+        'success': True,
+        'data': live_timing.get_status()
+    })
+
+def _hostname(host):
+    """Host header without its port; IPv6 literals keep their brackets ('[::1]:5000' -> '[::1]')"""
+    if host.startswith('['):
+        return host[:host.index(']') + 1] if ']' in host else host
+    return host.rpartition(':')[0] or host
+
+@app.route('/api/live/<int:year>/<event>/<session>', methods=['GET'])
+def live_stream(year, event, session):
+    """
+    Redirects to the Server-Sent Events replay of a cached session, served by the
+    live timing server on its own port (?speed=1-100, ?from=<session seconds>)
+    """
+    try:
+        # The live timing server builds the timeline; this only checks the session exists
+        session_store.get_manifest(year, event, session)
+    except (FileNotFoundError, KeyError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    
+    base_url = os.environ.get('F1_LIVE_PUBLIC_URL') or f"{request.scheme}://{_hostname(request.host)}:{live_timing.port}"
+    query = f"?{request.query_string.decode()}" if request.query_string else ''
+    return redirect(base_url.rstrip('/') + live_timing.stream_path(year, event, session) + query, code=307)
+
+@app.route('/api/history', methods=['GET'])
+def get_history_coverage():
+    """Seasons loaded by the history backfill (python -m services.HistoryBackfill), per resource"""
+    return jsonify({
+        'success': True,
+        'data': history_service.get_coverage()
+    })
+
+def _history_freshness():
+    return history_service.get_data_version(), HISTORY_MAX_AGE
+
+@app.route('/api/history/drivers/<driver_id>', methods=['GET'])
+def get_driver_career(driver_id):
+    """Career totals and per-season stats for one driver"""
+    try:
+        def build():
+            return {
+                'success': True,
+                'data': history_service.get_career(driver_id)
+            }
+        
+        return response_cache.respond(f'history:career:{driver_id}', build, _history_freshness)
+    except KeyError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/history/seasons', methods=['GET'])
+def compare_seasons():
+    """Season-over-season stats for drivers (?drivers=a,b&from=2010&to=2020)"""
+    try:
+        driver_ids = [d for d in request.args.get('drivers', '').split(',') if d]
+        first_year = request.args.get('from', type=int)
+        last_year = request.args.get('to', type=int)
+        if not driver_ids:
+            return jsonify({
+                'success': False,
+                'error': 'At least one driver is required'
+            }), 400
+        
+        def build():
+            return {
+                'success': True,
+                'data': history_service.compare_seasons(driver_ids, first_year, last_year)
+            }
+        
+        key = f"history:seasons:{','.join(driver_ids)}:{first_year}:{last_year}"
+        return response_cache.respond(key, build, _history_freshness)
+    except KeyError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/history/standings/<int:year>', methods=['GET'])
+def get_historical_standings(year):
+    """Driver standings of a season after any round (?round=, default the last)"""
+    try:
+        round_ = request.args.get('round', type=int)
+        
+        def build():
+            return {
+                'success': True,
+                'data': history_service.get_standings(year, round_)
+            }
+        
+        return response_cache.respond(f'history:standings:{year}:{round_}', build, _history_freshness)
+    except KeyError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/model', methods=['GET'])
+def get_model_info():
+    """Active prediction model version and its training metadata"""
+    return jsonify({
+        'success': True,
+        'data': ml_predictor.get_model_info()
+    })
+
+@app.route('/api/model/activate', methods=['POST'])
+def activate_model():
+    """Hot-swap to another persisted model version without restarting"""
+    try:
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        
+        if version is not None and not isinstance(version, str):
+            return jsonify({
+                'success': False,
+                'error': 'version must be a string'
+            }), 400
+        
+        if version:
+            metadata = ml_predictor.activate_model(version)
+        else:
+            # No version given: reload whatever CURRENT points at (e.g. after running the trainer)
+            metadata = ml_predictor.load_model()
+        return jsonify({
+            'success': True,
+            'data': metadata
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        from services.ModelRegistry import InvalidModel
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400 if isinstance(e, InvalidModel) else 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text-format metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/debug/profiles', methods=['GET'])
+def get_profiles():
+    """Recent sampling-profiler results (requests made with ?profile=1 while F1_PROFILING=1)"""
+    return jsonify({
+        'success': True,
+        'data': list(recent_profiles)
+    })
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness():
+    """Liveness: the process is up and serving; never loads or touches a service"""
+    return jsonify({
+        'status': 'alive',
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """Readiness: 200 once every service is built, 503 while warming up (or if warm-up failed)"""
+    services = {service._name: service.load_seconds for service in SERVICES}
+    ready = all(service.loaded for service in SERVICES)
+    return jsonify({
+        'status': 'ready' if ready else 'starting',
+        'startupMode': STARTUP_MODE,
+        'warmUp': warm_up_state,
+        'serviceLoadSeconds': services
+    }), 200 if ready else 503
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint; services not built yet report null (building them is left to warm-up)"""
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'cache': data_processor.get_cache_stats() if data_processor.loaded else None,
+        'responses': response_cache.get_stats(),
+        'upstream': data_processor.get_upstream_status() if data_processor.loaded else None,
+        'scheduler': refresh_scheduler.get_status() if refresh_scheduler.loaded else None,
+        'liveTiming': live_timing.get_status() if live_timing.loaded else None
     })
 
 if __name__ == '__main__':
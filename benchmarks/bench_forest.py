@@ -0,0 +1,59 @@
+# benchmarks/bench_forest.py
+"""
+Compiled NumPy forest vs sklearn predict_proba: parity and latency.
+
+Usage: python -m benchmarks.bench_forest [--version VERSION] [--repeat N]
+Exits non-zero if the compiled forest disagrees with sklearn.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from services.ForestCompiler import PARITY_TOLERANCE, check_parity
+from services.ModelRegistry import ModelRegistry
+
+
+def time_call(fn, repeat):
+    """Median wall time of fn() in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--version', help='model version (default: active)')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if registry.current_version() is None:
+        from services.ModelTrainer import ModelTrainer
+        ModelTrainer(registry).train_and_save()
+
+    model, scaler, metadata = registry.load(args.version)
+    compiled, _ = registry.load_compiled(args.version)
+    rng = np.random.default_rng(7)
+
+    # Parity on a wide spread around the training distribution
+    sample = scaler.mean_ + scaler.scale_ * rng.standard_normal((50000, len(scaler.mean_)))
+    error = check_parity(compiled, model, scaler, sample)
+    print(f"model {metadata['version']}: {compiled.n_trees} trees, depth {compiled.max_depth}, max |Δp| = {error:.3g}")
+
+    print(f"{'rows':>6} {'sklearn µs':>12} {'numpy µs':>10} {'speedup':>8}")
+    for rows in (1, 10, 100, 1000):
+        X = sample[:rows]
+        sklearn_us = time_call(lambda: model.predict_proba((X - scaler.mean_) / scaler.scale_), max(args.repeat // 10, 5))
+        numpy_us = time_call(lambda: compiled.predict_proba(X), args.repeat)
+        print(f"{rows:>6} {sklearn_us:>12.1f} {numpy_us:>10.1f} {sklearn_us / numpy_us:>7.1f}x")
+
+    return 0 if error <= PARITY_TOLERANCE else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# benchmarks/bench_live.py
+"""
+Load test of the live timing stream with many concurrent subscribers.
+
+Runs services.LiveTiming in a subprocess (replaying the cached FastF1 session
+at --speed), opens --clients SSE connections from one asyncio loop, keeps them
+for --duration seconds and reports server threads, memory per connection,
+the slowest fan-out of one tick to every subscriber, and whether every
+client received the same bytes. Results are written as JSON.
+
+Usage:
+    python -m benchmarks.bench_live [--clients 2000] [--speed 20] [--duration 20]
+    python -m benchmarks.bench_live --compare benchmarks/results/live-<baseline>.json
+Exits non-zero if --compare finds a regression beyond --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+
+from benchmarks.load_test import REPO_ROOT, RESULTS_DIR, STARTUP_TIMEOUT, free_port, git_commit
+
+DEFAULT_SESSION = (2023, '2023-09-03_Italian_Grand_Prix', '2023-09-03_Race')
+
+SERVER_SCRIPT = (
+    "import sys, time; from services.SessionStore import SessionStore; "
+    "from services.LiveTiming import LiveTimingServer; "
+    "server = LiveTimingServer(SessionStore(), lock_dir=sys.argv[2], host='127.0.0.1', port=int(sys.argv[1])).start(); "
+    "time.sleep(10 ** 9)"
+)
+
+
+def process_stats(pid):
+    with open(f'/proc/{pid}/status') as f:
+        fields = dict(line.split(':', 1) for line in f)
+    return {'rssMb': round(int(fields['VmRSS'].split()[0]) / 1024, 1), 'threads': int(fields['Threads'])}
+
+
+async def subscriber(port, path, received, errors):
+    """One idle SSE client: counts the bytes it is sent until cancelled"""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n'.encode())
+        index = len(received)
+        received.append(0)
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            received[index] += len(chunk)
+    except OSError as e:
+        errors.append(type(e).__name__)
+
+
+async def drive(args, port, path, pid):
+    received, errors, tasks = [], [], []
+    status_url = f'http://127.0.0.1:{port}/live/status'
+    before = process_stats(pid)
+
+    start = time.perf_counter()
+    for _ in range(args.clients):
+        tasks.append(asyncio.create_task(subscriber(port, path, received, errors)))
+        if len(tasks) % 200 == 0:
+            await asyncio.sleep(0.05)
+    while len(received) + len(errors) < args.clients and time.perf_counter() - start < STARTUP_TIMEOUT:
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - start
+    connected = process_stats(pid)
+
+    await asyncio.sleep(args.duration)
+    status = requests.get(status_url, timeout=10).json()['data']
+    during = process_stats(pid)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    channel = status['channels'][0] if status['channels'] else {}
+    counts = np.array(received or [0])
+    return {
+        'clients': args.clients,
+        'connected': status['connections'],
+        'errors': len(errors),
+        'connectSeconds': round(connect_seconds, 2),
+        'serverThreads': during['threads'],
+        'serverRssMb': {'idle': before['rssMb'], 'connected': connected['rssMb'], 'streaming': during['rssMb']},
+        'kbPerConnection': round((connected['rssMb'] - before['rssMb']) * 1024 / max(args.clients, 1), 2),
+        'eventsSent': channel.get('eventsSent', 0),
+        'maxBroadcastMs': channel.get('broadcastMs', {}).get('max'),
+        'bytesPerClient': {'min': int(counts.min()), 'median': int(np.median(counts)), 'max': int(counts.max())}
+    }
+
+
+def benchmark(args):
+    # Every connection is a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < args.clients + 100:
+        print(f"! open-file limit {hard} is below --clients {args.clients}")
+
+    port = free_port()
+    lock_dir = tempfile.mkdtemp(prefix='f1-live-')
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT, str(port), lock_dir],
+        cwd=REPO_ROOT, env=dict(os.environ, PYTHONPATH=REPO_ROOT), preexec_fn=lambda: resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    )
+    try:
+        deadline = time.perf_counter() + STARTUP_TIMEOUT
+        while True:
+            try:
+                requests.get(f'http://127.0.0.1:{port}/live/status', timeout=1)
+                break
+            except requests.ConnectionError:
+                if process.poll() is not None or time.perf_counter() > deadline:
+                    raise RuntimeError("Live timing server did not start")
+                time.sleep(0.1)
+
+        year, event, session = DEFAULT_SESSION
+        path = f'/live/{year}/{event}/{session}?speed={args.speed}'
+        result = asyncio.run(drive(args, port, path, process.pid))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'settings': {'clients': args.clients, 'speed': args.speed, 'duration': args.duration}
+        },
+        'live': result
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of fan-out time or per-connection memory beyond `tolerance` (relative)"""
+    now, before = current['live'], baseline.get('live', {})
+    regressions = []
+    for key in ('maxBroadcastMs', 'kbPerConnection'):
+        if before.get(key) and now[key] is not None and now[key] > before[key] * (1 + tolerance):
+            regressions.append(f"{key} {before[key]} -> {now[key]}")
+    if now['errors'] > before.get('errors', 0):
+        regressions.append(f"errors {before.get('errors', 0)} -> {now['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--speed', type=float, default=20.0, help='replay speed (1-100)')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds to stream once connected')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/live-<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    result = benchmark(args)
+    print(json.dumps(result['live'], indent=2))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"live-{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('settings') != result['meta']['settings']:
+            print("! baseline was run with different settings; numbers are not directly comparable")
+        regressions = compare(result, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ regression: {message}")
+        if regressions:
+            return 1
+        print(f"✓ no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# benchmarks/bench_serialization.py
+"""
+CPU and allocation cost of building and serializing the hottest JSON routes.
+
+Imports app.py in this process against the local Ergast stand-in (upstream
+data already cached) and requests /api/standings and /api/driver/<id>
+through the Flask test client in three configurations:
+  baseline  records rebuilt from the upstream payload on every request, stdlib encoder
+  stdlib    records parsed once per upstream payload, stdlib encoder
+  orjson    records parsed once per upstream payload, orjson encoder
+The response cache is cleared before every /api/standings request, so each
+one builds and serializes its body. Reports CPU time per request, the
+tracemalloc peak per request, gen-0 garbage collections per 1000 requests
+and the body size; results are written as JSON.
+
+Usage:
+    python -m benchmarks.bench_serialization [--requests 2000]
+    python -m benchmarks.bench_serialization --compare benchmarks/results/serialization-<baseline>.json
+Exits non-zero if --compare finds a regression beyond --tolerance.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.fake_ergast import FakeErgast
+from benchmarks.load_test import RESULTS_DIR, git_commit
+
+CONFIGS = ['baseline', 'stdlib', 'orjson']
+
+
+def measure(client, path, before_request, requests):
+    """(cpu µs, wall p50 ms, gen-0 collections per 1000) over `requests` calls"""
+    walls = []
+    collections = gc.get_stats()[0]['collections']
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        before_request()
+        start = time.perf_counter()
+        response = client.get(path)
+        walls.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} answered {response.status_code}")
+    cpu = time.process_time() - cpu_start
+    collections = gc.get_stats()[0]['collections'] - collections
+    return cpu / requests * 1e6, float(np.median(walls)) * 1000, collections * 1000 / requests
+
+
+def allocation_peak(client, path, before_request, requests):
+    """Median tracemalloc peak (KB) of one request"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            before_request()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            client.get(path)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return float(np.median(peaks)) / 1024
+
+
+def configure(app, config):
+    """Switch the running app to one configuration"""
+    data_processor = app.data_processor.get()
+    if config == 'baseline':
+        data_processor._parse_once = lambda url, data, parse: parse(data)
+    else:
+        data_processor.__dict__.pop('_parse_once', None)
+    app.app.json.encoder = 'stdlib' if config in ('baseline', 'stdlib') else 'orjson'
+
+
+def benchmark(args):
+    fake = FakeErgast(latency=0.0, jitter=0.0).start()
+    workdir = tempfile.mkdtemp(prefix='f1-serialization-')
+    os.environ.update(
+        ERGAST_BASE_URL=fake.base_url,
+        F1_CACHE_DIR=os.path.join(workdir, 'ergast'),
+        F1_MODEL_DIR=os.path.join(workdir, 'models'),
+        F1_STARTUP='eager',
+        F1_REFRESH_SCHEDULER='0',
+        F1_LIVE_TIMING='0',
+    )
+    try:
+        import app
+
+        client = app.app.test_client()
+        # Fills the upstream cache and the results store before anything is measured
+        driver_id = client.get('/api/standings').get_json()['data'][0]['driverId']
+        client.get(f'/api/driver/{driver_id}')
+        data_processor = app.data_processor.get()
+        data_processor.ingest_season(data_processor.current_year)
+
+        endpoints = {
+            '/api/standings': lambda: app.response_cache._entries.clear(),
+            f'/api/driver/{driver_id}': lambda: None,
+        }
+        results = {}
+        for config in CONFIGS:
+            configure(app, config)
+            results[config] = {}
+            for path, before_request in endpoints.items():
+                name = path.replace(driver_id, '<id>')
+                for _ in range(args.warmup):
+                    before_request()
+                    client.get(path)
+                cpu_us, wall_ms, collections = measure(client, path, before_request, args.requests)
+                results[config][name] = {
+                    'cpuUsPerRequest': round(cpu_us, 1),
+                    'p50Ms': round(wall_ms, 3),
+                    'peakKbPerRequest': round(allocation_peak(client, path, before_request, args.allocation_requests), 1),
+                    'gen0CollectionsPer1000': round(collections, 1),
+                    'bodyBytes': len(client.get(path).data)
+                }
+                print_row(config, name, results[config][name])
+    finally:
+        fake.stop()
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'settings': {'requests': args.requests, 'allocationRequests': args.allocation_requests}
+        },
+        'configs': results
+    }
+
+
+def print_row(config, endpoint, r):
+    if config is None:
+        print(f"{'config':<10} {'endpoint':<18} {'cpu µs':>8} {'p50 ms':>8} {'peak KB':>8} {'gen0/1k':>8} {'bytes':>7}")
+        return
+    print(f"{config:<10} {endpoint:<18} {r['cpuUsPerRequest']:>8.1f} {r['p50Ms']:>8.3f} "
+          f"{r['peakKbPerRequest']:>8.1f} {r['gen0CollectionsPer1000']:>8.1f} {r['bodyBytes']:>7}")
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of CPU time or allocation peak beyond `tolerance` (relative); returns a list of messages"""
+    regressions = []
+    for config, endpoints in current['configs'].items():
+        for endpoint, now in endpoints.items():
+            before = baseline.get('configs', {}).get(config, {}).get(endpoint)
+            if before is None:
+                continue
+            for key in ('cpuUsPerRequest', 'peakKbPerRequest'):
+                if now[key] > before[key] * (1 + tolerance):
+                    regressions.append(f"{config} {endpoint}: {key} {before[key]} -> {now[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='timed requests per endpoint and configuration')
+    parser.add_argument('--allocation-requests', type=int, default=200, help='requests traced for the allocation peak')
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--output', help='results file (default: benchmarks/results/serialization-<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    print_row(None, None, None)
+    result = benchmark(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"serialization-{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('settings') != result['meta']['settings']:
+            print("! baseline was run with different settings; numbers are not directly comparable")
+        regressions = compare(result, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ regression: {message}")
+        if regressions:
+            return 1
+        print(f"✓ no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start benchmark of app.py in each startup mode.
+
+Runs `import app` in fresh subprocesses (F1_STARTUP=eager and background)
+against the local Ergast stand-in with an already-trained model, and reports
+how long the import takes, how long until /api/health/ready answers 200, the
+first /api/standings request after that, resident memory at ready, and which
+heavy libraries the import itself pulled in. Results are medians over
+--repeat runs, written as JSON.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5]
+    python -m benchmarks.bench_startup --compare benchmarks/results/startup-<baseline>.json
+Exits non-zero if --compare finds a regression beyond --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.fake_ergast import FakeErgast
+from benchmarks.load_test import REPO_ROOT, RESULTS_DIR, STARTUP_TIMEOUT, git_commit
+
+MODES = ['eager', 'background']
+HEAVY_MODULES = ['pandas', 'numpy', 'sklearn', 'joblib']
+
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+heavy = [name for name in sys.argv[1].split(',') if name in sys.modules]
+
+client = app.app.test_client()
+while client.get('/api/health/ready').status_code != 200:
+    if time.perf_counter() - start > float(sys.argv[2]):
+        sys.exit('not ready in time: ' + json.dumps(client.get('/api/health/ready').get_json()))
+    time.sleep(0.005)
+ready = time.perf_counter() - start
+
+first = time.perf_counter()
+status = client.get('/api/standings').status_code
+first_ms = (time.perf_counter() - first) * 1000
+
+with open('/proc/self/status') as f:
+    fields = dict(line.split(':', 1) for line in f)
+print(json.dumps({
+    'importSeconds': imported, 'readySeconds': ready, 'firstRequestMs': first_ms, 'firstRequestStatus': status,
+    'rssMb': int(fields['VmRSS'].split()[0]) / 1024, 'heavyModulesAtImport': heavy,
+    'serviceLoadSeconds': client.get('/api/health/ready').get_json()['serviceLoadSeconds']
+}))
+"""
+
+
+def run_once(mode, ergast_url, workdir):
+    env = dict(
+        os.environ,
+        F1_STARTUP=mode,
+        F1_REFRESH_SCHEDULER='0',
+        F1_LIVE_TIMING='0',
+        ERGAST_BASE_URL=ergast_url,
+        F1_CACHE_DIR=os.path.join(workdir, 'ergast'),
+        F1_MODEL_DIR=os.path.join(workdir, 'models'),
+        PYTHONPATH=REPO_ROOT,
+    )
+    env.pop('F1_BACKGROUND_START', None)
+    completed = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT, ','.join(HEAVY_MODULES), str(STARTUP_TIMEOUT)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=STARTUP_TIMEOUT * 2
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} startup failed:\n{completed.stderr[-2000:]}")
+    # The result is the last line; the app prints progress before it
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def benchmark(args):
+    fake = FakeErgast(latency=args.latency, jitter=0.0).start()
+    workdir = tempfile.mkdtemp(prefix='f1-startup-')
+    try:
+        # Trains and saves the model so the measured runs only load it
+        run_once('eager', fake.base_url, workdir)
+        results = {}
+        for mode in MODES:
+            if args.only and mode not in args.only:
+                continue
+            runs = [run_once(mode, fake.base_url, workdir) for _ in range(args.repeat)]
+            median = lambda key: round(float(np.median([run[key] for run in runs])), 3)
+            results[mode] = {
+                'importSeconds': median('importSeconds'),
+                'readySeconds': median('readySeconds'),
+                'firstRequestMs': median('firstRequestMs'),
+                'rssMb': median('rssMb'),
+                'heavyModulesAtImport': runs[-1]['heavyModulesAtImport'],
+                'serviceLoadSeconds': runs[-1]['serviceLoadSeconds']
+            }
+            print_row(mode, results[mode])
+    finally:
+        fake.stop()
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'settings': {'repeat': args.repeat, 'latency': args.latency}
+        },
+        'modes': results
+    }
+
+
+def print_row(mode, r):
+    if mode is None:
+        print(f"{'mode':<12} {'import s':>9} {'ready s':>8} {'1st req ms':>11} {'rss MB':>7}  heavy modules at import")
+        return
+    print(f"{mode:<12} {r['importSeconds']:>9.3f} {r['readySeconds']:>8.3f} {r['firstRequestMs']:>11.1f} "
+          f"{r['rssMb']:>7.1f}  {', '.join(r['heavyModulesAtImport']) or '-'}")
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of import or ready time beyond `tolerance` (relative); returns a list of messages"""
+    regressions = []
+    for mode, now in current['modes'].items():
+        before = baseline.get('modes', {}).get(mode)
+        if before is None:
+            continue
+        for key in ('importSeconds', 'readySeconds'):
+            if now[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{mode}: {key} {before[key]} -> {now[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per mode (the median is reported)')
+    parser.add_argument('--latency', type=float, default=0.05, help='fake Ergast latency (seconds)')
+    parser.add_argument('--only', nargs='+', choices=MODES, help='benchmark only these modes')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/startup-<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    print_row(None, None)
+    result = benchmark(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('settings') != result['meta']['settings']:
+            print("! baseline was run with different settings; numbers are not directly comparable")
+        regressions = compare(result, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ regression: {message}")
+        if regressions:
+            return 1
+        print(f"✓ no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
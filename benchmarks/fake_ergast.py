@@ -0,0 +1,329 @@
+# benchmarks/fake_ergast.py
+"""
+Local Ergast stand-in for benchmarks and offline development.
+
+Serves the endpoints DataProcessor and HistoryBackfill use (season schedule,
+drivers, driverStandings overall and per round, paginated results and
+qualifying, per-driver results) from JSON fixtures, with configurable
+latency, error rate and page-size cap. Any URL without a fixture file is
+answered from a deterministic synthetic season, so the server works without
+recorded data.
+
+Usage:
+    python -m benchmarks.fake_ergast [--port 8001] [--latency 0.05] [--error-rate 0.01]
+    python -m benchmarks.fake_ergast --record 2024   # save live Ergast responses as fixtures
+Then run the app with ERGAST_BASE_URL=http://127.0.0.1:8001/api/f1
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+LIVE_ERGAST_URL = 'https://ergast.com/api/f1'
+# Ergast never returns more than this many rows per page
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 30
+
+POINTS_TABLE = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+ROUNDS = 24
+
+# (driverId, code, number, given name, family name, nationality, team)
+GRID = [
+    ('piastri', 'PIA', '81', 'Oscar', 'Piastri', 'Australian', 'McLaren'),
+    ('norris', 'NOR', '4', 'Lando', 'Norris', 'British', 'McLaren'),
+    ('max_verstappen', 'VER', '1', 'Max', 'Verstappen', 'Dutch', 'Red Bull'),
+    ('russell', 'RUS', '63', 'George', 'Russell', 'British', 'Mercedes'),
+    ('leclerc', 'LEC', '16', 'Charles', 'Leclerc', 'Monegasque', 'Ferrari'),
+    ('hamilton', 'HAM', '44', 'Lewis', 'Hamilton', 'British', 'Ferrari'),
+    ('antonelli', 'ANT', '12', 'Andrea Kimi', 'Antonelli', 'Italian', 'Mercedes'),
+    ('albon', 'ALB', '23', 'Alexander', 'Albon', 'Thai', 'Williams'),
+    ('hadjar', 'HAD', '6', 'Isack', 'Hadjar', 'French', 'RB F1 Team'),
+    ('hulkenberg', 'HUL', '27', 'Nico', 'Hülkenberg', 'German', 'Sauber'),
+    ('stroll', 'STR', '18', 'Lance', 'Stroll', 'Canadian', 'Aston Martin'),
+    ('sainz', 'SAI', '55', 'Carlos', 'Sainz', 'Spanish', 'Williams'),
+    ('lawson', 'LAW', '30', 'Liam', 'Lawson', 'New Zealander', 'RB F1 Team'),
+    ('alonso', 'ALO', '14', 'Fernando', 'Alonso', 'Spanish', 'Aston Martin'),
+    ('ocon', 'OCO', '31', 'Esteban', 'Ocon', 'French', 'Haas F1 Team'),
+    ('tsunoda', 'TSU', '22', 'Yuki', 'Tsunoda', 'Japanese', 'Red Bull'),
+    ('gasly', 'GAS', '10', 'Pierre', 'Gasly', 'French', 'Alpine F1 Team'),
+    ('bearman', 'BEA', '87', 'Oliver', 'Bearman', 'British', 'Haas F1 Team'),
+    ('bortoleto', 'BOR', '5', 'Gabriel', 'Bortoleto', 'Brazilian', 'Sauber'),
+    ('colapinto', 'COL', '43', 'Franco', 'Colapinto', 'Argentine', 'Alpine F1 Team'),
+]
+
+
+class SyntheticSeason:
+    """A deterministic season in Ergast's JSON shape; races before today have results"""
+
+    def __init__(self, year, today=None):
+        self.year = int(year)
+        rng = random.Random(self.year)
+        today = today or date.today()
+
+        first_race = date(self.year, 3, 8)
+        self.races = []
+        for round_ in range(1, ROUNDS + 1):
+            race_day = first_race + timedelta(days=(round_ - 1) * 11)
+            race = {
+                'season': str(self.year),
+                'round': str(round_),
+                'raceName': f'Grand Prix {round_}',
+                'Circuit': {'circuitId': f'circuit_{round_}', 'circuitName': f'Circuit {round_}'},
+                'date': race_day.isoformat(),
+                'time': '14:00:00Z',
+                'FirstPractice': {'date': (race_day - timedelta(days=2)).isoformat(), 'time': '11:30:00Z'},
+                'Qualifying': {'date': (race_day - timedelta(days=1)).isoformat(), 'time': '15:00:00Z'},
+            }
+            if race_day < today:
+                # Skill-weighted finishing order: earlier grid slots tend to finish higher
+                order = sorted(range(len(GRID)), key=lambda i: i + rng.gauss(0, 4))
+                race['Results'] = [self._result(GRID[i], position, rng) for position, i in enumerate(order, 1)]
+            self.races.append(race)
+
+    def _result(self, driver, position, rng):
+        driver_id, code, number, given, family, nationality, team = driver
+        finished = rng.random() > 0.05 or position <= 3
+        return {
+            'number': number,
+            'position': str(position),
+            'positionText': str(position) if finished else 'R',
+            'points': str(POINTS_TABLE[position - 1] if position <= len(POINTS_TABLE) and finished else 0),
+            'Driver': self._driver(driver),
+            'Constructor': {'constructorId': team.lower().replace(' ', '_'), 'name': team},
+            'grid': str(rng.randint(1, len(GRID))),
+            'status': 'Finished' if finished else 'Retired'
+        }
+
+    def _driver(self, driver):
+        driver_id, code, number, given, family, nationality, team = driver
+        return {
+            'driverId': driver_id, 'permanentNumber': number, 'code': code,
+            'givenName': given, 'familyName': family, 'nationality': nationality
+        }
+
+    def schedule(self):
+        races = [{k: v for k, v in race.items() if k != 'Results'} for race in self.races]
+        return _envelope(len(races), {'RaceTable': {'season': str(self.year), 'Races': races}})
+
+    def drivers(self):
+        drivers = [self._driver(d) for d in GRID]
+        return _envelope(len(drivers), {'DriverTable': {'season': str(self.year), 'Drivers': drivers}})
+
+    def standings(self, round_=None):
+        completed = [race for race in self.races if 'Results' in race]
+        if round_ is not None:
+            completed = [race for race in completed if int(race['round']) <= int(round_)]
+        totals = {d[0]: {'points': 0.0, 'wins': 0} for d in GRID}
+        for race in completed:
+            for result in race['Results']:
+                totals[result['Driver']['driverId']]['points'] += float(result['points'])
+                totals[result['Driver']['driverId']]['wins'] += result['position'] == '1'
+
+        ranked = sorted(GRID, key=lambda d: (-totals[d[0]]['points'], -totals[d[0]]['wins']))
+        standings = [{
+            'position': str(position),
+            'positionText': str(position),
+            'points': f"{totals[d[0]]['points']:g}",
+            'wins': str(totals[d[0]]['wins']),
+            'Driver': self._driver(d),
+            'Constructors': [{'constructorId': d[6].lower().replace(' ', '_'), 'name': d[6]}]
+        } for position, d in enumerate(ranked, 1)]
+
+        lists = [{'season': str(self.year), 'round': str(len(completed)), 'DriverStandings': standings}] if completed else []
+        return _envelope(len(standings), {'StandingsTable': {'season': str(self.year), 'StandingsLists': lists}})
+
+    def qualifying(self, limit, offset):
+        """Paginated like results; the qualifying order is the race's grid order"""
+        rows = []
+        for race in self.races:
+            grid = sorted(race.get('Results', []), key=lambda result: (int(result['grid']), result['Driver']['driverId']))
+            for position, result in enumerate(grid, 1):
+                rows.append((race, {
+                    'number': result['number'], 'position': str(position), 'Driver': result['Driver'],
+                    'Constructor': result['Constructor'], 'Q1': f'1:{20 + position // 10}.{position:03d}'
+                }))
+
+        races = []
+        for race, result in rows[offset:offset + limit]:
+            if not races or races[-1]['round'] != race['round']:
+                races.append({**{k: v for k, v in race.items() if k != 'Results'}, 'QualifyingResults': []})
+            races[-1]['QualifyingResults'].append(result)
+        return _envelope(len(rows), {'RaceTable': {'season': str(self.year), 'Races': races}}, limit, offset)
+
+    def results(self, limit, offset, driver_id=None):
+        """Paginated like Ergast: limit/offset count result rows, and a race may span two pages"""
+        rows = [
+            (race, result) for race in self.races for result in race.get('Results', [])
+            if driver_id is None or result['Driver']['driverId'] == driver_id
+        ]
+        page = rows[offset:offset + limit]
+
+        races = []
+        for race, result in page:
+            if not races or races[-1]['round'] != race['round']:
+                races.append({**{k: v for k, v in race.items() if k != 'Results'}, 'Results': []})
+            races[-1]['Results'].append(result)
+        return _envelope(len(rows), {'RaceTable': {'season': str(self.year), 'Races': races}}, limit, offset)
+
+
+def _envelope(total, table, limit=DEFAULT_PAGE_SIZE, offset=0):
+    return {'MRData': {'xmlns': '', 'series': 'f1', 'limit': str(limit), 'offset': str(offset), 'total': str(total), **table}}
+
+
+ROUTES = [
+    (re.compile(r'^/(\d{4})\.json$'), lambda season, q, m: season.schedule()),
+    (re.compile(r'^/(\d{4})/drivers\.json$'), lambda season, q, m: season.drivers()),
+    (re.compile(r'^/(\d{4})/driverStandings\.json$'), lambda season, q, m: season.standings()),
+    (re.compile(r'^/(\d{4})/(\d+)/driverStandings\.json$'), lambda season, q, m: season.standings(m.group(2))),
+    (re.compile(r'^/(\d{4})/results\.json$'), lambda season, q, m: season.results(*q)),
+    (re.compile(r'^/(\d{4})/qualifying\.json$'), lambda season, q, m: season.qualifying(*q)),
+    (re.compile(r'^/(\d{4})/drivers/([\w-]+)/results\.json$'), lambda season, q, m: season.results(*q, driver_id=m.group(2))),
+]
+
+
+class FakeErgast:
+    """
+    Threaded HTTP server imitating the Ergast API under /api/f1.
+    Request counts per path are kept in `requests` for assertions and reports.
+    """
+
+    def __init__(self, fixtures_dir=None, latency=0.0, jitter=0.0, error_rate=0.0,
+                 max_page_size=MAX_PAGE_SIZE, host='127.0.0.1', port=0, seed=0):
+        self.fixtures_dir = fixtures_dir or DEFAULT_FIXTURES_DIR
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_page_size = max_page_size
+        self.requests = {}
+        self._seasons = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/api/f1'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-ergast', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def total_requests(self):
+        with self._lock:
+            return sum(self.requests.values())
+
+    def respond(self, path, query):
+        """(status, body bytes) for one request path below /api/f1"""
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            fail = self._rng.random() < self.error_rate
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return 503, b'{"error": "injected failure"}'
+
+        limit = min(int(query.get('limit', [DEFAULT_PAGE_SIZE])[0]), self.max_page_size)
+        offset = int(query.get('offset', [0])[0])
+
+        fixture = os.path.join(self.fixtures_dir, path.lstrip('/'))
+        if offset == 0 and os.path.isfile(fixture):
+            with open(fixture, 'rb') as f:
+                return 200, f.read()
+
+        for pattern, handler in ROUTES:
+            match = pattern.match(path)
+            if match:
+                return 200, json.dumps(handler(self._season(match.group(1)), (limit, offset), match)).encode()
+        return 404, b'{"error": "not found"}'
+
+    def _season(self, year):
+        with self._lock:
+            if year not in self._seasons:
+                self._seasons[year] = SyntheticSeason(year)
+            return self._seasons[year]
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path[len('/api/f1'):] if url.path.startswith('/api/f1') else url.path
+                status, body = fake.respond(path, parse_qs(url.query))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def record(years, fixtures_dir=DEFAULT_FIXTURES_DIR, drivers=()):
+    """Save live Ergast responses for the given seasons as fixture files"""
+    import requests
+
+    paths = []
+    for year in years:
+        paths += [f'/{year}.json', f'/{year}/drivers.json', f'/{year}/driverStandings.json']
+        paths += [f'/{year}/drivers/{driver}/results.json' for driver in drivers]
+
+    for path in paths:
+        response = requests.get(f'{LIVE_ERGAST_URL}{path}', timeout=10)
+        response.raise_for_status()
+        target = os.path.join(fixtures_dir, path.lstrip('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(response.content)
+        print(f"✓ {path} -> {target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Ergast stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='± seconds of random extra latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--max-page-size', type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument('--record', nargs='+', metavar='YEAR', help='record live responses as fixtures and exit')
+    parser.add_argument('--drivers', nargs='*', default=[], help='driver ids whose results to record')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.fixtures, args.drivers)
+        return
+
+    fake = FakeErgast(args.fixtures, args.latency, args.jitter, args.error_rate, args.max_page_size, args.host, args.port)
+    print(f"Fake Ergast listening on {fake.base_url} ({datetime.now():%H:%M:%S})")
+    try:
+        fake.start()._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
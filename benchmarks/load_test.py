@@ -0,0 +1,274 @@
+# benchmarks/load_test.py
+"""
+Concurrent load test of the API against the local Ergast stand-in.
+
+Starts benchmarks.fake_ergast in-process, runs app.py in a subprocess pointed
+at it (fresh cache and model directories), then drives every data route with
+concurrent clients. Reports p50/p95/p99 latency, requests/second, errors and
+server memory per endpoint, and writes the results as JSON.
+
+Usage:
+    python -m benchmarks.load_test [--requests 500] [--concurrency 16] [--latency 0.05]
+    python -m benchmarks.load_test --compare benchmarks/results/<baseline>.json
+Exits non-zero if --compare finds a regression beyond --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import requests
+
+from benchmarks.fake_ergast import FakeErgast
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+STARTUP_TIMEOUT = 120
+
+SERVER_SCRIPT = (
+    "import sys, app; from werkzeug.serving import run_simple; "
+    "run_simple('127.0.0.1', int(sys.argv[1]), app.app, threaded=True)"
+)
+
+# name -> (method, path, JSON body)
+ENDPOINTS = {
+    'drivers': ('GET', '/api/drivers', None),
+    'standings': ('GET', '/api/standings', None),
+    'driver_detail': ('GET', '/api/driver/norris', None),
+    'compare': ('POST', '/api/compare', {'driver1': 'piastri', 'driver2': 'max_verstappen'}),
+    'points_progression': ('GET', '/api/points-progression/leclerc', None),
+    'predict_podium': ('GET', '/api/predict-podium', None),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """app.py in a child process, so client threads don't share its GIL and its memory is measurable"""
+
+    def __init__(self, ergast_url, workdir):
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        env = dict(
+            os.environ,
+            ERGAST_BASE_URL=ergast_url,
+            F1_CACHE_DIR=os.path.join(workdir, 'ergast'),
+            F1_MODEL_DIR=os.path.join(workdir, 'models'),
+            # The calendar scheduler would fetch upstream mid-measurement
+            F1_REFRESH_SCHEDULER='0',
+            F1_LIVE_TIMING='0',
+            PYTHONPATH=REPO_ROOT,
+        )
+        self.log = open(os.path.join(workdir, 'server.log'), 'w')
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', SERVER_SCRIPT, str(self.port)],
+            cwd=REPO_ROOT, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+
+    def wait_ready(self):
+        """Seconds until /api/health answers"""
+        start = time.perf_counter()
+        while time.perf_counter() - start < STARTUP_TIMEOUT:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App server exited with {self.process.returncode}; see {self.log.name}")
+            try:
+                if requests.get(f'{self.base_url}/api/health', timeout=1).ok:
+                    return time.perf_counter() - start
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        raise RuntimeError(f"App server not ready after {STARTUP_TIMEOUT}s")
+
+    def memory(self):
+        """Current and peak RSS (MB) of the server process, or None where /proc is unavailable"""
+        try:
+            with open(f'/proc/{self.process.pid}/status') as f:
+                fields = dict(line.split(':', 1) for line in f)
+            return {
+                'rssMb': round(int(fields['VmRSS'].split()[0]) / 1024, 1),
+                'peakRssMb': round(int(fields['VmHWM'].split()[0]) / 1024, 1)
+            }
+        except (OSError, KeyError):
+            return None
+
+    def reset_peak_memory(self):
+        try:
+            with open(f'/proc/{self.process.pid}/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+def run_endpoint(base_url, method, path, body, total, concurrency):
+    """Fire `total` requests from `concurrency` threads; returns (latencies in ms, status counts, wall seconds)"""
+    local = threading.local()
+    statuses = {}
+    status_lock = threading.Lock()
+
+    def one(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = session.request(method, base_url + path, json=body, timeout=30).status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        with status_lock:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(total)))
+    return np.array(latencies), statuses, time.perf_counter() - start
+
+
+def benchmark(args):
+    fake = FakeErgast(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, max_page_size=args.max_page_size
+    ).start()
+    workdir = tempfile.mkdtemp(prefix='f1-bench-')
+    server = AppServer(fake.base_url, workdir)
+    try:
+        startup = server.wait_ready()
+        results = {}
+        for name, (method, path, body) in ENDPOINTS.items():
+            if args.only and name not in args.only:
+                continue
+            upstream_before = fake.total_requests()
+            cold, _, _ = run_endpoint(server.base_url, method, path, body, 1, 1)
+            server.reset_peak_memory()
+            latencies, statuses, wall = run_endpoint(server.base_url, method, path, body, args.requests, args.concurrency)
+
+            results[name] = {
+                'method': method,
+                'path': path,
+                'requests': args.requests,
+                'coldMs': round(float(cold[0]), 2),
+                'p50Ms': round(float(np.percentile(latencies, 50)), 2),
+                'p95Ms': round(float(np.percentile(latencies, 95)), 2),
+                'p99Ms': round(float(np.percentile(latencies, 99)), 2),
+                'maxMs': round(float(latencies.max()), 2),
+                'requestsPerSecond': round(args.requests / wall, 1),
+                'statuses': statuses,
+                'errors': sum(n for status, n in statuses.items() if not status.startswith('2')),
+                'upstreamRequests': fake.total_requests() - upstream_before,
+                'memory': server.memory()
+            }
+            print_row(name, results[name])
+    finally:
+        server.stop()
+        fake.stop()
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'startupSeconds': round(startup, 2),
+            'settings': {
+                'requests': args.requests, 'concurrency': args.concurrency, 'latency': args.latency,
+                'jitter': args.jitter, 'errorRate': args.error_rate, 'maxPageSize': args.max_page_size
+            }
+        },
+        'endpoints': results
+    }
+
+
+def print_row(name, r):
+    if name is None:
+        print(f"{'endpoint':<20} {'cold ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'errors':>7} {'rss MB':>7}")
+        return
+    rss = r['memory']['peakRssMb'] if r['memory'] else float('nan')
+    print(f"{name:<20} {r['coldMs']:>8.1f} {r['p50Ms']:>8.1f} {r['p95Ms']:>8.1f} {r['p99Ms']:>8.1f} "
+          f"{r['requestsPerSecond']:>8.1f} {r['errors']:>7} {rss:>7.1f}")
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of p95 latency or throughput beyond `tolerance` (relative); returns a list of messages"""
+    regressions = []
+    for name, now in current['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before is None:
+            continue
+        if now['p95Ms'] > before['p95Ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95Ms']} -> {now['p95Ms']} ms")
+        if now['requestsPerSecond'] < before['requestsPerSecond'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['requestsPerSecond']} -> {now['requestsPerSecond']} req/s")
+        if now['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {now['errors']}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.05, help='fake Ergast latency (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--max-page-size', type=int, default=100)
+    parser.add_argument('--only', nargs='+', choices=list(ENDPOINTS), help='benchmark only these endpoints')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    print_row(None, None)
+    result = benchmark(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nStartup {result['meta']['startupSeconds']}s. Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('settings') != result['meta']['settings']:
+            print("! baseline was run with different settings; numbers are not directly comparable")
+        regressions = compare(result, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ regression: {message}")
+        if regressions:
+            return 1
+        print(f"✓ no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
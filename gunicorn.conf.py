@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+"""
+Multi-process deployment: gunicorn app:app  (this file is picked up automatically)
+
+The app is imported once in the master (preload_app) so the model artifacts
+and other read-mostly state are shared copy-on-write by the forked workers.
+Workers share the upstream cache, results store and model registry through
+files under cache/ and models/, with file locks making sure only one worker
+fetches a key, ingests a season, trains the first model or runs the refresh
+scheduler.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('F1_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('F1_WORKERS', min(4, multiprocessing.cpu_count())))
+threads = int(os.environ.get('F1_THREADS', 4))
+timeout = 60
+preload_app = True
+
+# Read by app.py at import: leave background threads to post_fork below
+os.environ['F1_BACKGROUND_START'] = 'post_fork'
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the GC's reach so collections in
+    # the workers don't write to (and un-share) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app
+    app.start_background_services()
@@ -0,0 +1,251 @@
+# services/ChampionshipSimulator.py
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+# Points for P1..P10 in a Grand Prix
+POINTS_TABLE = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+DEFAULT_SIMULATIONS = 100000
+CHUNK_SIMULATIONS = 25000
+# Runs at least this large (the default included) go to the process pool
+# instead of the request thread
+PROCESS_POOL_THRESHOLD = 50000
+# Size of the one simulation pool each process shares between requests
+MAX_POOL_WORKERS = 4
+RESULT_CACHE_SIZE = 64
+
+# Finishing-position distribution estimation
+RECENT_ROUNDS = 8
+POSITION_SMOOTHING = 0.5
+
+
+def simulate_chunk(cdf, base_points, base_wins, rounds, simulations, seed):
+    """
+    Simulate `rounds` races `simulations` times at once.
+
+    cdf[d] is driver d's cumulative finishing-position distribution. Each
+    race, every driver draws a position from their own distribution and
+    the draws (plus uniform jitter for ties) are ranked into a finishing
+    order. Returns (champion counts, summed final points) per driver.
+    Module-level so it can run in a process pool.
+    """
+    rng = np.random.default_rng(seed)
+    n_drivers = len(base_points)
+    slot_points = np.zeros(n_drivers)
+    slot_points[:min(n_drivers, len(POINTS_TABLE))] = POINTS_TABLE[:n_drivers]
+
+    points = np.tile(np.asarray(base_points, dtype=np.float64), (simulations, 1))
+    wins = np.tile(np.asarray(base_wins, dtype=np.float64), (simulations, 1))
+    round_points = np.empty((simulations, n_drivers))
+    sims = np.arange(simulations)
+
+    for _ in range(rounds):
+        draws = rng.random((simulations, n_drivers))
+        positions = np.empty((simulations, n_drivers))
+        for d in range(n_drivers):
+            positions[:, d] = np.searchsorted(cdf[d], draws[:, d], side='right')
+        order = np.argsort(positions + rng.random((simulations, n_drivers)), axis=1)
+
+        # order[:, k] is the driver finishing k-th, who scores slot_points[k]
+        np.put_along_axis(round_points, order, slot_points[None, :], axis=1)
+        points += round_points
+        wins[sims, order[:, 0]] += 1
+
+    # Ties on points go to the driver with more wins (first step of the countback)
+    champions = np.argmax(points * 1000 + wins, axis=1)
+    return np.bincount(champions, minlength=n_drivers), points.sum(axis=0)
+
+
+class ChampionshipSimulator:
+    """Monte Carlo title odds from current standings and per-driver finishing-position distributions"""
+
+    def __init__(self, data_processor, predictor=None, max_workers=None):
+        self.data_processor = data_processor
+        self.predictor = predictor
+        self.max_workers = max_workers or min(os.cpu_count() or 1, MAX_POOL_WORKERS)
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker builds its own pool on first use
+            os.register_at_fork(after_in_child=self._forget_pool)
+
+    def get_odds(self, year, simulations=DEFAULT_SIMULATIONS, source='results'):
+        """Final championship probabilities (runs the whole simulation)"""
+        result = None
+        for result in self.stream_odds(year, simulations, source):
+            pass
+        return result
+
+    def stream_odds(self, year, simulations=DEFAULT_SIMULATIONS, source='results'):
+        """
+        Yield progressively better estimates as chunks finish; the last one has 'final': True.
+        Finished results are cached per standings snapshot.
+        """
+        standings = self.data_processor.get_driver_standings(year)
+        remaining = self.data_processor.get_remaining_rounds(year)
+        distributions, used_source = self._position_distributions(standings, year, source)
+
+        key = self._snapshot_key(year, standings, remaining, simulations, used_source)
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        cdf = np.cumsum(distributions, axis=1)
+        cdf[:, -1] = 1.0
+        base_points = [s['points'] for s in standings]
+        base_wins = [s['wins'] for s in standings]
+
+        chunks = [CHUNK_SIMULATIONS] * (simulations // CHUNK_SIMULATIONS)
+        if simulations % CHUNK_SIMULATIONS:
+            chunks.append(simulations % CHUNK_SIMULATIONS)
+        seeds = np.random.SeedSequence(int(key[:8], 16)).spawn(len(chunks))
+        jobs = [(cdf, base_points, base_wins, remaining, size, seed) for size, seed in zip(chunks, seeds)]
+
+        champions = np.zeros(len(standings))
+        points_sum = np.zeros(len(standings))
+        done = 0
+        for size, (counts, totals) in self._run_chunks(jobs, simulations):
+            champions += counts
+            points_sum += totals
+            done += size
+            result = self._format(standings, champions, points_sum, done, simulations, remaining, used_source, year)
+            if done == simulations:
+                with self._lock:
+                    self._results[key] = result
+                    while len(self._results) > RESULT_CACHE_SIZE:
+                        self._results.popitem(last=False)
+            yield result
+
+    def _run_chunks(self, jobs, simulations):
+        """Yield (chunk size, chunk result) in completion order"""
+        if simulations < PROCESS_POOL_THRESHOLD:
+            for job in jobs:
+                yield job[4], simulate_chunk(*job)
+            return
+
+        pool = self._get_pool()
+        futures = {pool.submit(simulate_chunk, *job): job[4] for job in jobs}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # A client that stops reading the stream frees its queued chunks
+            for future in futures:
+                future.cancel()
+
+    def _get_pool(self):
+        """
+        The process pool, created on first use and shared by every request.
+        Workers start from a forkserver (spawn where unavailable) rather than
+        forking this threaded server process with its sockets and connections.
+        """
+        with self._lock:
+            if self._pool is None:
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    # Imported (with NumPy) once in the server; workers fork from it ready to run
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._pool
+
+    def _forget_pool(self):
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _position_distributions(self, standings, year, source):
+        """
+        (n_drivers, n_drivers) matrix: row d is driver d's finishing-position distribution.
+        'results' uses recent race results, 'model' the podium model; when neither
+        has data, each driver is centred on their current standings position.
+        """
+        n = len(standings)
+        if source == 'results':
+            rows = self.data_processor.results_store.get_season_results(year)
+            if rows:
+                return self._distributions_from_results(standings, rows), 'results'
+        if source in ('results', 'model') and self.predictor is not None:
+            distributions = self._distributions_from_model(standings)
+            if distributions is not None:
+                return distributions, 'model'
+
+        # Fallback: center each driver on their current standings position
+        positions = np.arange(n)
+        centers = np.arange(n)[:, None]
+        weights = np.exp(-np.abs(positions[None, :] - centers) / 2.0)
+        return weights / weights.sum(axis=1, keepdims=True), 'standings'
+
+    def _distributions_from_results(self, standings, rows):
+        """Smoothed histogram of each driver's finishing positions over the last few rounds"""
+        n = len(standings)
+        index = {s['driverId']: i for i, s in enumerate(standings)}
+        last_round = max(row['round'] for row in rows)
+        counts = np.full((n, n), POSITION_SMOOTHING / n)
+
+        for row in rows:
+            d = index.get(row['driver_id'])
+            if d is None or row['round'] <= last_round - RECENT_ROUNDS:
+                continue
+            try:
+                position = min(int(row['position']), n) - 1
+            except (TypeError, ValueError):
+                position = n - 1
+            counts[d, position] += 1
+
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def _distributions_from_model(self, standings):
+        """Podium probability spread over P1-P3, the rest decaying across P4 and below"""
+        probabilities = self.predictor.predict_podium_probabilities()
+        n = len(standings)
+        rows = []
+        for standing in standings:
+            p = probabilities.get(f"{standing['firstName']} {standing['lastName']}")
+            if p is None:
+                return None
+            row = np.zeros(n)
+            row[:min(3, n)] = p / min(3, n)
+            if n > 3:
+                tail = np.exp(-np.arange(n - 3) * (1.0 - p) / 3.0)
+                row[3:] = (1 - p) * tail / tail.sum()
+            rows.append(row)
+        return np.array(rows)
+
+    def _snapshot_key(self, year, standings, remaining, simulations, source):
+        snapshot = json.dumps([[s['driverId'], s['points'], s['wins']] for s in standings])
+        model_version = self.predictor.metadata.get('version') if self.predictor is not None and source == 'model' else ''
+        raw = f"{year}|{snapshot}|{remaining}|{simulations}|{source}|{model_version}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _format(self, standings, champions, points_sum, done, simulations, remaining, source, year):
+        drivers = []
+        for i, standing in enumerate(standings):
+            drivers.append({
+                'driverId': standing['driverId'],
+                'name': f"{standing['firstName']} {standing['lastName']}",
+                'team': standing['team'],
+                'currentPoints': standing['points'],
+                'championshipProbability': round(float(champions[i]) / done * 100, 2),
+                'expectedPoints': round(float(points_sum[i]) / done, 1)
+            })
+        drivers.sort(key=lambda d: (d['championshipProbability'], d['expectedPoints']), reverse=True)
+
+        return {
+            'year': year,
+            'remainingRounds': remaining,
+            'source': source,
+            'simulations': done,
+            'totalSimulations': simulations,
+            'final': done == simulations,
+            'drivers': drivers
+        }
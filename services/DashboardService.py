@@ -0,0 +1,75 @@
+# services/DashboardService.py
+
+# Progression series included by default, and the most a request may ask for
+DEFAULT_PROGRESSION_DRIVERS = 3
+MAX_PROGRESSION_DRIVERS = 10
+
+# How long a browser may reuse the bundle (predictions are re-checked about this often)
+BOOTSTRAP_MAX_AGE = 30
+
+
+class DashboardService:
+    """Everything the dashboard needs on page load, assembled in one pass"""
+
+    def __init__(self, data_processor, predictor):
+        self.data_processor = data_processor
+        self.predictor = predictor
+
+    def get_bootstrap(self, year=None, progression_drivers=DEFAULT_PROGRESSION_DRIVERS, predictions=True):
+        """
+        Drivers, standings, podium predictions (unless predictions is False) and
+        the points progression of the top N drivers in the standings. The
+        independent parts are fetched concurrently on the shared upstream pool;
+        they read through the same upstream cache, so standings are downloaded
+        at most once.
+        """
+        year = int(year or self.data_processor.current_year)
+        executor = self.data_processor.executor
+
+        drivers_future = executor.submit(self.data_processor.get_drivers)
+        standings_future = executor.submit(self.data_processor.get_driver_standings, year)
+        predictions_future = executor.submit(self.predictor.predict_next_race_podium) if predictions else None
+
+        standings = standings_future.result()
+        top_ids = [s['driverId'] for s in standings[:progression_drivers]]
+        progression_futures = [
+            executor.submit(self.data_processor.get_points_progression, driver_id, year)
+            for driver_id in top_ids
+        ]
+
+        bundle = {
+            'year': year,
+            'drivers': drivers_future.result(),
+            'standings': standings,
+            'progression': {
+                driver_id: future.result() for driver_id, future in zip(top_ids, progression_futures)
+            }
+        }
+        if predictions:
+            bundle.update(
+                predictions=predictions_future.result(),
+                modelVersion=self.predictor.metadata.get('version'),
+                featuresVersion=self.predictor.features_version
+            )
+        return bundle
+
+    def get_data_version(self, year=None, progression_drivers=DEFAULT_PROGRESSION_DRIVERS, predictions=True):
+        """
+        (version, max_age) for the bundle: the combined versions of its parts, or
+        None when any part is missing or stale and has to be rebuilt. Without
+        predictions, a model swap does not change the version.
+        """
+        year = int(year or self.data_processor.current_year)
+        drivers_version, drivers_age = self.data_processor.get_data_version('drivers')
+        standings_version, standings_age = self.data_processor.get_data_version('standings', year)
+
+        season = self.data_processor.results_store.get_season_info(year) if progression_drivers else {}
+        if drivers_version is None or standings_version is None or season is None:
+            return None, 0
+
+        version = (
+            year, progression_drivers, drivers_version, standings_version,
+            self.predictor.get_data_version() if predictions else None, tuple(sorted(season.items()))
+        )
+        ages = [age for age in (drivers_age, standings_age) if age is not None]
+        return version, min(ages + [BOOTSTRAP_MAX_AGE])
@@ -1,39 +1,101 @@
 # services/data_processor.py
+import numpy as np
 import pandas as pd
 import requests
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from services.UpstreamCache import UpstreamCache
+from services.UpstreamHealth import CircuitBreaker, UpstreamUnavailable
+from services.ResultsStore import ResultsStore
+from services.Metrics import metrics
+from services.FileLock import FileLock
+from services.Records import Driver, Standing, RaceResult
+
+# Cache lifetimes (seconds) per upstream resource
+DRIVERS_TTL = 3 * 24 * 3600
+SCHEDULE_TTL = 24 * 3600
+DEFAULT_SESSION_TTL = 6 * 3600
+MIN_SESSION_TTL = 5 * 60
+
+# Schedule fields Ergast uses for the non-race sessions of a weekend
+SESSION_KEYS = ('FirstPractice', 'SecondPractice', 'ThirdPractice', 'SprintQualifying', 'SprintShootout', 'Qualifying', 'Sprint')
+
+# Ergast API root; point it at a mirror or the local stand-in in benchmarks/fake_ergast.py
+ERGAST_BASE_URL = "https://ergast.com/api/f1"
+
+# Upstream concurrency: pooled keep-alive connections and a bounded fan-out pool
+HTTP_POOL_SIZE = 8
+FETCH_WORKERS = 8
+
+# Season results ingest: Ergast page size and how often the current season is re-synced
+RESULTS_PAGE_SIZE = 100
+RESULTS_SYNC_INTERVAL = 3600
+
+# Upstream payloads whose parsed records are kept for reuse
+PARSE_MEMO_SIZE = 256
+
+# Longest Retry-After (seconds) honoured from a 429 before probing again
+MAX_RETRY_AFTER = 600
+
+UPSTREAM_REQUESTS = metrics.counter(
+    'f1_upstream_requests_total', 'Ergast requests by resource and outcome', ['resource', 'status']
+)
+UPSTREAM_SECONDS = metrics.histogram(
+    'f1_upstream_request_duration_seconds', 'Ergast request latency by resource', ['resource']
+)
+MOCK_FALLBACKS = metrics.counter(
+    'f1_mock_fallbacks_total', 'Responses served from built-in mock data', ['resource']
+)
 
 class DataProcessor:
     """Handles data fetching, processing, and transformation"""
     
-    def __init__(self):
-        self.ergast_base_url = "https://ergast.com/api/f1"
+    def __init__(self, cache=None, breaker=None, results_store=None):
+        self.ergast_base_url = os.environ.get('ERGAST_BASE_URL', ERGAST_BASE_URL).rstrip('/')
         self.current_year = datetime.now().year
+        self.cache = cache or UpstreamCache()
+        self.breaker = breaker or CircuitBreaker()
+        self.results_store = results_store or ResultsStore()
+        self._syncing = set()
+        self._sync_lock = threading.Lock()
+        # url -> (upstream payload, records parsed from it); see _parse_once
+        self._parsed = OrderedDict()
+        self._parsed_lock = threading.Lock()
+        # Set by RefreshScheduler: it keeps the current season fresh, so requests only read
+        self.scheduled_refresh = False
+        
+        self._create_pools()
+        if hasattr(os, 'register_at_fork'):
+            # Sockets and pool threads don't survive fork; each worker gets its own
+            os.register_at_fork(after_in_child=self._create_pools)
+    
+    def _create_pools(self):
+        # One keep-alive session for all upstream calls instead of a new connection per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='ergast-fetch')
         
     def get_drivers(self):
-        """Fetch all drivers for current season"""
+        """Fetch all drivers for current season (a tuple of Driver records)"""
         try:
             # Try Ergast API first
             url = f"{self.ergast_base_url}/{self.current_year}/drivers.json"
-            response = requests.get(url, timeout=5)
+            data = self._get_json(url, ttl=self._season_ttl(self.current_year, DRIVERS_TTL))
             
-            if response.status_code == 200:
-                data = response.json()
-                drivers_data = data['MRData']['DriverTable']['Drivers']
-                
+            if data:
                 # Map to our format
-                drivers = []
-                for driver in drivers_data:
-                    drivers.append({
-                        'id': driver['driverId'],
-                        'firstName': driver['givenName'],
-                        'lastName': driver['familyName'],
-                        'nationality': driver['nationality'],
-                        'number': driver.get('permanentNumber', 'N/A'),
-                        'code': driver.get('code', '')
-                    })
-                return drivers
+                return self._parse_once(url, data, lambda data: tuple(
+                    Driver.from_ergast(driver) for driver in data['MRData']['DriverTable']['Drivers']
+                ))
             else:
                 return self._get_mock_drivers()
                 
@@ -42,32 +104,18 @@ class DataProcessor:
             return self._get_mock_drivers()
     
     def get_driver_standings(self, year):
-        """Fetch driver standings"""
+        """Fetch driver standings (a tuple of Standing records)"""
         try:
             url = f"{self.ergast_base_url}/{year}/driverStandings.json"
-            response = requests.get(url, timeout=5)
+            data = self._get_json(url, ttl=self._season_ttl(year, self._until_next_session(year)))
             
-            if response.status_code == 200:
-                data = response.json()
+            if data:
                 standings_list = data['MRData']['StandingsTable']['StandingsLists']
                 
                 if standings_list:
-                    standings = standings_list[0]['DriverStandings']
-                    
-                    result = []
-                    for standing in standings:
-                        driver = standing['Driver']
-                        result.append({
-                            'position': int(standing['position']),
-                            'points': float(standing['points']),
-                            'wins': int(standing['wins']),
-                            'driverId': driver['driverId'],
-                            'firstName': driver['givenName'],
-                            'lastName': driver['familyName'],
-                            'nationality': driver['nationality'],
-                            'team': standing['Constructors'][0]['name'] if standing['Constructors'] else 'Unknown'
-                        })
-                    return result
+                    return self._parse_once(url, data, lambda data: tuple(
+                        Standing.from_ergast(standing) for standing in standings_list[0]['DriverStandings']
+                    ))
                 else:
                     return self._get_mock_standings()
             else:
@@ -79,41 +127,19 @@ class DataProcessor:
     
     
     
-    def get_driver_detail(self, driver_id):
-        """Get detailed statistics for a specific driver"""
+    def get_driver_detail(self, driver_id, standings=None):
+        """
+        Get detailed statistics for a specific driver.
+        Pass standings to reuse a list already fetched for this request.
+        """
         try:
-            # Get current standings
-            standings = self.get_driver_standings(self.current_year)
-            driver_standing = next((d for d in standings if d['driverId'] == driver_id), None)
-            
-            if not driver_standing:
-                return None
+            # Race results don't depend on the standings, so fetch them in parallel
+            races_future = self.executor.submit(self._get_driver_races, driver_id, self.current_year)
             
-            # Get race results for the driver
-            url = f"{self.ergast_base_url}/{self.current_year}/drivers/{driver_id}/results.json"
-            response = requests.get(url, timeout=5)
+            if standings is None:
+                standings = self.get_driver_standings(self.current_year)
             
-            races_data = []
-            if response.status_code == 200:
-                data = response.json()
-                races = data['MRData']['RaceTable']['Races']
-                
-                for race in races:
-                    if race['Results']:
-                        result = race['Results'][0]
-                        races_data.append({
-                            'round': int(race['round']),
-                            'name': race['raceName'],
-                            'position': result.get('position', 'DNF'),
-                            'points': float(result.get('points', 0))
-                        })
-            
-            return {
-                **driver_standing,
-                'races': races_data,
-                'totalRaces': len(races_data),
-                'avgPoints': round(driver_standing['points'] / len(races_data), 2) if races_data else 0
-            }
+            return self._build_driver_detail(driver_id, standings, races_future.result())
             
         except Exception as e:
             print(f"Error fetching driver detail: {e}")
@@ -121,8 +147,22 @@ class DataProcessor:
     
     def compare_drivers(self, driver1_id, driver2_id):
         """Compare statistics between two drivers"""
-        driver1 = self.get_driver_detail(driver1_id)
-        driver2 = self.get_driver_detail(driver2_id)
+        # One standings fetch shared by both drivers; all three fetches in flight at once
+        standings_future = self.executor.submit(self.get_driver_standings, self.current_year)
+        races_futures = [
+            self.executor.submit(self._get_driver_races, driver_id, self.current_year)
+            for driver_id in (driver1_id, driver2_id)
+        ]
+        standings = standings_future.result()
+        
+        details = []
+        for driver_id, races_future in zip((driver1_id, driver2_id), races_futures):
+            try:
+                details.append(self._build_driver_detail(driver_id, standings, races_future.result()))
+            except Exception as e:
+                print(f"Error fetching driver detail: {e}")
+                details.append(None)
+        driver1, driver2 = details
         
         if not driver1 or not driver2:
             raise ValueError("One or both drivers not found")
@@ -156,41 +196,442 @@ class DataProcessor:
     def get_points_progression(self, driver_id, year):
         """Get cumulative points progression throughout the season"""
         try:
-            url = f"{self.ergast_base_url}/{year}/drivers/{driver_id}/results.json"
-            response = requests.get(url, timeout=5)
+            progression = []
+            cumulative_points = 0
             
-            if response.status_code == 200:
-                data = response.json()
-                races = data['MRData']['RaceTable']['Races']
-                
-                progression = []
-                cumulative_points = 0
-                
-                for race in races:
-                    if race['Results']:
-                        result = race['Results'][0]
-                        points = float(result.get('points', 0))
-                        cumulative_points += points
-                        
-                        progression.append({
-                            'round': int(race['round']),
-                            'race': race['raceName'],
-                            'points': points,
-                            'cumulativePoints': cumulative_points,
-                            'position': result.get('position', 'DNF')
-                        })
-                
-                return progression
-            else:
-                return []
+            for race in self._get_driver_races(driver_id, year):
+                cumulative_points += race['points']
+                progression.append({
+                    'round': race['round'],
+                    'race': race['name'],
+                    'points': race['points'],
+                    'cumulativePoints': cumulative_points,
+                    'position': race['position']
+                })
+            
+            return progression
                 
         except Exception as e:
             print(f"Error fetching points progression: {e}")
             return []
     
+    def get_bulk_progression(self, driver_ids, year):
+        """
+        Cumulative points for many drivers (or 'all') from one read of the
+        season's results, aligned on the same rounds for charting. A driver
+        who missed a round scores 0 there and has no position.
+        """
+        year = int(year)
+        df = self._season_frame(year)
+        if df.empty:
+            return {'year': year, 'rounds': [], 'drivers': {}}
+        
+        if driver_ids != 'all':
+            df = df[df['driver_id'].isin(driver_ids)]
+        
+        rounds = df.drop_duplicates('round').sort_values('round')
+        points = df.pivot_table(index='driver_id', columns='round', values='points', aggfunc='sum', fill_value=0.0)
+        points = points.reindex(columns=rounds['round'], fill_value=0.0)
+        cumulative = np.cumsum(points.to_numpy(), axis=1)
+        # A driver who shared cars (1950s) has several results in a round; chart the best one
+        positions = df.drop_duplicates(['driver_id', 'round']).pivot(index='driver_id', columns='round', values='position').reindex(index=points.index, columns=rounds['round'])
+        
+        drivers = {}
+        for i, driver_id in enumerate(points.index):
+            drivers[driver_id] = {
+                'points': points.iloc[i].tolist(),
+                'cumulativePoints': cumulative[i].tolist(),
+                'positions': [None if pd.isna(p) else p for p in positions.iloc[i]]
+            }
+        
+        return {
+            'year': year,
+            'rounds': [{'round': int(r), 'race': name} for r, name in zip(rounds['round'], rounds['race_name'])],
+            'drivers': drivers
+        }
+    
+    def compare_many(self, driver_ids, year=None):
+        """
+        Head-to-head matrix for N drivers (or 'all'): differences[metric][i][j]
+        is drivers[i] minus drivers[j] for points, wins and avgPoints.
+        Uses one standings fetch and one read of the season's results; until
+        the season is ingested, race counts come from each driver's results
+        instead, and 'complete' is False if any of those could not be fetched.
+        """
+        year = int(year or self.current_year)
+        standings_future = self.executor.submit(self.get_driver_standings, year)
+        race_counts = self._season_frame(year).groupby('driver_id')['round'].nunique()
+        standings = standings_future.result()
+        
+        by_id = {s['driverId']: s for s in standings}
+        ids = [s['driverId'] for s in standings] if driver_ids == 'all' else list(driver_ids)
+        missing = [driver_id for driver_id in ids if driver_id not in by_id]
+        if missing:
+            raise ValueError(f"Drivers not found: {', '.join(missing)}")
+        
+        complete = True
+        if race_counts.empty:
+            race_counts, complete = self._race_counts(ids, year)
+        
+        drivers = []
+        for driver_id in ids:
+            standing = by_id[driver_id]
+            races = int(race_counts.get(driver_id, 0))
+            drivers.append({
+                'id': driver_id,
+                'name': f"{standing['firstName']} {standing['lastName']}",
+                'team': standing['team'],
+                'points': standing['points'],
+                'wins': standing['wins'],
+                'position': standing['position'],
+                'avgPoints': round(standing['points'] / races, 2) if races else 0
+            })
+        
+        differences = {}
+        for metric in ('points', 'wins', 'avgPoints'):
+            values = np.array([d[metric] for d in drivers], dtype=float)
+            matrix = values[:, None] - values[None, :]
+            differences[metric] = np.round(matrix, 2).tolist()
+        
+        return {'year': year, 'drivers': drivers, 'differences': differences, 'complete': complete}
+    
+    def _race_counts(self, driver_ids, year):
+        """({driver_id: races with a result}, whether every count was fetched) from per-driver results"""
+        futures = {driver_id: self.executor.submit(self._get_driver_races, driver_id, year) for driver_id in driver_ids}
+        counts, complete = {}, True
+        for driver_id, future in futures.items():
+            try:
+                counts[driver_id] = len(future.result())
+            except Exception as e:
+                print(f"Error fetching races for {driver_id}: {e}")
+                complete = False
+        return counts, complete
+    
+    def _season_frame(self, year):
+        """
+        A season's stored results as a DataFrame. A season that was never
+        loaded (or is due a resync) is ingested in the background, so the
+        frame is empty until that finishes.
+        """
+        info = self.results_store.get_season_info(year)
+        if info is None or self._needs_resync(year, info):
+            self._sync_season_in_background(year)
+        
+        rows = self.results_store.get_season_results(year)
+        return pd.DataFrame(rows, columns=['round', 'race_name', 'driver_id', 'position', 'points'])
+    
+    def ingest_season(self, year):
+        """
+        Bulk-load a season's results into the local store, page by page.
+        Resumes from the last stored round (re-reading it to pick up late
+        penalties), so later calls only download new rounds.
+        """
+        year = int(year)
+        before = self.results_store.row_count(year)
+        offset = self.results_store.rows_before_last_round(year)
+        total = None
+        
+        while True:
+            url = f"{self.ergast_base_url}/{year}/results.json?limit={RESULTS_PAGE_SIZE}&offset={offset}"
+            data = self._fetch_json(url)
+            if not data:
+                break
+            
+            total = int(data['MRData']['total'])
+            inserted = self.results_store.insert_races(year, data['MRData']['RaceTable']['Races'])
+            offset += inserted
+            if inserted == 0 or offset >= total:
+                break
+        
+        if total is not None:
+            self.results_store.mark_checked(year, total)
+        return self.results_store.row_count(year) - before
+    
+    def _get_driver_races(self, driver_id, year):
+        """Race-by-race results for one driver in a season"""
+        races_data = self._get_stored_driver_races(driver_id, year)
+        if races_data is not None:
+            return races_data
+        
+        url = f"{self.ergast_base_url}/{year}/drivers/{driver_id}/results.json"
+        data = self._get_json(url, ttl=self._season_ttl(year, self._until_next_session(year)))
+        
+        if not data:
+            return ()
+        return self._parse_once(url, data, lambda data: tuple(
+            RaceResult.from_ergast(race) for race in data['MRData']['RaceTable']['Races'] if race['Results']
+        ))
+    
+    def _parse_once(self, url, data, parse):
+        """
+        parse(data) once per upstream payload. The upstream cache hands out the
+        same payload object until the entry is refreshed, so repeat requests
+        reuse the (immutable) records instead of rebuilding them.
+        """
+        with self._parsed_lock:
+            parsed = self._parsed.get(url)
+        if parsed is not None and parsed[0] is data:
+            return parsed[1]
+        records = parse(data)
+        with self._parsed_lock:
+            self._parsed[url] = (data, records)
+            self._parsed.move_to_end(url)
+            while len(self._parsed) > PARSE_MEMO_SIZE:
+                self._parsed.popitem(last=False)
+        return records
+    
+    def _get_stored_driver_races(self, driver_id, year):
+        """
+        Serve results from the local store once the season has been ingested.
+        Returns None (use the per-driver endpoint) until then; ingest and
+        incremental syncs run in the background.
+        """
+        info = self.results_store.get_season_info(year)
+        if info is None:
+            self._sync_season_in_background(year)
+            return None
+        
+        if self._needs_resync(year, info):
+            self._sync_season_in_background(year)
+        
+        return self.results_store.get_driver_results(driver_id, year)
+    
+    def _needs_resync(self, year, info):
+        """An unfinished season not synced for a while, unless the scheduler owns it"""
+        if self.scheduled_refresh and int(year) == self.current_year:
+            return False
+        complete = int(year) < self.current_year and info['rows'] >= info['total']
+        return not complete and time.time() - info['checkedAt'] > RESULTS_SYNC_INTERVAL
+    
+    def _sync_season_in_background(self, year):
+        """Run at most one ingest per season at a time"""
+        year = int(year)
+        with self._sync_lock:
+            if year in self._syncing:
+                return
+            self._syncing.add(year)
+        
+        def sync():
+            # One ingest per season across all worker processes too
+            file_lock = FileLock(os.path.join(self.cache.lock_dir, f'ingest-{year}.lock'))
+            try:
+                if file_lock.acquire(blocking=False):
+                    self.ingest_season(year)
+            except Exception as e:
+                print(f"Season ingest failed for {year}: {e}")
+            finally:
+                file_lock.release()
+                with self._sync_lock:
+                    self._syncing.discard(year)
+        
+        threading.Thread(target=sync, name=f'ingest-{year}', daemon=True).start()
+    
+    def _build_driver_detail(self, driver_id, standings, races_data):
+        """Merge a driver's standing with their race results"""
+        driver_standing = next((d for d in standings if d['driverId'] == driver_id), None)
+        
+        if not driver_standing:
+            return None
+        
+        return {
+            **driver_standing,
+            'races': races_data,
+            'totalRaces': len(races_data),
+            'avgPoints': round(driver_standing['points'] / len(races_data), 2) if races_data else 0
+        }
+    
+    def refresh_season(self, year=None):
+        """
+        Re-download the schedule, driver list and standings into the cache
+        (ignoring their TTLs) and sync the season's results. Returns the rounds
+        covered upstream, {'standings': n, 'results': n}, so callers can tell
+        whether a race has been published yet.
+        """
+        year = int(year or self.current_year)
+        schedule_url = f"{self.ergast_base_url}/{year}.json"
+        self._refresh_url(schedule_url, self._season_ttl(year, SCHEDULE_TTL))
+        
+        session_ttl = self._season_ttl(year, self._until_next_session(year))
+        if year == self.current_year:
+            self._refresh_url(f"{self.ergast_base_url}/{year}/drivers.json", self._season_ttl(year, DRIVERS_TTL))
+        standings = self._refresh_url(f"{self.ergast_base_url}/{year}/driverStandings.json", session_ttl)
+        self.ingest_season(year)
+        
+        standings_lists = standings['MRData']['StandingsTable']['StandingsLists'] if standings else []
+        return {
+            'standings': int(standings_lists[0]['round']) if standings_lists else 0,
+            'results': self.results_store.last_round(year)
+        }
+    
+    def _refresh_url(self, url, ttl):
+        """Fetch one URL now and replace its cache entry; returns the payload (None if unavailable)"""
+        data = self._fetch_json(url)
+        if data is not None:
+            self.cache.set(url, data, ttl)
+        return data
+    
+    def get_data_version(self, resource, year=None):
+        """
+        (version, seconds until stale) of the cached upstream payload behind
+        get_drivers() ('drivers') or get_driver_standings(year) ('standings').
+        version is None while the payload is missing or stale, so callers rebuild
+        and the normal refresh runs; seconds is None for finished seasons.
+        """
+        year = year or self.current_year
+        urls = {
+            'drivers': f"{self.ergast_base_url}/{self.current_year}/drivers.json",
+            'standings': f"{self.ergast_base_url}/{year}/driverStandings.json"
+        }
+        info = self.cache.get_version(urls[resource])
+        if info is None:
+            return None, 0
+        written_at, expires_at = info
+        return written_at, None if expires_at is None else max(0, expires_at - time.time())
+    
+    def get_cache_stats(self):
+        """Hit/miss/stale counters for the upstream cache"""
+        return self.cache.get_stats()
+    
+    def get_upstream_status(self):
+        """Circuit breaker state for the Ergast upstream"""
+        return self.breaker.get_status()
+    
+    def _get_json(self, url, ttl):
+        """GET an Ergast URL through the response cache"""
+        # Under the scheduler, stale current-season data is served as-is until it refreshes it
+        return self.cache.get_or_fetch(url, lambda: self._fetch_json(url), ttl, refresh_stale=not self.scheduled_refresh)
+    
+    def _fetch_json(self, url):
+        """
+        Blocking upstream GET guarded by the circuit breaker.
+        Returns None for non-200 responses so they are not cached;
+        raises UpstreamUnavailable without a network call while the circuit is open.
+        """
+        response = self._fetch(url)
+        return response.json() if response is not None else None
+    
+    def _fetch_bytes(self, url):
+        """Like _fetch_json but returns the undecoded body, for parsing elsewhere"""
+        response = self._fetch(url)
+        return response.content if response is not None else None
+    
+    def _fetch(self, url):
+        resource = self._resource_name(url)
+        try:
+            self.breaker.before_request(url)
+        except UpstreamUnavailable:
+            UPSTREAM_REQUESTS.inc(resource=resource, status='short_circuited')
+            raise
+        
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=5)
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, resource=resource)
+            UPSTREAM_REQUESTS.inc(resource=resource, status=response.status_code)
+            if response.status_code == 429:
+                raise requests.HTTPError("HTTP 429 (throttled)", response=response)
+            if response.status_code not in (200, 404):
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        except requests.HTTPError as e:
+            retry_after = self._retry_after(response) if response.status_code == 429 else None
+            self.breaker.record_failure(url, e, retry_after)
+            raise
+        except Exception as e:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, resource=resource)
+            UPSTREAM_REQUESTS.inc(resource=resource, status=type(e).__name__)
+            self.breaker.record_failure(url, e)
+            raise
+        
+        if response.status_code == 200:
+            self.breaker.record_success()
+            return response
+        
+        # Only a 404 is a real miss; throttling and other errors count as failures above
+        self.breaker.record_not_found(url)
+        return None
+    
+    def _retry_after(self, response):
+        """Seconds from a Retry-After header (delay or HTTP date), capped; None if absent or unreadable"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value) if value.strip().isdigit() else (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, min(seconds, MAX_RETRY_AFTER))
+    
+    def _resource_name(self, url):
+        """Low-cardinality label for an Ergast URL, e.g. '/2024/drivers/norris/results.json' -> 'driver_results'"""
+        path = url[len(self.ergast_base_url):].split('?')[0].strip('/')
+        parts = path[:-len('.json')].split('/') if path.endswith('.json') else path.split('/')
+        if len(parts) == 1:
+            return 'schedule'
+        if len(parts) >= 4 and parts[1] == 'drivers':
+            return f'driver_{parts[-1]}'
+        return parts[-1]
+    
+    def _season_ttl(self, year, ttl):
+        """Finished seasons never change, so cache them forever"""
+        return None if int(year) < self.current_year else ttl
+    
+    def get_schedule(self, year):
+        """
+        Season calendar: one entry per round with the race start and every
+        session start as aware UTC datetimes. Empty if the schedule is unavailable.
+        """
+        url = f"{self.ergast_base_url}/{year}.json"
+        data = self._get_json(url, ttl=self._season_ttl(year, SCHEDULE_TTL))
+        if not data:
+            return []
+        
+        schedule = []
+        for race in data['MRData']['RaceTable']['Races']:
+            sessions = [race[key] for key in SESSION_KEYS if key in race] + [race]
+            schedule.append({
+                'round': int(race['round']),
+                'name': race['raceName'],
+                'start': self._parse_session_time(race),
+                'sessions': [start for start in map(self._parse_session_time, sessions) if start]
+            })
+        return schedule
+    
+    def get_remaining_rounds(self, year):
+        """Number of races in the season that have not started yet"""
+        try:
+            now = datetime.now(timezone.utc)
+            return sum(1 for race in self.get_schedule(year) if race['start'] and race['start'] > now)
+        except Exception as e:
+            print(f"Schedule Error: {e}. Assuming no remaining rounds.")
+            return 0
+    
+    def _until_next_session(self, year):
+        """Seconds until the next scheduled session of the season, used as the TTL for standings/results"""
+        try:
+            now = datetime.now(timezone.utc)
+            upcoming = [
+                start for race in self.get_schedule(year)
+                for start in race['sessions'] if start > now
+            ]
+            
+            if not upcoming:
+                return DEFAULT_SESSION_TTL
+            return max(MIN_SESSION_TTL, (min(upcoming) - now).total_seconds())
+        except Exception as e:
+            print(f"Schedule Error: {e}. Using default TTL.")
+            return DEFAULT_SESSION_TTL
+    
+    def _parse_session_time(self, session):
+        """Parse Ergast's separate date/time fields into an aware UTC datetime"""
+        if 'date' not in session:
+            return None
+        time_part = session.get('time', '00:00:00Z').rstrip('Z')
+        return datetime.fromisoformat(f"{session['date']}T{time_part}").replace(tzinfo=timezone.utc)
+    
     def _get_mock_drivers(self):
         """Mock driver data for fallback"""
-        return [
+        MOCK_FALLBACKS.inc(resource='drivers')
+        return tuple(Driver(**driver) for driver in [
             {'id': 'piastri', 'firstName': 'Oscar', 'lastName': 'Piastri', 'nationality': 'Australian', 'number': '81', 'code': 'PIA'},
             {'id': 'norris', 'firstName': 'Lando', 'lastName': 'Norris', 'nationality': 'British', 'number': '4', 'code': 'NOR'},
             {'id': 'leclerc', 'firstName': 'Charles', 'lastName': 'Leclerc', 'nationality': 'Monegasque', 'number': '16', 'code': 'LEC'},
@@ -199,11 +640,12 @@ class DataProcessor:
             {'id': 'antonelli', 'firstName': 'Kimi', 'lastName': 'Antonelli', 'nationality': 'Italian', 'number': '12', 'code': 'ANT'},
             {'id': 'max_verstappen', 'firstName': 'Max', 'lastName': 'Verstappen', 'nationality': 'Dutch', 'number': '1', 'code': 'VER'},
             {'id': 'tsunoda', 'firstName': 'Yuki', 'lastName': 'Tsunoda', 'nationality': 'Japanese', 'number': '22', 'code': 'TSU'}
-        ]
+        ])
     
     def _get_mock_standings(self):
         """Mock standings data for fallback"""
-        return [
+        MOCK_FALLBACKS.inc(resource='standings')
+        return tuple(Standing(**standing) for standing in [
             {'position': 1, 'points': 324, 'wins': 5, 'driverId': 'piastri', 'firstName': 'Oscar', 'lastName': 'Piastri', 'nationality': 'Australian', 'team': 'McLaren'},
             {'position': 2, 'points': 293, 'wins': 4, 'driverId': 'norris', 'firstName': 'Lando', 'lastName': 'Norris', 'nationality': 'British', 'team': 'McLaren'},
             {'position': 3, 'points': 230, 'wins': 3, 'driverId': 'max_verstappen', 'firstName': 'Max', 'lastName': 'Verstappen', 'nationality': 'Dutch', 'team': 'Red Bull Racing'},
@@ -212,4 +654,4 @@ class DataProcessor:
             {'position': 6, 'points': 117, 'wins': 0, 'driverId': 'hamilton', 'firstName': 'Lewis', 'lastName': 'Hamilton', 'nationality': 'British', 'team': 'Ferrari'},
             {'position': 7, 'points': 70, 'wins': 0, 'driverId': 'albon', 'firstName': 'Alexander', 'lastName': 'Albon', 'nationality': 'Thai', 'team': 'Williams'},
             {'position': 8, 'points': 60, 'wins': 0, 'driverId': 'antonelli', 'firstName': 'Kimi', 'lastName': 'Antonelli', 'nationality': 'Italian', 'team': 'Mercedes'}
-        ]
\ No newline at end of file
+        ])
\ No newline at end of file
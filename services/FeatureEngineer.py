@@ -0,0 +1,258 @@
+# services/FeatureEngineer.py
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+from services.UpstreamCache import DEFAULT_CACHE_DIR
+
+# Races in the recent-form window and the points that count as perfect form
+RECENT_FORM_WINDOW = 5
+MAX_RACE_POINTS = 25
+# How often (seconds) to look for newly ingested rounds
+FEATURE_CHECK_INTERVAL = 30
+# Bumped when the saved state layout changes
+STATE_FORMAT = 2
+
+
+class FeatureEngineer:
+    """
+    Computes the podium model's five features for every driver from real race results.
+
+    Per-driver and per-team running aggregates (races, points, wins, podiums,
+    last-N points) are built once with pandas groupby. Rounds before the latest
+    one are settled into those aggregates; the latest round is kept as rows and
+    re-read on every check, because results can still be added to it (paged or
+    concurrent ingests, late penalties). A check therefore reads only rounds
+    >= the latest one and folds them in at O(drivers) cost. The state and the
+    derived feature table are saved as JSON under the cache directory,
+    versioned by "<year>-r<round>-<digest of the latest round>".
+    """
+
+    def __init__(self, data_processor, feature_dir=None):
+        self.data_processor = data_processor
+        cache_dir = os.environ.get('F1_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.feature_dir = feature_dir or os.path.join(cache_dir, 'features')
+        self._states = {}
+        self._next_check = {}
+        # _lock guards the dicts above; _refresh_lock serializes refreshes, which
+        # read the store and may fetch driver names, without blocking readers
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def get_features(self, year=None):
+        """
+        Feature rows ({'name', 'team', 'avg_points', ...}) plus the feature table version,
+        or (None, None) when the season has no ingested results yet.
+        """
+        year = int(year or self.data_processor.current_year)
+        with self._lock:
+            due = time.time() >= self._next_check.get(year, 0)
+            if due:
+                self._next_check[year] = time.time() + FEATURE_CHECK_INTERVAL
+
+        # A refresh already running elsewhere will publish its result; serve the current one
+        if due and self._refresh_lock.acquire(blocking=False):
+            try:
+                state = self._refresh(year)
+            finally:
+                self._refresh_lock.release()
+        else:
+            state = self._current_state(year)
+
+        if state is None:
+            return None, None
+        return state['features'], state['version']
+
+    def refresh(self, year=None):
+        """Fold newly ingested rounds in now rather than at the next periodic check; returns the version"""
+        year = int(year or self.data_processor.current_year)
+        with self._lock:
+            self._next_check[year] = time.time() + FEATURE_CHECK_INTERVAL
+        with self._refresh_lock:
+            state = self._refresh(year)
+        return state['version'] if state else None
+
+    def _current_state(self, year):
+        with self._lock:
+            state = self._states.get(year)
+        if state is None:
+            state = self._load_state(year)
+            if state is not None:
+                with self._lock:
+                    state = self._states.setdefault(year, state)
+        return state
+
+    def _refresh(self, year):
+        """Bring the aggregates up to the latest stored round; call with _refresh_lock held"""
+        state = self._current_state(year)
+        store = self.data_processor.results_store
+
+        if state is None:
+            rows = store.get_season_results(year)
+            if not rows:
+                return None
+            state = self._build_state(year, rows)
+        else:
+            rows = store.get_season_results(year, from_round=state['lastRound'])
+            if not rows or _digest(rows) == state['lastRoundDigest']:
+                return state
+            state = self._advance(state, rows)
+
+        self._derive_features(state)
+        self._save_state(year, state)
+        with self._lock:
+            self._states[year] = state
+        return state
+
+    def _build_state(self, year, rows):
+        """State for a whole season: every round but the latest settled in one vectorized pass"""
+        last_round = max(row['round'] for row in rows)
+        settled = _aggregate([row for row in rows if row['round'] < last_round])
+        return self._with_last_round({
+            'format': STATE_FORMAT,
+            'year': year,
+            'settled': settled,
+            'settledRound': max((row['round'] for row in rows if row['round'] < last_round), default=0)
+        }, [row for row in rows if row['round'] == last_round])
+
+    def _advance(self, state, rows):
+        """
+        New state from the stored rows of rounds >= state['lastRound']: every
+        round but the latest is settled (the previous latest one re-read in
+        full), and the latest is kept as rows
+        """
+        last_round = max(row['round'] for row in rows)
+        settled = copy.deepcopy(state['settled'])
+        for round_ in sorted({row['round'] for row in rows if row['round'] < last_round}):
+            _apply_round(settled, [row for row in rows if row['round'] == round_])
+        return self._with_last_round({
+            **state,
+            'settled': settled,
+            'settledRound': max((row['round'] for row in rows if row['round'] < last_round), default=state['settledRound'])
+        }, [row for row in rows if row['round'] == last_round])
+
+    def _with_last_round(self, state, last_rows):
+        """Aggregates including the latest round, and a digest to notice changes to it"""
+        current = copy.deepcopy(state['settled'])
+        _apply_round(current, last_rows)
+        return {
+            **state,
+            'lastRound': last_rows[0]['round'],
+            'lastRoundDigest': _digest(last_rows),
+            'drivers': current['drivers'],
+            'teams': current['teams']
+        }
+
+    def _derive_features(self, state):
+        """Feature rows from the aggregates, in the units the model was trained on"""
+        team_avg = {name: t['points'] / t['rounds'] for name, t in state['teams'].items() if t['rounds']}
+        best_team = max(team_avg.values(), default=0) or 1.0
+        names = self._driver_names(state['year'])
+
+        features = []
+        for driver_id, d in state['drivers'].items():
+            if not d['races']:
+                continue
+            features.append({
+                'driverId': driver_id,
+                'name': names.get(driver_id, driver_id.replace('_', ' ').title()),
+                'team': d['team'],
+                'avg_points': round(d['points'] / d['races'], 2),
+                'recent_form': round(min(sum(d['recent']) / len(d['recent']) / MAX_RACE_POINTS, 1.0), 2),
+                'team_performance': round(team_avg.get(d['team'], 0) / best_team, 2),
+                'wins': d['wins'],
+                'podiums': d['podiums']
+            })
+
+        state['features'] = features
+        state['version'] = f"{state['year']}-r{state['lastRound']}-{state['lastRoundDigest'][:8]}"
+
+    def _driver_names(self, year):
+        standings = self.data_processor.get_driver_standings(year)
+        return {s['driverId']: f"{s['firstName']} {s['lastName']}" for s in standings}
+
+    def _state_path(self, year):
+        return os.path.join(self.feature_dir, f'{year}.json')
+
+    def _load_state(self, year):
+        try:
+            with open(self._state_path(year)) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        # Older layouts are rebuilt from the store
+        return state if state.get('format') == STATE_FORMAT else None
+
+    def _save_state(self, year, state):
+        os.makedirs(self.feature_dir, exist_ok=True)
+        path = self._state_path(year)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+
+def _aggregate(rows):
+    """Per-driver and per-team aggregates of some rounds' rows in one vectorized pass"""
+    if not rows:
+        return {'drivers': {}, 'teams': {}}
+    df = pd.DataFrame(rows).sort_values(['round', 'driver_id'])
+    position = pd.to_numeric(df['position'], errors='coerce')
+    df['win'] = (position == 1).astype(int)
+    df['podium'] = (position <= 3).astype(int)
+
+    by_driver = df.groupby('driver_id')
+    totals = by_driver.agg(races=('round', 'count'), points=('points', 'sum'), wins=('win', 'sum'), podiums=('podium', 'sum'))
+    recent = by_driver.tail(RECENT_FORM_WINDOW).groupby('driver_id')['points'].agg(list)
+    team = by_driver['constructor'].last()
+
+    team_rounds = df.groupby(['constructor', 'round'])['points'].sum().groupby('constructor').agg(['sum', 'count'])
+
+    drivers = {}
+    for driver_id, row in totals.iterrows():
+        drivers[driver_id] = {
+            'races': int(row['races']),
+            'points': float(row['points']),
+            'wins': int(row['wins']),
+            'podiums': int(row['podiums']),
+            'recent': [float(p) for p in recent[driver_id]],
+            'team': team[driver_id]
+        }
+    teams = {
+        name: {'points': float(row['sum']), 'rounds': int(row['count'])}
+        for name, row in team_rounds.iterrows()
+    }
+    return {'drivers': drivers, 'teams': teams}
+
+
+def _apply_round(aggregates, rows):
+    """Fold one round's results into running aggregates"""
+    team_points = {}
+    for row in rows:
+        driver = aggregates['drivers'].setdefault(row['driver_id'], {
+            'races': 0, 'points': 0.0, 'wins': 0, 'podiums': 0, 'recent': [], 'team': row['constructor']
+        })
+        try:
+            position = int(row['position'])
+        except (TypeError, ValueError):
+            position = None
+
+        driver['races'] += 1
+        driver['points'] += row['points']
+        driver['wins'] += position == 1
+        driver['podiums'] += position is not None and position <= 3
+        driver['recent'] = (driver['recent'] + [row['points']])[-RECENT_FORM_WINDOW:]
+        driver['team'] = row['constructor']
+        team_points[row['constructor']] = team_points.get(row['constructor'], 0.0) + row['points']
+
+    for name, points in team_points.items():
+        team = aggregates['teams'].setdefault(name, {'points': 0.0, 'rounds': 0})
+        team['points'] += points
+        team['rounds'] += 1
+
+
+def _digest(rows):
+    return hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
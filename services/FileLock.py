@@ -0,0 +1,57 @@
+# services/FileLock.py
+import hashlib
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): locks are no-ops, which is correct for a single process
+    fcntl = None
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file, shared by every process on the host.
+
+    Used for cross-worker single-flight: only the worker holding a key's lock
+    fetches or builds it; the others wait (or skip) and then read the result
+    from the shared store. The OS releases the lock if the holder dies.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @classmethod
+    def for_key(cls, directory, key):
+        """Lock file for an arbitrary key (hashed to a safe file name)"""
+        return cls(os.path.join(directory, hashlib.sha1(key.encode()).hexdigest() + '.lock'))
+
+    def acquire(self, blocking=True):
+        """Take the lock; with blocking=False returns False instead of waiting"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def locked(self):
+        return self._fd is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,159 @@
+# services/ForestCompiler.py
+import os
+import sys
+import numpy as np
+
+
+ARRAY_NAMES = ('feature', 'threshold', 'children', 'leaf_value', 'roots')
+
+# Largest allowed difference between compiled and sklearn probabilities at export time
+PARITY_TOLERANCE = 1e-9
+
+
+class CompiledForest:
+    """
+    A RandomForestClassifier flattened into contiguous NumPy arrays.
+
+    All trees share one node table; children[2 * i] / children[2 * i + 1]
+    are node i's left / right child. Leaves point at themselves with an
+    infinite threshold, so every sample can take exactly max_depth steps
+    with no branching. The StandardScaler is folded into the thresholds
+    (including sklearn's float32 rounding of the scaled input), so
+    predict_proba takes raw (unscaled) features and never touches sklearn.
+    """
+
+    def __init__(self, feature, threshold, children, leaf_value, roots):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.n_trees = len(roots)
+        self.max_depth = self._depth()
+
+    def predict_proba(self, X):
+        """Class probabilities for raw feature rows, shape (n_samples, n_classes)"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        # Offset of each sample's row in flat_X, one column per tree
+        row_start = np.repeat(np.arange(n_samples) * n_features, self.n_trees)
+        node = np.tile(self.roots, n_samples)
+
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_start + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+
+        return self.leaf_value[node].reshape(n_samples, self.n_trees, -1).sum(axis=1) / self.n_trees
+
+    def save(self, directory):
+        """One .npy per array so they can be memory-mapped independently"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(**arrays)
+
+    def _depth(self):
+        """Longest root-to-leaf path, found by stepping every root until all are at leaves"""
+        node = np.asarray(self.roots).copy()
+        depth = 0
+        while True:
+            is_leaf = self.children[2 * node] == node
+            if is_leaf.all():
+                return depth
+            # Step every internal node to both children; leaves stay put
+            inner = node[~is_leaf]
+            node = np.concatenate([self.children[2 * inner], self.children[2 * inner + 1], node[is_leaf]])
+            depth += 1
+
+
+def compile_forest(model, scaler=None):
+    """Flatten a fitted RandomForestClassifier (and optional StandardScaler) into a CompiledForest"""
+    features, thresholds, children, leaf_values, roots = [], [], [], [], []
+    offset = 0
+
+    mean = scaler.mean_ if scaler is not None else None
+    scale = scaler.scale_ if scaler is not None else None
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+        threshold = tree.threshold.astype(np.float64)
+        if scaler is not None:
+            threshold = _fold_scaling(threshold, mean[feature], scale[feature])
+        threshold = np.where(is_leaf, np.inf, threshold)
+
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+        # Same per-leaf normalisation sklearn applies in DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+
+        features.append(feature)
+        thresholds.append(threshold)
+        children.append(np.column_stack([left, right]).ravel().astype(np.int32))
+        leaf_values.append(value / totals)
+        roots.append(offset)
+        offset += tree.node_count
+
+    return CompiledForest(
+        feature=np.ascontiguousarray(np.concatenate(features)),
+        threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+        children=np.ascontiguousarray(np.concatenate(children)),
+        leaf_value=np.ascontiguousarray(np.concatenate(leaf_values)),
+        roots=np.array(roots, dtype=np.int32)
+    )
+
+
+def _fold_scaling(threshold, mean, scale):
+    """
+    Map thresholds on scaled features back to raw feature space.
+
+    sklearn tests float32((x - mean) / scale) <= t. Algebraically that is
+    x <= t * scale + mean, but the float32 rounding moves the boundary by a
+    few ulps, so bisect for the largest float64 x that still goes left.
+    """
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    guess = threshold * scale + mean
+    margin = np.abs(guess) * 1e-5 + 1e-5
+    lo, hi = guess - margin, guess + margin
+    # Widen until lo goes left and hi goes right (normally already true)
+    while not (goes_left(lo).all() and not goes_left(hi).any()):
+        margin *= 2
+        lo, hi = np.where(goes_left(lo), lo, guess - margin), np.where(goes_left(hi), guess + margin, hi)
+
+    for _ in range(200):
+        mid = lo + (hi - lo) / 2
+        left = goes_left(mid)
+        lo, hi = np.where(left, mid, lo), np.where(left, hi, mid)
+        if (np.nextafter(lo, np.inf) >= hi).all():
+            break
+    return lo
+
+
+def check_parity(compiled, model, scaler, X):
+    """Max absolute difference between compiled and sklearn probabilities on raw rows X"""
+    X = np.asarray(X, dtype=np.float64)
+    expected = model.predict_proba(scaler.transform(X) if scaler is not None else X)
+    return float(np.abs(compiled.predict_proba(X) - expected).max())
+
+
+if __name__ == '__main__':
+    # Usage: python -m services.ForestCompiler [version]  (re-exports an existing artifact)
+    from services.ModelRegistry import ModelRegistry
+
+    registry = ModelRegistry()
+    version = sys.argv[1] if len(sys.argv) > 1 else registry.current_version()
+    registry.export_compiled(version)
+    print(f"✓ Compiled forest exported for model version {version}")
@@ -0,0 +1,238 @@
+# services/HistoryBackfill.py
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from services.ResultsStore import driver_row, result_rows
+
+FIRST_SEASON = 1950
+RESOURCES = ('results', 'qualifying', 'standings')
+
+# Ergast page cap, and how hard the backfill may hit the upstream
+PAGE_SIZE = 100
+FETCH_WORKERS = 4
+MAX_REQUESTS_PER_SECOND = 4.0
+
+
+def parse_results_page(raw):
+    """One page of /<year>/results.json -> (page info, result rows, driver rows)"""
+    data = json.loads(raw)['MRData']
+    races = data['RaceTable']['Races']
+    drivers = {r['Driver']['driverId']: driver_row(r['Driver']) for race in races for r in race.get('Results', [])}
+    return _page_info(data), result_rows(data['RaceTable']['season'], races), list(drivers.values())
+
+
+def parse_qualifying_page(raw):
+    """One page of /<year>/qualifying.json -> (page info, qualifying rows, driver rows)"""
+    data = json.loads(raw)['MRData']
+    rows, drivers = [], {}
+    for race in data['RaceTable']['Races']:
+        for result in race.get('QualifyingResults', []):
+            driver = result['Driver']
+            drivers[driver['driverId']] = driver_row(driver)
+            rows.append((
+                int(race['season']), int(race['round']), driver['driverId'],
+                result.get('Constructor', {}).get('name'),
+                int(result['position']) if result.get('position') else None,
+                result.get('Q1'), result.get('Q2'), result.get('Q3')
+            ))
+    return _page_info(data), rows, list(drivers.values())
+
+
+def _page_info(data):
+    """(total rows, page size the server applied); servers may cap the requested limit"""
+    return int(data['total']), int(data.get('limit') or PAGE_SIZE)
+
+
+def parse_standings(raw):
+    """/<year>/<round>/driverStandings.json -> (standings rows, driver rows)"""
+    rows, drivers = [], {}
+    for standings in json.loads(raw)['MRData']['StandingsTable']['StandingsLists']:
+        for standing in standings['DriverStandings']:
+            driver = standing['Driver']
+            drivers[driver['driverId']] = driver_row(driver)
+            constructors = standing.get('Constructors') or [{}]
+            rows.append((
+                int(standings['season']), int(standings['round']), driver['driverId'],
+                int(standing['position']) if standing.get('position') else None,
+                standing.get('positionText'), float(standing.get('points', 0)), int(standing.get('wins', 0)),
+                constructors[-1].get('name')
+            ))
+    return rows, list(drivers.values())
+
+
+class HistoryBackfill:
+    """
+    Loads past seasons into the ResultsStore: race results, qualifying and the
+    driver standings after every round.
+
+    Downloads run on a small thread pool, throttled to Ergast's rate limit; JSON
+    parsing runs on a process pool and the calling thread writes the rows.
+    Seasons already complete in the store are skipped, so an interrupted
+    backfill resumes where it stopped.
+    """
+
+    def __init__(self, data_processor, fetch_workers=FETCH_WORKERS, parse_workers=None,
+                 max_requests_per_second=MAX_REQUESTS_PER_SECOND):
+        self.data_processor = data_processor
+        self.store = data_processor.results_store
+        self.fetch_workers = fetch_workers
+        # 0 parses in this process (no pool)
+        self.parse_workers = os.cpu_count() if parse_workers is None else parse_workers
+        self.min_interval = 1.0 / max_requests_per_second if max_requests_per_second else 0.0
+        self._next_request = 0.0
+        self._rate_lock = threading.Lock()
+        self._parse_pool = None
+        self._fetch_pool = None
+
+    def run(self, years, resources=RESOURCES):
+        """Backfill the given seasons; returns per-resource counts and the elapsed time"""
+        years = sorted(set(int(year) for year in years))
+        report = {resource: {'seasons': 0, 'rows': 0, 'requests': 0, 'failed': 0} for resource in resources}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(self.fetch_workers, thread_name_prefix='backfill-fetch') as fetch_pool:
+            parse_pool = ProcessPoolExecutor(self.parse_workers) if self.parse_workers else None
+            self._fetch_pool, self._parse_pool = fetch_pool, parse_pool
+            try:
+                if 'results' in resources:
+                    pending = [year for year in years if not self._complete(year, self.store.get_season_info(year))]
+                    self._backfill_paged('results', pending, parse_results_page, report['results'])
+                if 'qualifying' in resources:
+                    pending = [year for year in years if not self._complete(year, self.store.get_backfill_status(year, 'qualifying'))]
+                    self._backfill_paged('qualifying', pending, parse_qualifying_page, report['qualifying'])
+                if 'standings' in resources:
+                    self._backfill_standings(years, report['standings'])
+            finally:
+                if parse_pool is not None:
+                    parse_pool.shutdown()
+
+        report['seconds'] = round(time.perf_counter() - start, 2)
+        return report
+
+    def _backfill_paged(self, resource, years, parser, counts):
+        """Results or qualifying: first pages give each season's size, then the rest are fetched together"""
+        url = lambda year, offset: (
+            f"{self.data_processor.ergast_base_url}/{year}/{resource}.json?limit={PAGE_SIZE}&offset={offset}"
+        )
+        # Completeness counts the upstream rows received, so rows the table
+        # collapses (e.g. a shared car in qualifying) don't keep a season pending
+        totals, received = {}, {}
+        for (year, _), ((total, limit), rows, drivers) in self._pipeline([((y, 0), url(y, 0)) for y in years], parser, counts):
+            totals[year] = total, limit
+            received[year] = len(rows)
+            counts['rows'] += self._write(resource, rows, drivers)
+
+        rest = [
+            ((year, offset), url(year, offset))
+            for year, (total, limit) in totals.items() for offset in range(limit, total, limit)
+        ]
+        for (year, _), (_, rows, drivers) in self._pipeline(rest, parser, counts):
+            received[year] += len(rows)
+            counts['rows'] += self._write(resource, rows, drivers)
+
+        for year, (total, _) in totals.items():
+            if resource == 'results':
+                self.store.mark_checked(year, total)
+            else:
+                self.store.mark_backfilled(year, resource, received[year], total)
+            counts['seasons'] += 1
+
+    def _backfill_standings(self, years, counts):
+        """Standings after every round that has stored results and no stored standings yet"""
+        jobs, rounds = [], {}
+        for year in years:
+            stored = set(self.store.rounds(year, 'driver_standings'))
+            if year >= self.data_processor.current_year and stored:
+                # The latest round of a running season may still change (penalties)
+                stored.discard(max(stored))
+            missing = [round_ for round_ in self.store.rounds(year) if round_ not in stored]
+            if missing:
+                rounds[year] = len(self.store.rounds(year))
+                jobs += [
+                    ((year, round_), f"{self.data_processor.ergast_base_url}/{year}/{round_}/driverStandings.json")
+                    for round_ in missing
+                ]
+
+        for _, (rows, drivers) in self._pipeline(jobs, parse_standings, counts):
+            counts['rows'] += self._write('driver_standings', rows, drivers)
+
+        for year, total in rounds.items():
+            self.store.mark_backfilled(year, 'standings', len(self.store.rounds(year, 'driver_standings')), total)
+            counts['seasons'] += 1
+
+    def _pipeline(self, jobs, parser, counts):
+        """
+        Fetch [(key, url)] concurrently and parse each body on the process pool
+        as soon as it arrives; yields (key, parsed) in completion order.
+        Failed requests are counted and skipped (a rerun picks them up).
+        """
+        fetches = {self._fetch_pool.submit(self._fetch, url): key for key, url in jobs}
+        parses = {}
+        for future in as_completed(fetches):
+            counts['requests'] += 1
+            try:
+                raw = future.result()
+            except Exception as e:
+                raw = None
+                print(f"Backfill fetch failed {fetches[future]}: {e}")
+            if raw is None:
+                counts['failed'] += 1
+            elif self._parse_pool is None:
+                yield fetches[future], parser(raw)
+            else:
+                parses[self._parse_pool.submit(parser, raw)] = fetches[future]
+
+        for future in as_completed(parses):
+            yield parses[future], future.result()
+
+    def _fetch(self, url):
+        """Upstream GET (through the circuit breaker) spaced at least min_interval apart"""
+        with self._rate_lock:
+            wait = self._next_request - time.monotonic()
+            self._next_request = max(self._next_request, time.monotonic()) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+        return self.data_processor._fetch_bytes(url)
+
+    def _write(self, table, rows, drivers):
+        self.store.insert_rows('drivers', drivers)
+        return self.store.insert_rows(table, rows)
+
+    def _complete(self, year, status):
+        """A finished season whose stored rows cover the upstream total"""
+        return status is not None and year < self.data_processor.current_year and status['rows'] >= status['total']
+
+
+def parse_years(specs):
+    """['1950-1959', '2024'] -> [1950, ..., 1959, 2024]"""
+    years = []
+    for spec in specs:
+        first, _, last = spec.partition('-')
+        years += range(int(first), int(last or first) + 1)
+    return years
+
+
+if __name__ == '__main__':
+    # Usage: python -m services.HistoryBackfill 1950-2024 [--resources results standings] [--parse-workers 4]
+    parser = argparse.ArgumentParser(description='Load past seasons into the local results store')
+    parser.add_argument('years', nargs='*', help=f'seasons or ranges (default: {FIRST_SEASON}-last season)')
+    parser.add_argument('--resources', nargs='+', choices=RESOURCES, default=list(RESOURCES))
+    parser.add_argument('--fetch-workers', type=int, default=FETCH_WORKERS)
+    parser.add_argument('--parse-workers', type=int, default=None, help='parser processes (0 = parse in this process)')
+    parser.add_argument('--rate', type=float, default=MAX_REQUESTS_PER_SECOND, help='max upstream requests per second (0 = unlimited)')
+    args = parser.parse_args()
+
+    from services.DataProcessor import DataProcessor
+
+    processor = DataProcessor()
+    years = parse_years(args.years) if args.years else range(FIRST_SEASON, datetime.now().year)
+    report = HistoryBackfill(processor, args.fetch_workers, args.parse_workers, args.rate).run(years, args.resources)
+    for resource in args.resources:
+        counts = report[resource]
+        print(f"✓ {resource}: {counts['seasons']} seasons, {counts['rows']} rows, "
+              f"{counts['requests']} requests ({counts['failed']} failed)")
+    print(f"Done in {report['seconds']}s")
@@ -0,0 +1,168 @@
+# services/HistoryService.py
+from datetime import datetime
+
+# How long browsers may reuse a history response (it only changes when a backfill runs)
+HISTORY_MAX_AGE = 3600
+
+SEASON_SQL = '''
+    SELECT driver_id AS driverId, year,
+           GROUP_CONCAT(DISTINCT constructor) AS teams,
+           COUNT(*) AS starts,
+           SUM(position_text = '1') AS wins,
+           SUM(position_text IN ('1', '2', '3')) AS podiums,
+           SUM(points) AS points,
+           SUM(position_text NOT GLOB '[0-9]*') AS dnfs,
+           SUM(grid = 1) AS gridPoles,
+           MIN(CASE WHEN position_text GLOB '[0-9]*' THEN CAST(position_text AS INTEGER) END) AS bestFinish
+    FROM results
+    WHERE driver_id IN ({ids}) AND year BETWEEN ? AND ?
+    GROUP BY driver_id, year
+    ORDER BY driver_id, year
+'''
+
+POLES_SQL = '''
+    SELECT driver_id AS driverId, year, COUNT(*) AS poles
+    FROM qualifying
+    WHERE driver_id IN ({ids}) AND year BETWEEN ? AND ? AND position = 1
+    GROUP BY driver_id, year
+'''
+
+# Standings after the last stored round of each season
+FINAL_STANDINGS_SQL = '''
+    SELECT s.driver_id AS driverId, s.year, s.position
+    FROM driver_standings s
+    WHERE s.driver_id IN ({ids}) AND s.year BETWEEN ? AND ?
+      AND s.round = (SELECT MAX(round) FROM driver_standings WHERE year = s.year)
+'''
+
+
+class HistoryService:
+    """
+    Career and multi-season queries over the local results store (filled by
+    services.HistoryBackfill). Each request is a few indexed, aggregated SQL
+    queries; nothing is fetched from upstream.
+    """
+
+    def __init__(self, results_store):
+        self.store = results_store
+
+    def get_coverage(self):
+        """Which seasons are loaded, per resource"""
+        return self.store.get_coverage()
+
+    def get_career(self, driver_id):
+        """A driver's career totals and per-season breakdown"""
+        driver = self._driver(driver_id)
+        seasons = self._seasons([driver_id])[driver_id]
+        if not seasons:
+            raise KeyError(f"No stored results for {driver_id}")
+
+        current_year = datetime.now().year
+        starts = sum(s['starts'] for s in seasons)
+        wins = sum(s['wins'] for s in seasons)
+        podiums = sum(s['podiums'] for s in seasons)
+        finishes = [s['bestFinish'] for s in seasons if s['bestFinish'] is not None]
+        return {
+            'driver': driver,
+            'totals': {
+                'seasons': len(seasons),
+                'firstSeason': seasons[0]['year'],
+                'lastSeason': seasons[-1]['year'],
+                'starts': starts,
+                'wins': wins,
+                'podiums': podiums,
+                'poles': sum(s['poles'] for s in seasons),
+                'points': round(sum(s['points'] for s in seasons), 1),
+                'dnfs': sum(s['dnfs'] for s in seasons),
+                'championships': sum(1 for s in seasons if s['championshipPosition'] == 1 and s['year'] < current_year),
+                'bestFinish': min(finishes) if finishes else None,
+                'winRate': round(wins / starts, 3) if starts else 0.0,
+                'podiumRate': round(podiums / starts, 3) if starts else 0.0
+            },
+            'seasons': seasons
+        }
+
+    def compare_seasons(self, driver_ids, first_year=None, last_year=None):
+        """
+        Season-by-season stats for several drivers over a span of years, each
+        season with its change from that driver's previous season.
+        """
+        drivers = {driver_id: self._driver(driver_id) for driver_id in driver_ids}
+        seasons = self._seasons(driver_ids, first_year, last_year)
+
+        for rows in seasons.values():
+            previous = None
+            for season in rows:
+                season['pointsPerRace'] = round(season['points'] / season['starts'], 2) if season['starts'] else 0.0
+                season['change'] = None if previous is None else {
+                    key: _difference(season[key], previous[key])
+                    for key in ('points', 'pointsPerRace', 'wins', 'podiums', 'championshipPosition')
+                }
+                previous = season
+
+        years = sorted({season['year'] for rows in seasons.values() for season in rows})
+        return {'years': years, 'drivers': drivers, 'seasons': seasons}
+
+    def get_standings(self, year, round_=None):
+        """Driver standings after a given round (default: the latest stored) of a season"""
+        rounds = self.store.rounds(year, 'driver_standings')
+        if not rounds:
+            raise KeyError(f"No stored standings for {year}")
+        round_ = rounds[-1] if round_ is None else int(round_)
+        if round_ not in rounds:
+            raise KeyError(f"No stored standings for {year} round {round_}")
+
+        standings = self.store.query(
+            'SELECT s.position, s.position_text AS positionText, s.driver_id AS driverId, '
+            'd.code, d.given_name AS givenName, d.family_name AS familyName, s.constructor, s.points, s.wins '
+            'FROM driver_standings s LEFT JOIN drivers d USING (driver_id) '
+            'WHERE s.year = ? AND s.round = ? ORDER BY s.position IS NULL, s.position',
+            (int(year), round_)
+        )
+        return {'year': int(year), 'round': round_, 'rounds': len(rounds), 'standings': standings}
+
+    def get_data_version(self):
+        return self.store.get_data_version()
+
+    def _seasons(self, driver_ids, first_year=None, last_year=None):
+        """{driver_id: [season rows in year order]} from three grouped queries"""
+        ids = ', '.join('?' * len(driver_ids))
+        params = (*driver_ids, int(first_year or 0), int(last_year or 9999))
+        poles = {(r['driverId'], r['year']): r['poles'] for r in self.store.query(POLES_SQL.format(ids=ids), params)}
+        final = {(r['driverId'], r['year']): r['position'] for r in self.store.query(FINAL_STANDINGS_SQL.format(ids=ids), params)}
+        # Seasons without loaded qualifying fall back to starts from grid slot 1
+        qualifying_years = {r['year'] for r in self.store.query(
+            "SELECT year FROM backfill WHERE resource = 'qualifying' AND rows > 0"
+        )}
+
+        seasons = {driver_id: [] for driver_id in driver_ids}
+        for row in self.store.query(SEASON_SQL.format(ids=ids), params):
+            key = (row['driverId'], row['year'])
+            grid_poles = row.pop('gridPoles')
+            seasons[row.pop('driverId')].append({
+                **row,
+                'teams': row['teams'].split(',') if row['teams'] else [],
+                'points': round(row['points'], 1),
+                'poles': poles.get(key, 0) if row['year'] in qualifying_years else grid_poles,
+                'championshipPosition': final.get(key)
+            })
+        return seasons
+
+    def _driver(self, driver_id):
+        rows = self.store.query(
+            'SELECT driver_id AS driverId, code, given_name AS givenName, family_name AS familyName, '
+            'nationality, date_of_birth AS dateOfBirth FROM drivers WHERE driver_id = ?',
+            (driver_id,)
+        )
+        if rows:
+            return rows[0]
+        if not self.store.query('SELECT 1 FROM results WHERE driver_id = ? LIMIT 1', (driver_id,)):
+            raise KeyError(f"Unknown driver {driver_id}")
+        # Results ingested before the backfill carry no driver details
+        return {'driverId': driver_id}
+
+
+def _difference(current, previous):
+    if current is None or previous is None:
+        return None
+    return round(current - previous, 2)
@@ -0,0 +1,75 @@
+# services/JsonProvider.py
+import os
+from flask.json.provider import DefaultJSONProvider
+from services.Records import Record
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 'orjson' (default when installed) or 'stdlib' for Flask's json-module encoder
+JSON_ENCODER = os.environ.get('F1_JSON_ENCODER', 'orjson' if orjson is not None else 'stdlib')
+
+# Sorted keys like Flask's encoder. Records, NumPy values and dates go through
+# default() on both paths, so records are key-sorted too, NumPy floats widen the
+# same way and dates stay HTTP dates. The output (and so the ETag) does not
+# depend on the encoder, apart from floats small or large enough for exponent
+# notation (0.00001 vs 1e-05) and non-string keys, which orjson sorts as text
+ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+
+
+def _default(o):
+    """Records as dicts, NumPy scalars/arrays as Python values, the rest as Flask does"""
+    if isinstance(o, Record):
+        return o.to_dict()
+    if type(o).__module__ == 'numpy' and hasattr(o, 'tolist'):
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when it is installed. orjson writes
+    UTF-8 bytes in one native pass; dumps_bytes() skips the str round trip
+    for callers that need bytes (jsonify, the response cache). The stdlib path
+    writes UTF-8 rather than \\u escapes so both encoders produce the same
+    bytes. F1_JSON_ENCODER=stdlib switches back.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def __init__(self, app, encoder=JSON_ENCODER):
+        super().__init__(app)
+        if encoder == 'orjson' and orjson is None:
+            print("JSON Error: orjson is not installed. Using the stdlib encoder.")
+            encoder = 'stdlib'
+        self.encoder = encoder
+
+    def dumps_bytes(self, obj, indent=False):
+        """UTF-8 JSON bytes; compact unless indent"""
+        if self.encoder == 'orjson':
+            option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+            return orjson.dumps(obj, default=self.default, option=option)
+        dump_args = {'indent': 2} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, **dump_args).encode()
+
+    def dumps(self, obj, **kwargs):
+        # Extra json.dumps arguments (cls, indent, ...) need the stdlib encoder
+        if not kwargs:
+            return self.dumps_bytes(obj).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.encoder == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
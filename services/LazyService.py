@@ -0,0 +1,48 @@
+# services/LazyService.py
+import threading
+import time
+
+
+class LazyService:
+    """
+    Stand-in for a service that is built on first use.
+
+    The factory (which should import its heavy modules itself) runs once, on
+    the first attribute access or get() call from any thread; after that
+    every attribute read and write goes to the real instance. Lets app.py
+    define its services at import time without paying for pandas, NumPy or
+    scikit-learn until a request or the warm-up thread needs them.
+    """
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_build_lock', threading.Lock())
+        object.__setattr__(self, 'load_seconds', None)
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def get(self):
+        instance = self._instance
+        if instance is None:
+            with self._build_lock:
+                instance = self._instance
+                if instance is None:
+                    start = time.perf_counter()
+                    instance = self._factory()
+                    object.__setattr__(self, 'load_seconds', round(time.perf_counter() - start, 3))
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def __getattr__(self, attr):
+        # Only called for names not found on the proxy itself
+        return getattr(self.get(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.get(), attr, value)
+
+    def __repr__(self):
+        return f"<LazyService {self._name} ({'loaded' if self.loaded else 'not loaded'})>"
@@ -0,0 +1,476 @@
+# services/LiveTiming.py
+import asyncio
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+import numpy as np
+from services.Metrics import metrics
+from services.FileLock import FileLock
+from services.SessionStore import NAT, _seconds
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 5001
+
+# Replay speed bounds (multiples of real time)
+MIN_SPEED = 1.0
+MAX_SPEED = 100.0
+# Replays start this long before the session's 'Started' status unless ?from= says otherwise
+LEAD_IN = 60.0
+
+# Events due within one tick go out as a single write per subscriber
+MIN_TICK = 0.05
+MAX_TICK = 1.0
+HEARTBEAT_INTERVAL = 15.0
+# A replay nobody listens to is dropped after this long; the next subscriber starts it afresh
+IDLE_TIMEOUT = 10.0
+# A reconnecting client missing more events than this gets a snapshot instead
+MAX_CATCH_UP = 2000
+# Subscribers with more unsent bytes than this are too slow and get disconnected
+MAX_BUFFER_BYTES = 1024 * 1024
+HEADER_TIMEOUT = 10.0
+LEADER_POLL_INTERVAL = 30
+RACE_CONTROL_HISTORY = 5
+
+SSE_HEADERS = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/event-stream\r\n'
+    b'Cache-Control: no-cache\r\n'
+    b'Connection: keep-alive\r\n'
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'X-Accel-Buffering: no\r\n'
+    b'\r\n'
+    b'retry: 3000\n\n'
+)
+HEARTBEAT = b': keep-alive\n\n'
+
+LIVE_EVENTS = metrics.counter('f1_live_events_total', 'Live timing events published, by type', ['type'])
+LIVE_DISCONNECTS = metrics.counter('f1_live_disconnects_total', 'Live timing subscribers that left, by reason', ['reason'])
+
+
+class Timeline:
+    """
+    Every event of one cached session in session-time order, each already
+    encoded as an SSE frame (its id is its index), so any number of replays
+    at any speed send the same bytes without re-serializing.
+    """
+
+    def __init__(self, events, start):
+        events.sort(key=lambda event: event[0])
+        self.times = np.array([event[0] for event in events], dtype=np.float64)
+        self.types = [event[1] for event in events]
+        self.payloads = [event[2] for event in events]
+        self.frames = [
+            f"id: {i}\nevent: {kind}\ndata: {json.dumps({'t': round(t, 3), **payload})}\n\n".encode()
+            for i, (t, kind, payload) in enumerate(events)
+        ]
+        self.start = start
+        self.end = float(self.times[-1]) if len(self.times) else 0.0
+
+    def __len__(self):
+        return len(self.frames)
+
+
+def build_timeline(store, year, event, session):
+    """
+    Timing and position deltas from a cached FastF1 session (via SessionStore).
+
+    Position samples become 'position' events only for the fields that changed
+    since that driver's previous sample; completed laps, tyre changes, track
+    status, session status, lap count, weather and race control messages
+    become one event each.
+    """
+    manifest = store.get_manifest(year, event, session)
+    tables = manifest['tables']
+    column = lambda table, name: np.asarray(store.column(year, event, session, table, name))
+    events = []
+
+    if 'positions' in tables:
+        t = _times(column('positions', 'Time'))
+        drivers = column('positions', 'Driver')
+        order = np.lexsort((t, drivers))
+        t, drivers = t[order], drivers[order]
+        fields = {
+            'position': column('positions', 'Position')[order],
+            'gap': _text(column('positions', 'GapToLeader')[order]),
+            'interval': _text(column('positions', 'IntervalToPositionAhead')[order])
+        }
+        first = np.r_[True, drivers[1:] != drivers[:-1]]
+        changed = {name: first | np.r_[True, values[1:] != values[:-1]] for name, values in fields.items()}
+        for i in np.flatnonzero(np.logical_or.reduce(list(changed.values())) & np.isfinite(t)):
+            payload = {'driver': str(drivers[i])}
+            payload.update({name: _scalar(values[i]) for name, values in fields.items() if changed[name][i]})
+            events.append((t[i], 'position', payload))
+
+    if 'laps' in tables:
+        t = _times(column('laps', 'Time'))
+        columns = {name: column('laps', name) for name in (
+            'Driver', 'NumberOfLaps', 'LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time',
+            'PitInTime', 'PitOutTime', 'IsPersonalBest'
+        )}
+        for i in np.flatnonzero(np.isfinite(t)):
+            events.append((t[i], 'lap', {
+                'driver': str(columns['Driver'][i]),
+                'lap': int(columns['NumberOfLaps'][i]),
+                'lapTime': _seconds(columns['LapTime'][i]),
+                'sectors': [_seconds(columns[f'Sector{n}Time'][i]) for n in (1, 2, 3)],
+                'pitIn': bool(columns['PitInTime'][i] != NAT),
+                'pitOut': bool(columns['PitOutTime'][i] != NAT),
+                'personalBest': bool(columns['IsPersonalBest'][i])
+            }))
+
+    if 'stints' in tables:
+        t = _times(column('stints', 'Time'))
+        drivers, stints = column('stints', 'Driver'), column('stints', 'Stint')
+        compounds, new_flags = column('stints', 'Compound'), column('stints', 'New')
+        current = {}
+        for i in np.argsort(t, kind='stable'):
+            if not np.isfinite(t[i]) or not compounds[i]:
+                continue
+            tyre = (int(stints[i]) + 1, str(compounds[i]), new_flags[i] == 'True' if new_flags[i] else None)
+            if current.get(drivers[i]) != tyre:
+                current[drivers[i]] = tyre
+                events.append((t[i], 'stint', {'driver': str(drivers[i]), 'stint': tyre[0], 'compound': tyre[1], 'new': tyre[2]}))
+
+    status_started = None
+    if 'session_status' in tables:
+        t = _times(column('session_status', 'Time'))
+        for i, status in enumerate(column('session_status', 'Status')):
+            events.append((t[i], 'session_status', {'status': str(status)}))
+            if status == 'Started' and status_started is None:
+                status_started = float(t[i])
+
+    if 'track_status' in tables:
+        t = _times(column('track_status', 'Time'))
+        statuses, messages = column('track_status', 'Status'), column('track_status', 'Message')
+        for i in range(len(t)):
+            events.append((t[i], 'track_status', {'status': str(statuses[i]), 'message': str(messages[i])}))
+
+    if 'lap_count' in tables:
+        t = _times(column('lap_count', 'Time'))
+        current, total = column('lap_count', 'CurrentLap'), column('lap_count', 'TotalLaps')
+        known_total = total[np.isfinite(total)]
+        for i in np.flatnonzero(np.isfinite(current)):
+            events.append((t[i], 'lap_count', {
+                'lap': int(current[i]), 'totalLaps': int(known_total[0]) if len(known_total) else None
+            }))
+
+    if 'weather' in tables:
+        t = _times(column('weather', 'Time'))
+        names = {'AirTemp': 'airTemp', 'TrackTemp': 'trackTemp', 'Humidity': 'humidity',
+                 'Rainfall': 'rainfall', 'WindSpeed': 'windSpeed', 'WindDirection': 'windDirection'}
+        columns = {key: column('weather', name) for name, key in names.items() if name in tables['weather']['columns']}
+        for i in range(len(t)):
+            events.append((t[i], 'weather', {key: values[i].item() for key, values in columns.items()}))
+
+    zero = _session_zero(manifest, status_started)
+    if 'race_control' in tables and zero is not None:
+        # Race control messages carry wall-clock (UTC) times, not session times
+        raw = column('race_control', 'Time')
+        t = np.where(raw == NAT, np.nan, (raw - zero) / 1e9)
+        columns = {key: column('race_control', name) for name, key in (
+            ('Category', 'category'), ('Message', 'message'), ('Flag', 'flag'),
+            ('Scope', 'scope'), ('RacingNumber', 'driver'), ('Sector', 'sector'), ('Lap', 'lap')
+        )}
+        for i in range(len(t)):
+            payload = {}
+            for key, values in columns.items():
+                value = values[i].item()
+                if isinstance(value, float):
+                    value = int(value) if np.isfinite(value) else None
+                if value not in ('', None):
+                    payload[key] = value
+            events.append((t[i], 'race_control', payload))
+
+    events = [(float(t), kind, payload) for t, kind, payload in events if np.isfinite(t)]
+    if not events:
+        raise KeyError(f"No timing data in {year}/{event}/{session}")
+    first = min(t for t, _, _ in events)
+    start = max(first, status_started - LEAD_IN) if status_started is not None else first
+    return Timeline(events, start)
+
+
+class ReplayChannel:
+    """
+    One playback of a timeline at a given speed, shared by all its subscribers.
+
+    A single coroutine advances the replay clock and writes each tick's frames
+    to every subscriber's transport; a subscriber costs a socket and one idle
+    coroutine waiting for it to disconnect, never a thread.
+    """
+
+    def __init__(self, key, timeline, speed, start):
+        self.key = key
+        self.timeline = timeline
+        self.speed = speed
+        self.session_time = start
+        self.subscribers = set()
+        self.events_sent = 0
+        self.broadcast_ms = {'last': 0.0, 'max': 0.0}
+        # Everything before the start only feeds the snapshot state
+        self.position = int(np.searchsorted(timeline.times, start, side='right'))
+        self.state = {'drivers': {}, 'raceControl': []}
+        self._apply(0, self.position)
+
+    def subscribe(self, writer, last_event_id=None):
+        """Catch a (re)connecting subscriber up: missed frames when few enough, a snapshot otherwise"""
+        missed = None
+        if last_event_id is not None and last_event_id.isdigit():
+            missed = self.position - (int(last_event_id) + 1)
+        if missed is not None and 0 <= missed <= MAX_CATCH_UP:
+            writer.write(b''.join(self.timeline.frames[self.position - missed:self.position]))
+        else:
+            writer.write(self.snapshot_frame())
+        self.subscribers.add(writer)
+
+    def snapshot_frame(self):
+        payload = {'t': round(self.session_time, 3), 'speed': self.speed, **self.state}
+        return f"id: {self.position - 1}\nevent: snapshot\ndata: {json.dumps(payload)}\n\n".encode()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        times, frames = self.timeline.times, self.timeline.frames
+        origin_wall, origin_time = loop.time(), self.session_time
+        last_write = idle_since = origin_wall
+
+        while self.position < len(frames):
+            now = loop.time()
+            self.session_time = origin_time + (now - origin_wall) * self.speed
+            end = int(np.searchsorted(times, self.session_time, side='right'))
+            if end > self.position:
+                start, self.position = self.position, end
+                self._apply(start, end)
+                self._broadcast(b''.join(frames[start:end]))
+                self.events_sent += end - start
+                for kind in self.timeline.types[start:end]:
+                    LIVE_EVENTS.inc(kind=kind)
+                last_write = now
+            elif now - last_write >= HEARTBEAT_INTERVAL:
+                self._broadcast(HEARTBEAT)
+                last_write = now
+
+            if self.subscribers:
+                idle_since = now
+            elif now - idle_since >= IDLE_TIMEOUT:
+                return
+
+            wait = (times[self.position] - self.session_time) / self.speed if self.position < len(frames) else 0
+            await asyncio.sleep(min(max(wait, MIN_TICK), MAX_TICK))
+
+        self._broadcast(f"event: end\ndata: {json.dumps({'t': round(self.session_time, 3)})}\n\n".encode())
+        for writer in list(self.subscribers):
+            writer.close()
+
+    def get_status(self):
+        year, event, session, _, _ = self.key
+        return {
+            'year': year, 'event': event, 'session': session, 'speed': self.speed,
+            'sessionTime': round(self.session_time, 1), 'subscribers': len(self.subscribers),
+            'eventsSent': self.events_sent, 'broadcastMs': self.broadcast_ms, 'progress': round(self.position / max(len(self.timeline), 1), 3)
+        }
+
+    def _broadcast(self, data):
+        start = time.perf_counter()
+        for writer in list(self.subscribers):
+            if writer.is_closing():
+                self.subscribers.discard(writer)
+            elif writer.transport.get_write_buffer_size() > MAX_BUFFER_BYTES:
+                LIVE_DISCONNECTS.inc(reason='slow')
+                self.subscribers.discard(writer)
+                writer.transport.abort()
+            else:
+                writer.write(data)
+        elapsed = round((time.perf_counter() - start) * 1000, 3)
+        self.broadcast_ms = {'last': elapsed, 'max': max(elapsed, self.broadcast_ms['max'])}
+
+    def _apply(self, start, end):
+        """Fold events [start, end) into the snapshot state"""
+        drivers = self.state['drivers']
+        for kind, payload in zip(self.timeline.types[start:end], self.timeline.payloads[start:end]):
+            if 'driver' in payload and kind in ('position', 'lap', 'stint'):
+                fields = {key: value for key, value in payload.items() if key != 'driver'}
+                if kind == 'lap':
+                    fields = {'lap': payload['lap'], 'lastLapTime': payload['lapTime']}
+                drivers.setdefault(payload['driver'], {}).update(fields)
+            elif kind == 'race_control':
+                self.state['raceControl'] = (self.state['raceControl'] + [payload])[-RACE_CONTROL_HISTORY:]
+            else:
+                self.state[kind] = payload
+
+
+class LiveTimingServer:
+    """
+    Server-Sent Events stream of replayed FastF1 sessions.
+
+    Runs its own asyncio HTTP server on a separate port in one background
+    thread, so thousands of idle connections cost a socket each rather than a
+    WSGI thread each. GET /live/<year>/<event>/<session>?speed=10&from=<s>
+    joins (or starts) the replay of that session at that speed: a snapshot
+    first, then only deltas. Clients reconnecting with Last-Event-ID get just
+    the events they missed; GET /live/status reports the replays running.
+    With several worker processes only the one holding the file lock serves;
+    the rest stand by.
+    """
+
+    def __init__(self, session_store, lock_dir=None, host=None, port=None):
+        self.session_store = session_store
+        self.host = host or os.environ.get('F1_LIVE_HOST', DEFAULT_HOST)
+        self.port = int(port or os.environ.get('F1_LIVE_PORT', DEFAULT_PORT))
+        self._timelines = {}
+        self._channels = {}
+        self._connections = 0
+        self._loop = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader_lock = FileLock(os.path.join(lock_dir or session_store.columnar_dir, 'live-timing.lock'))
+        self.status = {'running': False, 'role': None, 'lastError': None}
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self.status['running'] = True
+        self._thread = threading.Thread(target=self._run, name='live-timing', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(lambda: None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._leader_lock.release()
+        self.status['running'] = False
+
+    def stream_path(self, year, event, session):
+        return f'/live/{year}/{event}/{session}'
+
+    def get_timeline(self, year, event, session):
+        key = (int(year), event, session)
+        timeline = self._timelines.get(key)
+        if timeline is None:
+            timeline = self._timelines[key] = build_timeline(self.session_store, *key)
+        return timeline
+
+    def get_status(self):
+        return {
+            **self.status,
+            'port': self.port,
+            'connections': self._connections,
+            'channels': [channel.get_status() for channel in list(self._channels.values())]
+        }
+
+    def _run(self):
+        self.status['role'] = 'standby'
+        while not self._leader_lock.acquire(blocking=False):
+            if self._stop.wait(LEADER_POLL_INTERVAL):
+                return
+        self.status['role'] = 'leader'
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            self.status.update(running=False, lastError=str(e))
+            print(f"Live timing Error: {e}")
+        finally:
+            self._leader_lock.release()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        async with server:
+            while not self._stop.is_set():
+                await asyncio.sleep(MAX_TICK)
+
+    async def _handle(self, reader, writer):
+        self._connections += 1
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), HEADER_TIMEOUT)
+                method, target, _ = head.decode('latin-1').split('\r\n', 1)[0].split(' ', 2)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                return
+            headers = dict(
+                (name.strip().lower(), value.strip())
+                for name, value in (line.split(':', 1) for line in head.decode('latin-1').split('\r\n')[1:] if ':' in line)
+            )
+            url = urlsplit(target)
+            parts = [unquote(part) for part in url.path.strip('/').split('/')]
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+            if method == 'GET' and parts == ['live', 'status']:
+                return self._reply(writer, 200, {'success': True, 'data': self.get_status()})
+            if method != 'GET' or len(parts) != 4 or parts[0] != 'live' or not parts[1].isdigit():
+                return self._reply(writer, 404, {'success': False, 'error': 'Not found'})
+            try:
+                speed = min(max(float(query.get('speed', MIN_SPEED)), MIN_SPEED), MAX_SPEED)
+                start = float(query['from']) if 'from' in query else None
+            except ValueError:
+                return self._reply(writer, 400, {'success': False, 'error': 'speed and from must be numbers'})
+            try:
+                # Building a timeline is NumPy work; keep it off the event loop
+                timeline = await asyncio.get_running_loop().run_in_executor(None, self.get_timeline, *parts[1:])
+            except (FileNotFoundError, KeyError) as e:
+                return self._reply(writer, 404, {'success': False, 'error': str(e)})
+
+            channel = self._channel((int(parts[1]), parts[2], parts[3], speed, start), timeline)
+            writer.write(SSE_HEADERS)
+            channel.subscribe(writer, headers.get('last-event-id') or query.get('lastEventId'))
+            try:
+                # Idle until the client goes away or the replay ends and closes us
+                while await reader.read(1024):
+                    pass
+                LIVE_DISCONNECTS.inc(reason='client')
+            except ConnectionError:
+                LIVE_DISCONNECTS.inc(reason='error')
+            finally:
+                channel.subscribers.discard(writer)
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    def _channel(self, key, timeline):
+        channel = self._channels.get(key)
+        if channel is None:
+            start = key[4] if key[4] is not None else timeline.start
+            channel = self._channels[key] = ReplayChannel(key, timeline, key[3], start)
+            task = asyncio.get_running_loop().create_task(channel.run())
+            task.add_done_callback(lambda _: self._channels.pop(key, None))
+        return channel
+
+    def _reply(self, writer, status, payload):
+        body = json.dumps(payload).encode()
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}[status]
+        writer.write(
+            f'HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n'.encode() + body
+        )
+
+
+def _times(values):
+    """int64 nanoseconds (NaT marker) -> float seconds (NaN)"""
+    seconds = values.astype(np.float64) / 1e9
+    seconds[values == NAT] = np.nan
+    return seconds
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _text(values):
+    """String column with missing values ('' or 'nan') as None"""
+    values = values.astype(object)
+    values[(values == '') | (values == 'nan')] = None
+    return values
+
+
+def _session_zero(manifest, started):
+    """Wall-clock (UTC epoch ns) of session time 0, from the scheduled start and the 'Started' status"""
+    info = manifest.get('session') or {}
+    if started is None or not info.get('StartDate'):
+        return None
+    start_utc = np.datetime64(info['StartDate'], 'ns') - np.timedelta64(int(info.get('GmtOffset', 0) * 1e9), 'ns')
+    return int(start_utc.astype(np.int64)) - int(started * 1e9)
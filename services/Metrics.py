@@ -0,0 +1,235 @@
+# services/Metrics.py
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally, deque
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Sampling profiler: opt-in per request with ?profile=1 when F1_PROFILING=1
+PROFILING_ENABLED = os.environ.get('F1_PROFILING') == '1'
+PROFILE_INTERVAL = 0.001
+PROFILES_KEPT = 20
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _format_labels(self, key, extra=None):
+        pairs = list(zip(self.labelnames, key)) + (extra or [])
+        if not pairs:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{self._format_labels(key)} {value}' for key, value in items]
+
+
+class Gauge(_Metric):
+    """Gauge whose value(s) come from a callback at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), fn=None):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def _samples(self):
+        try:
+            values = self.fn() if self.fn else {}
+        except Exception as e:
+            print(f"Metrics Error: gauge {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f'{self.name}{self._format_labels(key if isinstance(key, tuple) else (key,))} {value}'
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f'{self.name}_bucket{self._format_labels(key, [("le", repr(bound))])} {count}')
+            lines.append(f'{self.name}_bucket{self._format_labels(key, [("le", "+Inf")])} {state[-1]}')
+            lines.append(f'{self.name}_sum{self._format_labels(key)} {state[-2]}')
+            lines.append(f'{self.name}_count{self._format_labels(key)} {state[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metric definitions rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def gauge(self, name, help_text, labelnames=(), fn=None):
+        gauge = self._register(Gauge, name, help_text, labelnames)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            # Re-registering returns the existing metric (module reloads, multiple app instances)
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            return self._metrics[name]
+
+
+metrics = MetricsRegistry()
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every PROFILE_INTERVAL seconds from a
+    helper thread and tallies the folded stacks (root;...;leaf).
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Tally()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def top(self, limit=25):
+        total = sum(self.samples.values())
+        return {
+            'samples': total,
+            'intervalMs': self.interval * 1000,
+            'stacks': [
+                {'stack': stack, 'samples': count, 'share': round(count / total, 4)}
+                for stack, count in self.samples.most_common(limit)
+            ]
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+recent_profiles = deque(maxlen=PROFILES_KEPT)
+
+
+def instrument_app(app):
+    """Per-route latency histogram, request counter and the optional per-request profiler"""
+    from flask import g, request
+
+    request_seconds = metrics.histogram(
+        'f1_http_request_duration_seconds', 'Latency of API requests', ['route', 'method', 'status']
+    )
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        if PROFILING_ENABLED and request.args.get('profile') == '1':
+            g.profiler = SamplingProfiler(threading.get_ident()).start()
+
+    @app.after_request
+    def _record_latency(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            request_seconds.observe(
+                time.perf_counter() - start, route=route, method=request.method, status=response.status_code
+            )
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profile = {'path': request.full_path, 'time': time.time(), **profiler.stop().top()}
+            recent_profiles.append(profile)
+            response.headers['X-Profile-Samples'] = str(profile['samples'])
+        return response
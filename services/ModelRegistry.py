@@ -0,0 +1,173 @@
+# services/ModelRegistry.py
+import json
+import os
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+from services.ForestCompiler import CompiledForest, compile_forest, check_parity, PARITY_TOLERANCE
+
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'podium')
+
+FEATURES = ['avg_points', 'recent_form', 'team_performance', 'wins', 'podiums']
+
+
+class InvalidModel(Exception):
+    """A listed model version whose artifact is unreadable or does not predict"""
+
+
+class ModelRegistry:
+    """
+    Versioned on-disk store for trained podium models.
+
+    Layout: <model_dir>/<version>/{model.joblib, metadata.json, forest/*.npy}
+    plus a CURRENT file naming the active version. Artifacts are loaded with
+    mmap_mode='r' so forked workers share the array pages.
+    """
+
+    def __init__(self, model_dir=None):
+        self.model_dir = model_dir or os.environ.get('F1_MODEL_DIR', DEFAULT_MODEL_DIR)
+
+    def save(self, model, scaler, metadata, activate=True, parity_sample=None):
+        """
+        Write a new artifact version, including the compiled NumPy forest; returns its metadata.
+        parity_sample (raw feature rows) is used to verify the compiled forest against sklearn.
+        """
+        version = metadata.get('version') or datetime.now().strftime('%Y%m%d-%H%M%S')
+        version_dir = os.path.join(self.model_dir, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        metadata = {
+            **metadata,
+            'version': version,
+            'features': FEATURES,
+            'createdAt': datetime.now().isoformat()
+        }
+        # Uncompressed so the arrays can be memory-mapped on load
+        joblib.dump({'model': model, 'scaler': scaler}, os.path.join(version_dir, 'model.joblib'))
+        metadata['compiledParityError'] = self._export_compiled(model, scaler, version_dir, parity_sample)
+        self._write_atomic(os.path.join(version_dir, 'metadata.json'), json.dumps(metadata, indent=2))
+
+        if activate:
+            self.activate(version)
+        return metadata
+
+    def load(self, version=None):
+        """Return (model, scaler, metadata) for a version, defaulting to the active one"""
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No model artifact in {self.model_dir}")
+
+        version_dir = self._version_dir(version)
+        metadata = self._read_metadata(version)
+        try:
+            artifact = joblib.load(os.path.join(version_dir, 'model.joblib'), mmap_mode='r')
+            model, scaler = artifact['model'], artifact['scaler']
+        except Exception as e:
+            raise InvalidModel(f"Model version {version} has an unreadable artifact: {e}") from e
+        self._check_predicts(version, lambda X: model.predict_proba(scaler.transform(X) if scaler is not None else X))
+        return model, scaler, metadata
+
+    def load_compiled(self, version=None):
+        """
+        Return (CompiledForest, metadata) without unpickling the sklearn model.
+        Older versions without a compiled forest are exported on first use.
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No model artifact in {self.model_dir}")
+
+        version_dir = self._version_dir(version)
+        if not os.path.isdir(os.path.join(version_dir, 'forest')):
+            self.export_compiled(version)
+
+        metadata = self._read_metadata(version)
+        compiled = CompiledForest.load(os.path.join(version_dir, 'forest'))
+        self._check_predicts(version, compiled.predict_proba)
+        return compiled, metadata
+
+    def export_compiled(self, version, parity_sample=None):
+        """(Re-)export the compiled forest for an existing version"""
+        model, scaler, metadata = self.load(version)
+        version_dir = self._version_dir(version)
+        metadata['compiledParityError'] = self._export_compiled(model, scaler, version_dir, parity_sample)
+        self._write_atomic(os.path.join(version_dir, 'metadata.json'), json.dumps(metadata, indent=2))
+
+    def activate(self, version):
+        """
+        Point CURRENT at a listed version. Callers activating an older version
+        should load it first (as RacePredictionService.activate_model does),
+        so a broken artifact never becomes the one every worker loads.
+        """
+        self._version_dir(version)
+        self._write_atomic(os.path.join(self.model_dir, 'CURRENT'), version)
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.model_dir, 'CURRENT')) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_marker_mtime(self):
+        """mtime of the CURRENT pointer, used to notice activations from other processes"""
+        try:
+            return os.stat(os.path.join(self.model_dir, 'CURRENT')).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self):
+        if not os.path.isdir(self.model_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.model_dir)
+            if os.path.isfile(os.path.join(self.model_dir, name, 'metadata.json'))
+        )
+
+    def _version_dir(self, version):
+        """Directory of a listed version; anything else (other directories, paths) is unknown"""
+        if version not in self.list_versions():
+            raise ValueError(f"Unknown model version: {version}")
+        return os.path.join(self.model_dir, version)
+
+    def _read_metadata(self, version):
+        try:
+            with open(os.path.join(self._version_dir(version), 'metadata.json')) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError) as e:
+            raise InvalidModel(f"Model version {version} has unreadable metadata: {e}") from e
+        if not isinstance(metadata, dict) or metadata.get('version') != version or metadata.get('features') != FEATURES:
+            raise InvalidModel(f"Model version {version} has mismatched metadata")
+        return metadata
+
+    def _check_predicts(self, version, predict_proba):
+        """The artifact scores a row of FEATURES and returns two-class probabilities"""
+        try:
+            probabilities = np.asarray(predict_proba(np.zeros((1, len(FEATURES)))))
+        except Exception as e:
+            raise InvalidModel(f"Model version {version} cannot predict: {e}") from e
+        if probabilities.shape != (1, 2) or not np.all(np.isfinite(probabilities)):
+            raise InvalidModel(f"Model version {version} returned probabilities of shape {probabilities.shape}")
+
+    def _export_compiled(self, model, scaler, version_dir, parity_sample):
+        """Compile, verify against sklearn and write forest/*.npy; returns the max parity error"""
+        compiled = compile_forest(model, scaler)
+        if parity_sample is None:
+            # Spread of points around the scaler's training distribution
+            rng = np.random.default_rng(0)
+            parity_sample = scaler.mean_ + scaler.scale_ * rng.standard_normal((2000, len(scaler.mean_)))
+
+        error = check_parity(compiled, model, scaler, parity_sample)
+        if error > PARITY_TOLERANCE:
+            raise ValueError(f"Compiled forest differs from sklearn by {error:.3g}")
+
+        compiled.save(os.path.join(version_dir, 'forest'))
+        return error
+
+    def _write_atomic(self, path, text):
+        tmp_path = f"{path}.{os.getpid()}.{time.time_ns()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
@@ -0,0 +1,120 @@
+# services/ModelTrainer.py
+import hashlib
+import sys
+import pandas as pd
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+from services.ModelRegistry import ModelRegistry, FEATURES
+
+class ModelTrainer:
+    """Offline training for the podium model; writes versioned artifacts to the ModelRegistry"""
+    
+    def __init__(self, registry=None):
+        self.registry = registry or ModelRegistry()
+    
+    def train_and_save(self, activate=True):
+        """Train on fresh data and persist model + scaler + metadata; returns the metadata"""
+        training_data = self.generate_training_data()
+        model, scaler, accuracy = self.train(training_data)
+        
+        data_hash = hashlib.sha256(
+            pd.util.hash_pandas_object(training_data, index=False).values.tobytes()
+        ).hexdigest()
+        
+        return self.registry.save(model, scaler, {
+            'model': 'RandomForestClassifier',
+            'params': model.get_params(),
+            'accuracy': round(float(accuracy), 4),
+            'trainingRows': len(training_data),
+            'trainingDataHash': data_hash
+        }, activate=activate, parity_sample=training_data[FEATURES].values)
+    
+    def generate_training_data(self):
+        """Generate synthetic training data with realistic variance and noise"""
+        np.random.seed(42)
+        data = []
+        
+        # TOP-TIER DRIVERS (High performers - 85% podium rate)
+        # These represent drivers like Verstappen, Hamilton in their prime
+        for _ in range(100):
+            # Not ALL top drivers get podium every race (crashes, bad luck, strategy fails)
+            # So we use 85% podium rate instead of 100%
+            podium = 1 if np.random.random() < 0.85 else 0
+            
+            data.append({
+                'avg_points': np.random.uniform(8, 18),      # High points per race
+                'recent_form': np.random.uniform(0.6, 1.0),   # Good recent performance
+                'team_performance': np.random.uniform(0.7, 1.0),  # Strong team (Mercedes, Red Bull, etc.)
+                'wins': np.random.randint(1, 10),             # Multiple wins
+                'podiums': np.random.randint(3, 20),          # Frequent podiums
+                'podium': podium
+            })
+        
+        # MID-FIELD DRIVERS (Occasional podium finishers - 20% podium rate)
+        # Represents drivers like Albon, Gasly - can get podium but rare
+        # TOP-TIER DRIVERS (High performers - realistic 70%-85% podium rate)
+        for _ in range(100):
+            podium = 1 if np.random.random() < 0.7 else 0   # reduced from 0.85 to 0.7
+            data.append({
+                'avg_points': np.random.uniform(7, 18),      # add overlap with mid-tier
+                'recent_form': np.random.uniform(0.5, 0.95), # slightly more variation
+                'team_performance': np.random.uniform(0.65, 1.0),
+                'wins': np.random.randint(1, 10),
+                'podiums': np.random.randint(3, 20),
+                'podium': podium
+    })
+
+        
+        # BACK-MARKERS (Almost never podium - 3% podium rate)
+        # Represents Williams, Haas type teams - podium is extremely rare
+        for _ in range(100):
+            # Very rare cases like Perez at Sakhir 2020 or Gasly at Monza 2020
+            podium = 1 if np.random.random() < 0.03 else 0
+            
+            data.append({
+                'avg_points': np.random.uniform(0, 3),        
+                'recent_form': np.random.uniform(0, 0.4),    
+                'team_performance': np.random.uniform(0, 0.5),    
+                'wins': 0,                                     
+                'podiums': np.random.randint(0, 2),           
+                'podium': podium
+            })
+        
+        return pd.DataFrame(data)
+    
+    def train(self, training_data):
+        """Train the Random Forest model and calculate accuracy; returns (model, scaler, accuracy)"""
+        model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
+        scaler = StandardScaler()
+        
+        X = training_data[FEATURES].values
+        y = training_data['podium']
+        
+        # Split data into training and test sets (80/20 split)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
+        
+        # Scale features
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        
+        # Train model
+        model.fit(X_train_scaled, y_train)
+        
+        # Calculate accuracy on test set
+        y_pred = model.predict(X_test_scaled)
+        accuracy = accuracy_score(y_test, y_pred)
+        
+        print(f"✓ Model trained with {accuracy * 100:.1f}% accuracy")
+        
+        return model, scaler, accuracy
+
+
+if __name__ == '__main__':
+    # Usage: python -m services.ModelTrainer [--no-activate]
+    metadata = ModelTrainer().train_and_save(activate='--no-activate' not in sys.argv)
+    print(f"✓ Saved model version {metadata['version']} ({metadata['accuracy'] * 100:.1f}% accuracy)")
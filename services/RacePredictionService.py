@@ -1,141 +1,249 @@
 # services/ml_predictor.py
-import pandas as pd
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-from datetime import datetime
+from services.ModelRegistry import ModelRegistry, FEATURES
+from services.Metrics import metrics
+from services.FileLock import FileLock
+from services.Records import Prediction
+
+# How often (seconds) to check whether another process activated a new model version
+MODEL_CHECK_INTERVAL = 5
+
+# Memoized prediction results kept per (model version, feature-set hash)
+PREDICTION_CACHE_SIZE = 1024
+
+# 'sklearn' (default) or 'numpy' to serve from the compiled forest without importing sklearn
+INFERENCE_BACKEND = os.environ.get('F1_INFERENCE_BACKEND', 'sklearn')
+
+INFERENCE_SECONDS = metrics.histogram(
+    'f1_model_inference_duration_seconds', 'Time spent in model predict_proba per batch', ['backend'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+)
+INFERENCE_ROWS = metrics.counter('f1_model_inference_rows_total', 'Feature rows scored by the model', ['backend'])
 
 class RacePredictionService:
     """ML-based service for predicting race outcomes"""
     
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
-        self.scaler = StandardScaler()
+    def __init__(self, registry=None, backend=None, feature_source=None):
+        self.registry = registry or ModelRegistry()
+        self.backend = backend or INFERENCE_BACKEND
+        self.feature_source = feature_source
+        self.features_version = None
+        self.model = None
+        self.scaler = None
+        self.metadata = {}
         self.is_trained = False
-        self.accuracy = 0.0  
+        self.accuracy = 0.0
+        self._lock = threading.Lock()
+        self._marker_mtime = None
+        self._next_check = 0.0
+        self._prediction_cache = OrderedDict()
+        self.cache_stats = {'hits': 0, 'misses': 0}
         
+        self.load_model()
+    
+    def load_model(self, version=None):
+        """
+        Load (or hot-swap to) a persisted model version, defaulting to the active one.
+        Trains and saves a first version if the registry is empty.
+        """
+        if version is None and self.registry.current_version() is None:
+            # Fresh checkout: train once offline-style so requests never do;
+            # the lock makes other workers wait for that model instead of training their own
+            with FileLock(os.path.join(self.registry.model_dir, '.train.lock')):
+                if self.registry.current_version() is None:
+                    from services.ModelTrainer import ModelTrainer
+                    ModelTrainer(self.registry).train_and_save()
+        
+        return self._install(*self._load_artifact(version))
+    
+    def _load_artifact(self, version):
+        """(model, scaler, metadata) of a version, loaded and checked by the registry"""
+        if self.backend == 'numpy':
+            # Scaling is folded into the compiled thresholds, so there is no separate scaler
+            model, metadata = self.registry.load_compiled(version)
+            return model, None, metadata
+        return self.registry.load(version)
+    
+    def _install(self, model, scaler, metadata):
+        with self._lock:
+            # Swap all three together so a request never sees a mixed pair
+            self.model, self.scaler, self.metadata = model, scaler, metadata
+            self.accuracy = metadata.get('accuracy', 0.0)
+            self.is_trained = True
+            self._marker_mtime = self.registry.current_marker_mtime()
+        
+        print(f"✓ Loaded model version {metadata['version']} ({self.backend} backend)")
+        return metadata
+    
+    def activate_model(self, version):
+        """
+        Make a version the active one for every process and switch to it here.
+        The artifact is loaded and checked before CURRENT moves, so a failed
+        activation leaves the running and persisted version unchanged.
+        """
+        artifact = self._load_artifact(version)
+        self.registry.activate(version)
+        return self._install(*artifact)
+    
+    def get_model_info(self):
+        return {**self.metadata, 'backend': self.backend, 'availableVersions': self.registry.list_versions()}
+    
+    def get_data_version(self):
+        """(model version, backend, features version) - everything predict_next_race_podium depends on"""
+        self._reload_if_activated()
+        features_version = 'static'
+        if self.feature_source is not None:
+            features, version = self.feature_source.get_features()
+            if features:
+                features_version = version
+        return self.metadata.get('version'), self.backend, features_version
+    
     def predict_next_race_podium(self):
         """
         Predict podium probabilities for the next race
         Uses simplified features: recent performance, season stats, team performance
         """
-        
-        # Mock training data (in production, this would be historical race data)
-        training_data = self._generate_training_data()
-        
-        # Train the model if not already trained
-        if not self.is_trained:
-            self._train_model(training_data)
+        self._reload_if_activated()
         
         # Current season driver performance data
         current_drivers = self._get_current_driver_features()
         
-        # Make predictions
-        predictions = []
-        for driver in current_drivers:
-            features = self._extract_features(driver)
-            
-            # Predict podium probability
-            probability = self.model.predict_proba([features])[0][1]  # Probability of podium
-            
-            predictions.append({
-                'driver': driver['name'],
-                'team': driver['team'],
-                'podiumProbability': round(float(probability) * 100, 2),
-                'recentForm': driver['recent_form'],
-                'avgPointsPerRace': driver['avg_points'],
-                'confidence': 'high' if probability > 0.7 else 'medium' if probability > 0.4 else 'low'
-            })
-        
-        # Sort by probability
-        predictions.sort(key=lambda x: x['podiumProbability'], reverse=True)
-        
-        return predictions[:10]  # Return top 10
+        return self._rank_predictions(current_drivers, self._predict_probabilities([current_drivers])[0])
     
+    def predict_podium_probabilities(self):
+        """Raw podium probability (0-1) per current driver name, for downstream simulations"""
+        self._reload_if_activated()
+        current_drivers = self._get_current_driver_features()
+        probabilities = self._predict_probabilities([current_drivers])[0]
+        return {driver['name']: float(p) for driver, p in zip(current_drivers, probabilities)}
     
-    def _generate_training_data(self):
-        """Generate synthetic training data with realistic variance and noise"""
-        np.random.seed(42)
-        data = []
+    def predict_scenarios(self, scenarios):
+        """
+        Score many what-if scenarios (or several upcoming races) in one call.
+        Each scenario is {'name': ..., 'drivers': [feature dicts]} and/or
+        {'overrides': {driver name: {feature: value}}} applied to the current drivers.
+        All uncached scenarios go through a single scale + predict_proba.
+        """
+        self._reload_if_activated()
         
-        # TOP-TIER DRIVERS (High performers - 85% podium rate)
-        # These represent drivers like Verstappen, Hamilton in their prime
-        for _ in range(100):
-            # Not ALL top drivers get podium every race (crashes, bad luck, strategy fails)
-            # So we use 85% podium rate instead of 100%
-            podium = 1 if np.random.random() < 0.85 else 0
-            
-            data.append({
-                'avg_points': np.random.uniform(8, 18),      # High points per race
-                'recent_form': np.random.uniform(0.6, 1.0),   # Good recent performance
-                'team_performance': np.random.uniform(0.7, 1.0),  # Strong team (Mercedes, Red Bull, etc.)
-                'wins': np.random.randint(1, 10),             # Multiple wins
-                'podiums': np.random.randint(3, 20),          # Frequent podiums
-                'podium': podium
-            })
+        current_drivers = None
+        driver_sets = []
+        for scenario in scenarios:
+            drivers = scenario.get('drivers')
+            if drivers is None:
+                if current_drivers is None:
+                    current_drivers = self._get_current_driver_features()
+                overrides = scenario.get('overrides', {})
+                drivers = [{**driver, **overrides.get(driver['name'], {})} for driver in current_drivers]
+            driver_sets.append(drivers)
         
-        # MID-FIELD DRIVERS (Occasional podium finishers - 20% podium rate)
-        # Represents drivers like Albon, Gasly - can get podium but rare
-        # TOP-TIER DRIVERS (High performers - realistic 70%-85% podium rate)
-        for _ in range(100):
-            podium = 1 if np.random.random() < 0.7 else 0   # reduced from 0.85 to 0.7
-            data.append({
-                'avg_points': np.random.uniform(7, 18),      # add overlap with mid-tier
-                'recent_form': np.random.uniform(0.5, 0.95), # slightly more variation
-                'team_performance': np.random.uniform(0.65, 1.0),
-                'wins': np.random.randint(1, 10),
-                'podiums': np.random.randint(3, 20),
-                'podium': podium
-    })
-
-        
-        # BACK-MARKERS (Almost never podium - 3% podium rate)
-        # Represents Williams, Haas type teams - podium is extremely rare
-        for _ in range(100):
-            # Very rare cases like Perez at Sakhir 2020 or Gasly at Monza 2020
-            podium = 1 if np.random.random() < 0.03 else 0
-            
-            data.append({
-                'avg_points': np.random.uniform(0, 3),        
-                'recent_form': np.random.uniform(0, 0.4),    
-                'team_performance': np.random.uniform(0, 0.5),    
-                'wins': 0,                                     
-                'podiums': np.random.randint(0, 2),           
-                'podium': podium
+        results = []
+        for scenario, drivers, probabilities in zip(scenarios, driver_sets, self._predict_probabilities(driver_sets)):
+            results.append({
+                'name': scenario.get('name'),
+                'predictions': self._rank_predictions(drivers, probabilities)
             })
-        
-        return pd.DataFrame(data)
+        return results
     
-    def _train_model(self, training_data):
-        """Train the Random Forest model and calculate accuracy"""
-        X = training_data[['avg_points', 'recent_form', 'team_performance', 'wins', 'podiums']]
-        y = training_data['podium']
+    def _predict_probabilities(self, driver_sets):
+        """
+        Podium probabilities for several driver sets, memoized by
+        (model version, feature matrix hash). Cache misses are stacked
+        into one matrix so sklearn is called once per batch.
+        """
+        # Snapshot so a concurrent hot-swap can't pair one version's scaler with another's model
+        with self._lock:
+            model, scaler, version = self.model, self.scaler, self.metadata.get('version')
         
-        # Split data into training and test sets (80/20 split)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
+        matrices = [self._feature_matrix(drivers) for drivers in driver_sets]
+        keys = [(version, self.backend, hashlib.sha1(matrix.tobytes()).hexdigest()) for matrix in matrices]
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        with self._lock:
+            results = [self._cached_prediction(key) for key in keys]
+            missing = [i for i, cached in enumerate(results) if cached is None]
+            self.cache_stats['hits'] += len(results) - len(missing)
+            self.cache_stats['misses'] += len(missing)
         
-        # Train model
-        self.model.fit(X_train_scaled, y_train)
+        if missing:
+            stacked = np.vstack([matrices[i] for i in missing])
+            if scaler is not None:
+                # Same as scaler.transform, without sklearn's per-call validation
+                stacked = (stacked - scaler.mean_) / scaler.scale_
+            with INFERENCE_SECONDS.time(backend=self.backend):
+                probabilities = model.predict_proba(stacked)[:, 1]
+            INFERENCE_ROWS.inc(len(stacked), backend=self.backend)
+            
+            offset = 0
+            for i in missing:
+                count = len(matrices[i])
+                results[i] = probabilities[offset:offset + count]
+                offset += count
+                self._remember_prediction(keys[i], results[i])
         
-        # Calculate accuracy on test set
-        y_pred = self.model.predict(X_test_scaled)
-        self.accuracy = accuracy_score(y_test, y_pred)
+        return results
+    
+    def _rank_predictions(self, drivers, probabilities):
+        """Format one driver set's probabilities, best first, top 10"""
+        predictions = []
+        for driver, probability in zip(drivers, probabilities):
+            predictions.append(Prediction(
+                driver.get('name'),
+                driver.get('team'),
+                round(float(probability) * 100, 2),
+                driver['recent_form'],
+                driver['avg_points'],
+                'high' if probability > 0.7 else 'medium' if probability > 0.4 else 'low'
+            ))
         
-        print(f"✓ Model trained with {self.accuracy * 100:.1f}% accuracy")
-        self.is_trained = True
+        # Sort by probability
+        predictions.sort(key=lambda x: x.podiumProbability, reverse=True)
         
-        return self.accuracy
+        return predictions[:10]  # Return top 10
+    
+    def _feature_matrix(self, drivers):
+        """Stack driver feature dicts into an (n_drivers, n_features) array"""
+        try:
+            return np.array([[driver[feature] for feature in FEATURES] for driver in drivers], dtype=float).reshape(-1, len(FEATURES))
+        except KeyError as e:
+            raise ValueError(f"Missing feature {e} in driver data")
+        except TypeError as e:
+            raise ValueError(f"Invalid driver data: {e}")
+    
+    def _cached_prediction(self, key):
+        """LRU lookup; call with self._lock held"""
+        probabilities = self._prediction_cache.get(key)
+        if probabilities is not None:
+            self._prediction_cache.move_to_end(key)
+        return probabilities
+    
+    def _remember_prediction(self, key, probabilities):
+        with self._lock:
+            self._prediction_cache[key] = probabilities
+            self._prediction_cache.move_to_end(key)
+            while len(self._prediction_cache) > PREDICTION_CACHE_SIZE:
+                self._prediction_cache.popitem(last=False)
     
     def _get_current_driver_features(self):
-        """Get current driver performance features - balanced for realistic predictions"""
+        """
+        Current driver performance features, computed from real results when
+        the season has been ingested; otherwise the static table below.
+        """
+        if self.feature_source is not None:
+            features, version = self.feature_source.get_features()
+            if features:
+                self.features_version = version
+                return features
+        
+        self.features_version = 'static'
+        return self._get_static_driver_features()
+    
+    def _get_static_driver_features(self):
+        """Fallback driver performance features - balanced for realistic predictions"""
         return [
             # Elite drivers - 70-85% range
             {'name': 'Max Verstappen', 'team': 'Red Bull Racing', 'avg_points': 10.8, 'recent_form': 0.68, 'team_performance': 0.80, 'wins': 4, 'podiums': 10},
@@ -155,16 +263,17 @@ class RacePredictionService:
             {'name': 'Yuki Tsunoda', 'team': 'RB', 'avg_points': 2.0, 'recent_form': 0.36, 'team_performance': 0.48, 'wins': 0, 'podiums': 0},
             {'name': 'Alexander Albon', 'team': 'Williams', 'avg_points': 1.4, 'recent_form': 0.32, 'team_performance': 0.42, 'wins': 0, 'podiums': 0}
         ]
-    def _extract_features(self, driver):
-        """Extract feature vector for prediction"""
-        features = [
-            driver['avg_points'],
-            driver['recent_form'],
-            driver['team_performance'],
-            driver['wins'],
-            driver['podiums']
-        ]
+    def _reload_if_activated(self):
+        """Pick up a version activated by another process (CLI or another worker)"""
+        now = time.time()
+        if now < self._next_check:
+            return
+        self._next_check = now + MODEL_CHECK_INTERVAL
         
-        # Scale features
-        features_scaled = self.scaler.transform([features])[0]
-        return features_scaled
\ No newline at end of file
+        mtime = self.registry.current_marker_mtime()
+        if mtime is not None and mtime != self._marker_mtime:
+            try:
+                self.load_model()
+            except Exception as e:
+                print(f"Model reload failed: {e}. Keeping version {self.metadata.get('version')}")
+                self._marker_mtime = mtime
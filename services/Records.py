@@ -0,0 +1,87 @@
+# services/Records.py
+from dataclasses import dataclass
+
+
+class Record:
+    """
+    Read-only mapping access for the records below, so they drop in where
+    plain dicts were used: record['points'], record.get('team'), {**record}.
+    Field names are the API's JSON keys, so to_dict() is all an encoder needs.
+    """
+    __slots__ = ()
+
+    def keys(self):
+        return self.__dataclass_fields__.keys()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
+
+@dataclass(frozen=True, slots=True)
+class Driver(Record):
+    id: str
+    firstName: str
+    lastName: str
+    nationality: str
+    number: str
+    code: str
+
+    @classmethod
+    def from_ergast(cls, driver):
+        return cls(
+            driver['driverId'], driver['givenName'], driver['familyName'], driver['nationality'],
+            driver.get('permanentNumber', 'N/A'), driver.get('code', '')
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Standing(Record):
+    position: int
+    points: float
+    wins: int
+    driverId: str
+    firstName: str
+    lastName: str
+    nationality: str
+    team: str
+
+    @classmethod
+    def from_ergast(cls, standing):
+        driver = standing['Driver']
+        return cls(
+            int(standing['position']), float(standing['points']), int(standing['wins']),
+            driver['driverId'], driver['givenName'], driver['familyName'], driver['nationality'],
+            standing['Constructors'][0]['name'] if standing['Constructors'] else 'Unknown'
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RaceResult(Record):
+    round: int
+    name: str
+    position: str
+    points: float
+
+    @classmethod
+    def from_ergast(cls, race):
+        result = race['Results'][0]
+        return cls(int(race['round']), race['raceName'], result.get('position', 'DNF'), float(result.get('points', 0)))
+
+
+@dataclass(frozen=True, slots=True)
+class Prediction(Record):
+    driver: str
+    team: str
+    podiumProbability: float
+    recentForm: float
+    avgPointsPerRace: float
+    confidence: str
@@ -0,0 +1,191 @@
+# services/RefreshScheduler.py
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from services.Metrics import metrics
+from services.FileLock import FileLock
+
+# Assumed session lengths; refreshes are planned from the session end
+RACE_DURATION = timedelta(hours=2)
+SESSION_DURATION = timedelta(hours=1)
+# Ergast usually publishes within this long after a session ends
+PUBLISH_DELAY = timedelta(minutes=30)
+
+# Retry backoff while a race is not yet published, and when to give up on it
+RETRY_DELAYS = [300, 600, 1200, 2400, 3600]
+PUBLISH_DEADLINE = timedelta(hours=48)
+# How often the calendar is re-read (picks up reschedules and the next season)
+PLAN_INTERVAL = 24 * 3600
+# How often a standby worker checks whether it can take over refreshing
+LEADER_POLL_INTERVAL = 30
+
+SCHEDULED_REFRESHES = metrics.counter(
+    'f1_scheduled_refreshes_total', 'Calendar-driven upstream refreshes by outcome', ['outcome']
+)
+
+
+class RefreshScheduler:
+    """
+    Keeps the current season's upstream data fresh from the race calendar.
+
+    After every session (plus PUBLISH_DELAY) it re-downloads the schedule,
+    drivers and standings, syncs race results, then recomputes prediction
+    features and warms the prediction cache. After a race it retries with
+    backoff until the standings and results include that round. While it
+    runs, DataProcessor serves stale current-season data instead of
+    refreshing it on the request path.
+
+    With several worker processes only the one holding the scheduler file
+    lock refreshes; the rest stand by, read what it writes to the shared
+    cache, and one takes over if it exits.
+    """
+
+    def __init__(self, data_processor, feature_source=None, predictor=None):
+        self.data_processor = data_processor
+        self.feature_source = feature_source
+        self.predictor = predictor
+        self._jobs = []  # heap of (due timestamp, sequence, job dict)
+        self._sequence = 0
+        self._next_plan = 0.0
+        self._planned = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader_lock = FileLock(os.path.join(data_processor.cache.lock_dir, 'refresh-scheduler.lock'))
+        self.status = {'running': False, 'role': None, 'lastRun': None, 'lastResult': None, 'lastError': None, 'runs': 0, 'failures': 0}
+
+    def start(self):
+        """Warm everything once, then follow the calendar in a daemon thread"""
+        if self._thread is not None:
+            return self
+        self.data_processor.scheduled_refresh = True
+        self.status['running'] = True
+        self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._leader_lock.release()
+        self.data_processor.scheduled_refresh = False
+        self.status['running'] = False
+
+    def get_status(self):
+        with self._lock:
+            upcoming = sorted(self._jobs)[:5]
+        return {
+            **self.status,
+            'upcoming': [
+                {'due': _iso(due), 'session': job['label'], 'attempt': job['attempt']}
+                for due, _, job in upcoming
+            ]
+        }
+
+    def refresh_now(self, expected_round=None):
+        """
+        One refresh of upstream and derived data. Returns True once upstream
+        covers expected_round (always True when no round is expected).
+        """
+        year = self.data_processor.current_year
+        rounds = self.data_processor.refresh_season(year)
+        published = expected_round is None or min(rounds['standings'], rounds['results']) >= expected_round
+
+        if self.feature_source is not None:
+            self.feature_source.refresh(year)
+        if self.predictor is not None:
+            # Scores the new feature table once so the first request is a cache hit
+            self.predictor.predict_next_race_podium()
+
+        self.status.update(lastRun=_iso(time.time()), lastResult={**rounds, 'expectedRound': expected_round})
+        return published
+
+    def _run(self):
+        self.status['role'] = 'standby'
+        while not self._leader_lock.acquire(blocking=False):
+            if self._stop.wait(LEADER_POLL_INTERVAL):
+                return
+        self.status['role'] = 'leader'
+
+        self._execute({'label': 'startup', 'round': self._last_completed_round(), 'attempt': 0, 'deadline': None})
+        while not self._stop.is_set():
+            if time.time() >= self._next_plan:
+                self._plan()
+            with self._lock:
+                due = self._jobs[0][0] if self._jobs else self._next_plan
+            if self._stop.wait(max(0.0, min(due, self._next_plan) - time.time())):
+                break
+
+            with self._lock:
+                job = heapq.heappop(self._jobs)[2] if self._jobs and self._jobs[0][0] <= time.time() else None
+            if job is not None:
+                self._execute(job)
+
+    def _execute(self, job):
+        """Run a job; reschedule it with backoff if the upstream has not caught up"""
+        self.status['runs'] += 1
+        try:
+            published = self.refresh_now(job['round'])
+            outcome = 'published' if published else 'not_published'
+        except Exception as e:
+            published, outcome = False, 'error'
+            self.status['failures'] += 1
+            self.status['lastError'] = f"{job['label']}: {e}"
+            print(f"Scheduled refresh failed ({job['label']}): {e}")
+        SCHEDULED_REFRESHES.inc(outcome=outcome)
+
+        if published or job['round'] is None:
+            return
+        delay = RETRY_DELAYS[min(job['attempt'], len(RETRY_DELAYS) - 1)]
+        deadline = job['deadline'] or time.time() + PUBLISH_DEADLINE.total_seconds()
+        if time.time() + delay <= deadline:
+            self._add_job(time.time() + delay, {**job, 'attempt': job['attempt'] + 1, 'deadline': deadline})
+
+    def _plan(self):
+        """Queue one refresh after the end of every upcoming session of the current season"""
+        self._next_plan = time.time() + PLAN_INTERVAL
+        try:
+            schedule = self.data_processor.get_schedule(self.data_processor.current_year)
+        except Exception as e:
+            print(f"Refresh planning failed: {e}")
+            return
+
+        now = datetime.now(timezone.utc)
+        for race in schedule:
+            for start in race['sessions']:
+                is_race = start == race['start']
+                due = start + (RACE_DURATION if is_race else SESSION_DURATION) + PUBLISH_DELAY
+                key = (race['round'], start.isoformat())
+                if due <= now or key in self._planned:
+                    continue
+                self._planned.add(key)
+                label = f"{race['name']} {'race' if is_race else start.strftime('%a %H:%M')}"
+                # Only a race changes standings and results, so only a race must show up upstream
+                job = {'label': label, 'round': race['round'] if is_race else None, 'attempt': 0, 'deadline': None}
+                self._add_job(due.timestamp(), job)
+
+    def _add_job(self, due, job):
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._jobs, (due, self._sequence, job))
+
+    def _last_completed_round(self):
+        """Round of the most recent race that should already be published, if any"""
+        try:
+            now = datetime.now(timezone.utc)
+            finished = [
+                race['round'] for race in self.data_processor.get_schedule(self.data_processor.current_year)
+                if race['start'] and race['start'] + RACE_DURATION + PUBLISH_DELAY <= now
+            ]
+            return max(finished, default=None)
+        except Exception as e:
+            print(f"Schedule Error: {e}")
+            return None
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
@@ -0,0 +1,153 @@
+# services/ResponseCache.py
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Longest max-age handed to clients, even for data that never expires
+MAX_AGE_CAP = 24 * 3600
+MAX_ENTRIES = 256
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript')
+
+
+class ResponseCache:
+    """
+    Conditional GET and compression for the JSON API.
+
+    respond() keeps each hot response pre-serialized together with its strong
+    ETag (a hash of the body) and any gzip/brotli variants already produced.
+    While the caller's data version is unchanged the stored bytes are sent
+    as-is, so neither jsonify nor the compressor runs per request.
+    init_app() adds ETag/304 handling and compression to every other
+    non-streamed response.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, min_compress_bytes=COMPRESS_MIN_BYTES):
+        self.max_entries = max_entries
+        self.min_compress_bytes = min_compress_bytes
+        self._entries = OrderedDict()  # key -> {'version', 'body', 'etag', 'encoded': {encoding: bytes}}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'builds': 0, 'not_modified': 0, 'compressions': 0}
+
+    def init_app(self, app):
+        app.after_request(self._finalize)
+
+    def respond(self, key, build, freshness=None):
+        """
+        JSON response for build()'s payload. freshness() returns (version, max_age):
+        the payload is only rebuilt when version changes (or is None), and
+        max_age (seconds, None = never stale) sets Cache-Control.
+        """
+        entry, max_age = self._get_entry(key, build, freshness or (lambda: (None, 0)))
+        if max_age is None or max_age > MAX_AGE_CAP:
+            max_age = MAX_AGE_CAP
+        cache_control = f'public, max-age={int(max_age)}' if max_age >= 1 else 'no-cache'
+
+        if request.if_none_match.contains_weak(entry['etag']):
+            self.stats['not_modified'] += 1
+            response = Response(status=304)
+        else:
+            encoding = self._choose_encoding(len(entry['body']))
+            body = self._encoded(entry, encoding) if encoding else entry['body']
+            response = Response(body, mimetype='application/json')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(entry['etag'])
+        response.headers['Cache-Control'] = cache_control
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
+
+    def _get_entry(self, key, build, freshness):
+        """(entry, max_age), rebuilding the entry unless its version is current"""
+        version, max_age = freshness()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and version is not None and entry['version'] == version:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry, max_age
+
+        json_provider = current_app.json
+        if hasattr(json_provider, 'dumps_bytes'):
+            body = json_provider.dumps_bytes(build())
+        else:
+            body = json_provider.dumps(build()).encode()
+        if version is None:
+            # build() may just have fetched the data, giving it a version
+            version, max_age = freshness()
+        etag = hashlib.sha1(body).hexdigest()
+        new_entry = {'version': version, 'body': body, 'etag': etag, 'encoded': {}}
+
+        with self._lock:
+            self.stats['builds'] += 1
+            previous = self._entries.get(key)
+            if previous is not None and previous['etag'] == etag:
+                # Same bytes under a new version: keep the compressed variants
+                new_entry['encoded'] = previous['encoded']
+            self._entries[key] = new_entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return new_entry, max_age
+
+    def _encoded(self, entry, encoding):
+        body = entry['encoded'].get(encoding)
+        if body is None:
+            body = self._compress(entry['body'], encoding)
+            entry['encoded'][encoding] = body
+        return body
+
+    def _choose_encoding(self, size):
+        """'br' or 'gzip' when the client accepts it and the body is worth compressing"""
+        if size < self.min_compress_bytes:
+            return None
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _compress(self, body, encoding):
+        self.stats['compressions'] += 1
+        if encoding == 'br':
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+    def _finalize(self, response):
+        """ETag + 304 and compression for responses that did not go through respond()"""
+        if response.direct_passthrough or response.is_streamed or response.status_code != 200:
+            return response
+        if response.mimetype not in COMPRESSIBLE_TYPES or 'Content-Encoding' in response.headers:
+            return response
+
+        if request.method in ('GET', 'HEAD') and 'ETag' not in response.headers:
+            response.add_etag()
+            response.headers.setdefault('Cache-Control', 'no-cache')
+            response.make_conditional(request)
+            if response.status_code == 304:
+                self.stats['not_modified'] += 1
+                return response
+
+        encoding = self._choose_encoding(response.content_length or 0)
+        if encoding:
+            response.set_data(self._compress(response.get_data(), encoding))
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,298 @@
+# services/ResultsStore.py
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from services.Records import RaceResult
+from services.UpstreamCache import DEFAULT_CACHE_DIR
+
+
+# Keyed by finishing position: a driver who shared cars (1950s) has several results in one race
+RESULTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS results (
+        year INTEGER NOT NULL,
+        round INTEGER NOT NULL,
+        race_name TEXT NOT NULL,
+        race_date TEXT,
+        driver_id TEXT NOT NULL,
+        constructor TEXT,
+        grid INTEGER,
+        position TEXT,
+        position_text TEXT,
+        points REAL NOT NULL,
+        status TEXT,
+        PRIMARY KEY (year, round, position)
+    )
+'''
+
+
+def result_rows(year, races):
+    """Ergast Races (each with its Results) -> rows for the results table"""
+    rows = []
+    for race in races:
+        for result in race.get('Results', []):
+            constructor = result.get('Constructor', {}).get('name')
+            rows.append((
+                int(year),
+                int(race['round']),
+                race['raceName'],
+                race.get('date'),
+                result['Driver']['driverId'],
+                constructor,
+                int(result['grid']) if result.get('grid') else None,
+                result.get('position', 'DNF'),
+                result.get('positionText'),
+                float(result.get('points', 0)),
+                result.get('status')
+            ))
+    return rows
+
+
+def driver_row(driver):
+    """Ergast Driver -> row for the drivers table"""
+    return (
+        driver['driverId'], driver.get('code'), driver.get('givenName'), driver.get('familyName'),
+        driver.get('nationality'), driver.get('dateOfBirth')
+    )
+
+
+class ResultsStore:
+    """
+    Local SQLite store of race results, indexed by (year, round, driver), plus
+    the historical qualifying results, per-round driver standings and driver
+    details loaded by services.HistoryBackfill.
+    """
+
+    def __init__(self, path=None):
+        cache_dir = os.environ.get('F1_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.path = path or os.path.join(cache_dir, 'results.sqlite3')
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connect()
+        if hasattr(os, 'register_at_fork'):
+            # Forked workers must open their own connection
+            os.register_at_fork(after_in_child=self._connect)
+        with self._lock:
+            self._migrate_results_key()
+        self._db.executescript(RESULTS_TABLE + ''';
+            CREATE INDEX IF NOT EXISTS results_driver ON results (year, driver_id, round);
+            CREATE INDEX IF NOT EXISTS results_career ON results (driver_id, year, round);
+            CREATE TABLE IF NOT EXISTS seasons (
+                year INTEGER PRIMARY KEY,
+                rows INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS qualifying (
+                year INTEGER NOT NULL,
+                round INTEGER NOT NULL,
+                driver_id TEXT NOT NULL,
+                constructor TEXT,
+                position INTEGER,
+                q1 TEXT,
+                q2 TEXT,
+                q3 TEXT,
+                PRIMARY KEY (year, round, driver_id)
+            );
+            CREATE INDEX IF NOT EXISTS qualifying_career ON qualifying (driver_id, year, round);
+            CREATE TABLE IF NOT EXISTS driver_standings (
+                year INTEGER NOT NULL,
+                round INTEGER NOT NULL,
+                driver_id TEXT NOT NULL,
+                position INTEGER,
+                position_text TEXT,
+                points REAL NOT NULL,
+                wins INTEGER NOT NULL,
+                constructor TEXT,
+                PRIMARY KEY (year, round, driver_id)
+            );
+            CREATE INDEX IF NOT EXISTS driver_standings_career ON driver_standings (driver_id, year, round);
+            CREATE TABLE IF NOT EXISTS drivers (
+                driver_id TEXT PRIMARY KEY,
+                code TEXT,
+                given_name TEXT,
+                family_name TEXT,
+                nationality TEXT,
+                date_of_birth TEXT
+            );
+            CREATE TABLE IF NOT EXISTS backfill (
+                year INTEGER NOT NULL,
+                resource TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (year, resource)
+            );
+        ''')
+        self._db.commit()
+
+    def _migrate_results_key(self):
+        """
+        Results used to be keyed by (year, round, driver_id), which dropped the
+        second result of a driver who shared cars (1950s). Re-key an existing
+        table by finishing position; the rows are kept.
+        """
+        if self._results_key() in ([], ['year', 'round', 'position']):
+            return
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            # Another worker may have migrated while this one waited for the write lock
+            if self._results_key() != ['year', 'round', 'position']:
+                self._db.execute('ALTER TABLE results RENAME TO results_old')
+                self._db.execute('DROP INDEX IF EXISTS results_driver')
+                self._db.execute('DROP INDEX IF EXISTS results_career')
+                self._db.execute(RESULTS_TABLE)
+                self._db.execute('INSERT OR REPLACE INTO results SELECT * FROM results_old')
+                self._db.execute('DROP TABLE results_old')
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+    def _results_key(self):
+        """Primary key columns of the results table, in key order ([] before it exists)"""
+        columns = [(row[5], row[1]) for row in self._db.execute('PRAGMA table_info(results)') if row[5]]
+        return [name for _, name in sorted(columns)]
+
+    def _connect(self):
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+
+    def insert_races(self, year, races):
+        """Insert one page of Ergast Races (each with its Results); returns the number of result rows"""
+        return self.insert_rows('results', result_rows(year, races))
+
+    def insert_rows(self, table, rows):
+        """Insert (or replace) pre-built rows into results, qualifying, driver_standings or drivers"""
+        if table not in ('results', 'qualifying', 'driver_standings', 'drivers'):
+            raise ValueError(f"Unknown table {table}")
+        if not rows:
+            return 0
+        placeholders = ', '.join('?' * len(rows[0]))
+        with self._lock:
+            self._db.executemany(f'INSERT OR REPLACE INTO {table} VALUES ({placeholders})', rows)
+            self._db.commit()
+        return len(rows)
+
+    def mark_backfilled(self, year, resource, rows, total):
+        """Record how much of a season's qualifying or standings has been loaded"""
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO backfill (year, resource, rows, total, checked_at) VALUES (?, ?, ?, ?, ?)',
+                (int(year), resource, int(rows), int(total), time.time())
+            )
+            self._db.commit()
+
+    def get_backfill_status(self, year, resource):
+        """{'rows', 'total', 'checkedAt'} for a season's qualifying or standings, or None"""
+        rows = self.query(
+            'SELECT rows, total, checked_at AS checkedAt FROM backfill WHERE year = ? AND resource = ?',
+            (int(year), resource)
+        )
+        return rows[0] if rows else None
+
+    def get_coverage(self):
+        """Per resource: the seasons stored and when they were last synced"""
+        coverage = {
+            'results': self.query('SELECT year, rows, total, checked_at AS checkedAt FROM seasons ORDER BY year')
+        }
+        for row in self.query('SELECT year, resource, rows, total, checked_at AS checkedAt FROM backfill ORDER BY year'):
+            coverage.setdefault(row.pop('resource'), []).append(row)
+        return coverage
+
+    def get_data_version(self):
+        """Changes whenever any season is (re)loaded; cheap enough to check per request"""
+        with self._lock:
+            return self._db.execute(
+                'SELECT (SELECT COALESCE(MAX(checked_at), 0) FROM seasons), '
+                '(SELECT COALESCE(MAX(checked_at), 0) FROM backfill)'
+            ).fetchone()
+
+    def rounds(self, year, table='results'):
+        """Distinct rounds of a season stored in results or driver_standings"""
+        if table not in ('results', 'driver_standings'):
+            raise ValueError(f"Unknown table {table}")
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                f'SELECT DISTINCT round FROM {table} WHERE year = ? ORDER BY round', (int(year),)
+            )]
+
+    def query(self, sql, params=()):
+        """Run a read query; rows as dicts keyed by column name"""
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def mark_checked(self, year, total):
+        """Record that the season was synced against an upstream total"""
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO seasons (year, rows, total, checked_at) VALUES (?, ?, ?, ?)',
+                (int(year), self.row_count(year), int(total), time.time())
+            )
+            self._db.commit()
+
+    def row_count(self, year):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM results WHERE year = ?', (int(year),)).fetchone()[0]
+
+    def rows_before_last_round(self, year):
+        """Offset at which the latest stored round starts, so a sync re-reads it"""
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM results WHERE year = ? AND round < '
+                '(SELECT COALESCE(MAX(round), 0) FROM results WHERE year = ?)',
+                (int(year), int(year))
+            ).fetchone()[0]
+
+    def last_round(self, year):
+        """Highest stored round of a season (0 if none)"""
+        with self._lock:
+            return self._db.execute(
+                'SELECT COALESCE(MAX(round), 0) FROM results WHERE year = ?', (int(year),)
+            ).fetchone()[0]
+
+    def get_season_info(self, year):
+        """Sync bookkeeping for a season, or None if it was never ingested"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT rows, total, checked_at FROM seasons WHERE year = ?', (int(year),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'rows': row[0], 'total': row[1], 'checkedAt': row[2]}
+
+    def get_driver_results(self, driver_id, year):
+        """A driver's races in round order, in the same shape the API returns"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT round, race_name, position, points FROM results '
+                'WHERE year = ? AND driver_id = ? ORDER BY round, CAST(position AS INTEGER)',
+                (int(year), driver_id)
+            ).fetchall()
+        return tuple(RaceResult(*row) for row in rows)
+
+    def get_season_results(self, year, from_round=None):
+        """Result rows of a season (from a round on) as dicts, ordered by round then finishing order"""
+        with self._lock:
+            cursor = self._db.execute(
+                'SELECT year, round, race_name, race_date, driver_id, constructor, grid, position, position_text, points, status '
+                'FROM results WHERE year = ? AND round >= ? ORDER BY round, CAST(position AS INTEGER), driver_id',
+                (int(year), int(from_round or 0))
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    # Usage: python -m services.ResultsStore 2023 2024 ...
+    from services.DataProcessor import DataProcessor
+
+    processor = DataProcessor()
+    for year in sys.argv[1:] or [processor.current_year]:
+        added = processor.ingest_season(int(year))
+        print(f"✓ {year}: {added} new result rows ({processor.results_store.row_count(year)} total)")
@@ -0,0 +1,293 @@
+# services/SessionStore.py
+import json
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+from services.FileLock import FileLock
+
+
+DEFAULT_FASTF1_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+
+# FastF1 cache file -> {table name: how to find the table inside the unpickled 'data'}
+SOURCE_TABLES = {
+    '_extended_timing_data.ff1pkl': {'laps': 0, 'positions': 1},
+    'timing_app_data.ff1pkl': {'stints': None},
+    'weather_data.ff1pkl': {'weather': None},
+    'track_status_data.ff1pkl': {'track_status': None},
+    'race_control_messages.ff1pkl': {'race_control': None},
+    'session_status_data.ff1pkl': {'session_status': None},
+    'lap_count.ff1pkl': {'lap_count': None}
+}
+# Small dict payloads kept as JSON in the manifest rather than as columns
+SOURCE_METADATA = {'driver_info.ff1pkl': 'drivers', 'session_info.ff1pkl': 'session'}
+
+NAT = np.iinfo(np.int64).min
+
+
+class SessionStore:
+    """
+    Columnar, memory-mapped view of the FastF1 cache.
+
+    Each session's .ff1pkl pickles are converted once into one .npy file per
+    column plus a manifest.json. Queries then np.load only the columns they
+    need with mmap_mode='r', so a lap-time lookup never unpickles the session.
+    Timedeltas/datetimes are stored as int64 nanoseconds (NaT = int64 min).
+    """
+
+    def __init__(self, fastf1_cache=None, columnar_dir=None):
+        self.fastf1_cache = fastf1_cache or os.environ.get('F1_FASTF1_CACHE', DEFAULT_FASTF1_CACHE)
+        self.columnar_dir = columnar_dir or os.path.join(self.fastf1_cache, '_columnar')
+        self._manifests = {}
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    def list_sessions(self):
+        """Every session directory in the FastF1 cache as {'year', 'event', 'session'}"""
+        sessions = []
+        if not os.path.isdir(self.fastf1_cache):
+            return sessions
+        for year in sorted(os.listdir(self.fastf1_cache)):
+            year_dir = os.path.join(self.fastf1_cache, year)
+            if not year.isdigit() or not os.path.isdir(year_dir):
+                continue
+            for event in sorted(os.listdir(year_dir)):
+                event_dir = os.path.join(year_dir, event)
+                for session in sorted(os.listdir(event_dir)) if os.path.isdir(event_dir) else []:
+                    if os.path.isdir(os.path.join(event_dir, session)):
+                        sessions.append({'year': int(year), 'event': event, 'session': session})
+        return sessions
+
+    def get_manifest(self, year, event, session):
+        """Manifest for a session, converting the pickles first if needed"""
+        key = (str(year), event, session)
+        manifest = self._manifests.get(key)
+        if manifest is not None:
+            return manifest
+
+        with self._lock:
+            if key not in self._manifests:
+                source_dir = self._source_dir(*key)
+                if not os.path.isdir(source_dir):
+                    raise FileNotFoundError(f"No cached session {year}/{event}/{session}")
+                manifest = self._read_manifest(*key)
+                if manifest is None or manifest['sourceMtimes'] != self._source_mtimes(source_dir):
+                    # Another worker may have converted it while we waited for the lock
+                    with self._convert_lock(*key):
+                        manifest = self._read_manifest(*key)
+                        if manifest is None or manifest['sourceMtimes'] != self._source_mtimes(source_dir):
+                            manifest = self._convert(*key)
+                self._manifests[key] = manifest
+            return self._manifests[key]
+
+    def convert_session(self, year, event, session):
+        """Unpickle one session and write its columns + manifest; returns the manifest"""
+        with self._convert_lock(year, event, session):
+            return self._convert(year, event, session)
+
+    def _convert(self, year, event, session):
+        source_dir = self._source_dir(year, event, session)
+        target_dir = self._target_dir(year, event, session)
+        manifest = {'tables': {}, 'sourceMtimes': self._source_mtimes(source_dir)}
+
+        for filename, tables in SOURCE_TABLES.items():
+            path = os.path.join(source_dir, filename)
+            if not os.path.exists(path):
+                continue
+            data = self._unpickle(path)
+            for table, position in tables.items():
+                frame = data if position is None else data[position]
+                manifest['tables'][table] = self._write_table(os.path.join(target_dir, table), frame)
+
+        for filename, name in SOURCE_METADATA.items():
+            path = os.path.join(source_dir, filename)
+            if os.path.exists(path):
+                manifest[name] = json.loads(json.dumps(self._unpickle(path), default=_json_default))
+
+        os.makedirs(target_dir, exist_ok=True)
+        tmp_path = os.path.join(target_dir, f'manifest.json.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(target_dir, 'manifest.json'))
+        return manifest
+
+    def column(self, year, event, session, table, name):
+        """One column as a read-only memory-mapped array (loaded on first use)"""
+        key = (str(year), event, session, table, name)
+        array = self._columns.get(key)
+        if array is None:
+            manifest = self.get_manifest(year, event, session)
+            if name not in manifest['tables'].get(table, {}).get('columns', {}):
+                raise KeyError(f"No column {table}.{name} in {year}/{event}/{session}")
+            path = os.path.join(self._target_dir(year, event, session), table, f'{name}.npy')
+            array = np.load(path, mmap_mode='r')
+            self._columns[key] = array
+        return array
+
+    def get_lap_times(self, year, event, session, driver):
+        """Per-lap times and sectors (seconds) for one driver"""
+        rows = self._driver_rows(year, event, session, 'laps', driver)
+        names = ('NumberOfLaps', 'LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time',
+                 'NumberOfPitStops', 'PitInTime', 'PitOutTime', 'IsPersonalBest')
+        # Gather only the needed rows of only the needed columns
+        col = {name: self.column(year, event, session, 'laps', name)[rows] for name in names}
+
+        laps = []
+        for i in range(len(rows)):
+            laps.append({
+                'lap': int(col['NumberOfLaps'][i]),
+                'lapTime': _seconds(col['LapTime'][i]),
+                'sector1': _seconds(col['Sector1Time'][i]),
+                'sector2': _seconds(col['Sector2Time'][i]),
+                'sector3': _seconds(col['Sector3Time'][i]),
+                'pitStops': int(col['NumberOfPitStops'][i]),
+                'pitIn': bool(col['PitInTime'][i] != NAT),
+                'pitOut': bool(col['PitOutTime'][i] != NAT),
+                'personalBest': bool(col['IsPersonalBest'][i])
+            })
+        return laps
+
+    def get_stints(self, year, event, session, driver):
+        """Tyre stints for one driver: compound, new/used and the laps covered"""
+        app_rows = self._driver_rows(year, event, session, 'stints', driver)
+        stint_numbers = self.column(year, event, session, 'stints', 'Stint')[app_rows]
+        compounds = self.column(year, event, session, 'stints', 'Compound')[app_rows]
+        new_flags = self.column(year, event, session, 'stints', 'New')[app_rows]
+        tyre_laps = self.column(year, event, session, 'stints', 'TotalLaps')[app_rows]
+
+        lap_rows = self._driver_rows(year, event, session, 'laps', driver)
+        lap_numbers = self.column(year, event, session, 'laps', 'NumberOfLaps')[lap_rows]
+        pit_stops = self.column(year, event, session, 'laps', 'NumberOfPitStops')[lap_rows]
+
+        stints = []
+        for stint in np.unique(stint_numbers):
+            mask = stint_numbers == stint
+            compound = next((str(c) for c in compounds[mask] if c), None)
+            new = next((n for n in new_flags[mask] if n), None)
+            stint_laps = lap_numbers[pit_stops == stint]
+            stints.append({
+                'stint': int(stint) + 1,
+                'compound': compound,
+                'new': new == 'True' if new is not None else None,
+                'startLap': int(stint_laps.min()) if len(stint_laps) else None,
+                'endLap': int(stint_laps.max()) if len(stint_laps) else None,
+                'tyreAgeAtEnd': int(np.nanmax(tyre_laps[mask])) if np.isfinite(tyre_laps[mask]).any() else None
+            })
+        return stints
+
+    def get_weather(self, year, event, session):
+        """Weather samples over the session, time in seconds from session start"""
+        manifest = self.get_manifest(year, event, session)
+        names = list(manifest['tables']['weather']['columns'])
+        columns = {name: self.column(year, event, session, 'weather', name) for name in names}
+
+        samples = []
+        for i in range(manifest['tables']['weather']['rows']):
+            sample = {}
+            for name, values in columns.items():
+                sample[name] = _seconds(values[i]) if name == 'Time' else values[i].item()
+            samples.append(sample)
+        return samples
+
+    def resolve_driver(self, year, event, session, driver):
+        """Accept a racing number ('1') or three-letter code ('VER'); returns the racing number"""
+        drivers = self.get_manifest(year, event, session).get('drivers', {})
+        if str(driver) in drivers:
+            return str(driver)
+        for number, info in drivers.items():
+            if info.get('Tla', '').upper() == str(driver).upper():
+                return number
+        raise KeyError(f"Unknown driver {driver}")
+
+    def _driver_rows(self, year, event, session, table, driver):
+        number = self.resolve_driver(year, event, session, driver)
+        return np.flatnonzero(self.column(year, event, session, table, 'Driver') == number)
+
+    def _write_table(self, directory, frame):
+        """Write a DataFrame or dict-of-lists as one .npy per column; returns the table manifest"""
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(frame, 'columns'):
+            columns = {name: frame[name].to_numpy() for name in frame.columns}
+        else:
+            columns = {name: np.asarray(values, dtype=object) for name, values in frame.items()}
+
+        table = {'rows': 0, 'columns': {}}
+        for name, values in columns.items():
+            array, kind = _to_columnar(values)
+            np.save(os.path.join(directory, f'{name}.npy'), array)
+            table['columns'][name] = {'kind': kind, 'dtype': str(array.dtype)}
+            table['rows'] = len(array)
+        return table
+
+    def _unpickle(self, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)['data']
+
+    def _read_manifest(self, year, event, session):
+        try:
+            with open(os.path.join(self._target_dir(year, event, session), 'manifest.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _source_mtimes(self, source_dir):
+        return {
+            name: os.stat(os.path.join(source_dir, name)).st_mtime
+            for name in sorted(os.listdir(source_dir)) if name.endswith('.ff1pkl')
+        }
+
+    def _source_dir(self, year, event, session):
+        return os.path.join(self.fastf1_cache, str(year), event, session)
+
+    def _target_dir(self, year, event, session):
+        return os.path.join(self.columnar_dir, str(year), event, session)
+
+    def _convert_lock(self, year, event, session):
+        """One conversion of a session at a time across worker processes"""
+        return FileLock(os.path.join(self._target_dir(year, event, session), '.convert.lock'))
+
+
+def _to_columnar(values):
+    """Convert a column to an mmap-able array; returns (array, kind)"""
+    if values.dtype.kind == 'm':
+        return values.astype('timedelta64[ns]').view(np.int64), 'timedelta'
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').view(np.int64), 'datetime'
+    if values.dtype.kind in 'biuf':
+        return values, values.dtype.name
+
+    # Object columns: promote uniform Python scalars, otherwise store as fixed-width strings
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, timedelta) for v in present):
+        return np.array([NAT if v is None else v // timedelta(microseconds=1) * 1000 for v in values], dtype=np.int64), 'timedelta'
+    if present and all(isinstance(v, datetime) for v in present):
+        return np.array([NAT if v is None else np.datetime64(v, 'ns').view(np.int64) for v in values], dtype=np.int64), 'datetime'
+    if present and all(isinstance(v, bool) for v in present) and len(present) == len(values):
+        return values.astype(bool), 'bool'
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64), 'float64'
+    return np.array(['' if v is None else str(v) for v in values], dtype=str), 'str'
+
+
+def _seconds(nanoseconds):
+    """int64 nanoseconds (or NaT marker) -> float seconds or None"""
+    value = int(nanoseconds)
+    return None if value == NAT else round(value / 1e9, 3)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return str(value)
+
+
+if __name__ == '__main__':
+    # Usage: python -m services.SessionStore  (converts every cached session)
+    store = SessionStore()
+    for info in store.list_sessions():
+        manifest = store.convert_session(info['year'], info['event'], info['session'])
+        rows = sum(table['rows'] for table in manifest['tables'].values())
+        print(f"✓ {info['year']}/{info['event']}/{info['session']}: {len(manifest['tables'])} tables, {rows} rows")
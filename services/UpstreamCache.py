@@ -0,0 +1,239 @@
+# services/UpstreamCache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from services.FileLock import FileLock
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'ergast')
+
+
+class UpstreamCache:
+    """Persistent TTL cache for upstream JSON payloads with stale-while-revalidate
+
+    Entries live in a small in-memory LRU in front of a SQLite file so they
+    survive restarts. An entry past its TTL is still served (as "stale") while
+    a single background refresh for that key runs.
+
+    The SQLite file (WAL mode) is shared by every worker process on the host.
+    Fills and refreshes take a per-key file lock, so one worker fetches a key
+    while the others wait for it or keep serving stale; a stale in-memory
+    entry is re-read from the file first in case another worker refreshed it.
+    """
+
+    TOUCH_INTERVAL = 60
+
+    def __init__(self, path=None, max_entries=256, max_bytes=64 * 1024 * 1024):
+        cache_dir = os.environ.get('F1_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.path = path or os.path.join(cache_dir, 'upstream.sqlite3')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.lock_dir = os.path.join(os.path.dirname(self.path), 'locks')
+
+        self._memory = OrderedDict()  # key -> [value, expires_at, last_touched, written_at]
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'refresh_errors': 0, 'evictions': 0}
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connect()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._connect)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' expires_at REAL,'
+            ' last_access REAL NOT NULL,'
+            ' written_at REAL NOT NULL DEFAULT 0)'
+        )
+        try:
+            # Caches created before entries carried a write stamp
+            self._db.execute('ALTER TABLE entries ADD COLUMN written_at REAL NOT NULL DEFAULT 0')
+        except sqlite3.OperationalError:
+            pass
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+        self._db.commit()
+
+    def _connect(self):
+        """
+        Open this process's connection and locks. Also runs in forked children
+        (e.g. gunicorn workers after a preloading master): SQLite connections
+        and held locks must not be carried across fork.
+        """
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._fetch_locks = {}
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+
+    def get(self, key):
+        """Return (value, is_fresh) for a cached key, or (None, False) if absent"""
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                entry = self._memory[key]
+                value, expires_at = entry[0], entry[1]
+                # Keep the on-disk LRU order roughly in step with memory hits
+                if now - entry[2] > self.TOUCH_INTERVAL:
+                    entry[2] = now
+                    self._db.execute('UPDATE entries SET last_access = ? WHERE key = ?', (now, key))
+                    self._db.commit()
+                if expires_at is None or expires_at > now:
+                    return value, True
+
+                # Stale here; another worker may already have refreshed the shared file
+                row = self._db.execute('SELECT written_at FROM entries WHERE key = ?', (key,)).fetchone()
+                if row is None or row[0] <= entry[3]:
+                    return value, False
+
+            row = self._db.execute(
+                'SELECT value, expires_at, written_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+
+            self._db.execute('UPDATE entries SET last_access = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            value, expires_at = json.loads(row[0]), row[1]
+            self._remember(key, value, expires_at, now, row[2])
+            return value, expires_at is None or expires_at > now
+
+    def get_version(self, key):
+        """
+        (written_at, expires_at) of a fresh entry, or None if it is absent or stale.
+        written_at changes whenever the value is replaced, so it can version
+        anything derived from the value. Does not count as a hit or miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                written_at, expires_at = entry[3], entry[1]
+            else:
+                row = self._db.execute('SELECT written_at, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                written_at, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            return None
+        return written_at, expires_at
+
+    def set(self, key, value, ttl=None):
+        """Store a value; ttl=None keeps it until evicted"""
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        payload = json.dumps(value, separators=(',', ':'))
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access, written_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (key, payload, len(payload), expires_at, now, now)
+            )
+            self._evict_disk()
+            self._db.commit()
+            self._remember(key, value, expires_at, now, now)
+
+    def get_or_fetch(self, key, fetch, ttl=None, refresh_stale=True):
+        """
+        Return the cached value for key, calling fetch() to fill or refresh it.
+        fetch() returning None means "nothing to cache" and is passed through.
+        refresh_stale=False serves stale values without starting a refresh
+        (someone else keeps the key fresh); misses are still fetched.
+        """
+        value, fresh = self.get(key)
+        if value is not None and fresh:
+            self.stats['hits'] += 1
+            return value
+
+        if value is not None:
+            self.stats['stale'] += 1
+            if refresh_stale:
+                self._refresh_in_background(key, fetch, ttl)
+            return value
+
+        # Single-flight: concurrent misses for the same key wait for one fetch,
+        # first within this process, then across workers via the key's file lock
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+        with fetch_lock, FileLock.for_key(self.lock_dir, key):
+            value, _ = self.get(key)
+            if value is not None:
+                self.stats['hits'] += 1
+                return value
+
+            self.stats['misses'] += 1
+            value = fetch()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+
+    def get_stats(self):
+        """Counters plus current sizes, for health/debug output"""
+        with self._lock:
+            entries, total_bytes = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['stale']
+        return {
+            **self.stats,
+            'hit_ratio': round((self.stats['hits'] + self.stats['stale']) / lookups, 4) if lookups else 0.0,
+            'entries': entries,
+            'bytes': total_bytes,
+            'memory_entries': len(self._memory)
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute('DELETE FROM entries')
+            self._db.commit()
+
+    def _refresh_in_background(self, key, fetch, ttl):
+        """Start at most one refresh thread per key"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            file_lock = FileLock.for_key(self.lock_dir, key)
+            try:
+                # Another worker is already refreshing this key; its result lands in the shared file
+                if not file_lock.acquire(blocking=False):
+                    return
+                if self.get(key)[1]:
+                    return
+                value = fetch()
+                if value is not None:
+                    self.set(key, value, ttl)
+                    self.stats['refreshes'] += 1
+            except Exception as e:
+                self.stats['refresh_errors'] += 1
+                print(f"Cache refresh failed for {key}: {e}")
+            finally:
+                file_lock.release()
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='cache-refresh', daemon=True).start()
+
+    def _remember(self, key, value, expires_at, now, written_at):
+        self._memory[key] = [value, expires_at, now, written_at]
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop least recently used rows until the store fits in max_bytes"""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute('SELECT key, size FROM entries ORDER BY last_access LIMIT 1').fetchone()
+            if row is None:
+                break
+            self._db.execute('DELETE FROM entries WHERE key = ?', (row[0],))
+            self._memory.pop(row[0], None)
+            self.stats['evictions'] += 1
+            total -= row[1]
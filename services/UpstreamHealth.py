@@ -0,0 +1,112 @@
+# services/UpstreamHealth.py
+import threading
+import time
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling the upstream when the circuit is open or the URL recently failed"""
+
+
+class CircuitBreaker:
+    """
+    Tracks upstream health: opens after repeated failures, lets a single
+    probe through after a cooldown, and remembers failing URLs for a short time.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, cooldown=30, negative_ttl=20):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.negative_ttl = negative_ttl
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'negative_hits': 0}
+
+        self._failed_urls = {}  # url -> retry-after timestamp
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self, url):
+        """Raise UpstreamUnavailable if this call should not go upstream"""
+        now = time.time()
+        with self._lock:
+            retry_at = self._failed_urls.get(url)
+            if retry_at is not None:
+                if retry_at > now:
+                    self.stats['negative_hits'] += 1
+                    raise UpstreamUnavailable(f"{url} failed recently")
+                del self._failed_urls[url]
+
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and now - self.opened_at >= self.cooldown:
+                # Let exactly one probe through; everyone else keeps failing fast
+                self.state = self.HALF_OPEN
+                return
+
+            self.stats['rejected'] += 1
+            raise UpstreamUnavailable(f"Upstream circuit is {self.state}")
+
+    def record_success(self):
+        with self._lock:
+            self.stats['successes'] += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self.opened_at = None
+
+    def record_failure(self, url, error, retry_after=None):
+        """
+        Count a failed call. retry_after (seconds, from a 429) means the upstream
+        is throttling us: open the circuit until then instead of probing sooner.
+        """
+        now = time.time()
+        with self._lock:
+            self.stats['failures'] += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            self._remember_failed(url, now + max(self.negative_ttl, retry_after or 0), now)
+
+            if retry_after is not None:
+                self.state = self.OPEN
+                # Pushes the probe back so it is not sent before retry_after
+                self.opened_at = max(now, now + retry_after - self.cooldown)
+            elif self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = now
+
+    def record_not_found(self, url):
+        """The upstream answered, but with nothing useful: cache the miss without counting it against health"""
+        now = time.time()
+        with self._lock:
+            self.stats['successes'] += 1
+            self.consecutive_failures = 0
+            self._remember_failed(url, now + self.negative_ttl, now)
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self.opened_at = None
+
+    def _remember_failed(self, url, retry_at, now):
+        """Negatively cache url; expired entries are dropped at most once per negative_ttl"""
+        self._failed_urls[url] = retry_at
+        if now >= self._next_prune:
+            self._failed_urls = {u: t for u, t in self._failed_urls.items() if t > now}
+            self._next_prune = now + self.negative_ttl
+
+    def get_status(self):
+        """Snapshot for /api/health"""
+        with self._lock:
+            now = time.time()
+            return {
+                'state': self.state,
+                'consecutiveFailures': self.consecutive_failures,
+                'retryIn': round(max(0.0, self.opened_at + self.cooldown - now), 1) if self.state == self.OPEN else 0,
+                'lastError': self.last_error,
+                'negativelyCachedUrls': sum(1 for retry_at in self._failed_urls.values() if retry_at > now),
+                **self.stats
+            }
@@ -0,0 +1,39 @@
+# tests/conftest.py
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from services.ModelRegistry import ModelRegistry, FEATURES
+from services.RacePredictionService import RacePredictionService
+
+
+def train_small_forest(seed=0):
+    """(model, scaler, raw rows) for a quick five-feature podium forest"""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform([0, 0, 0, 0, 0], [18, 1, 1, 10, 20], size=(300, len(FEATURES)))
+    y = (X[:, 0] + 5 * X[:, 1] + rng.normal(0, 2, len(X)) > 10).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, max_depth=4, random_state=seed).fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+@pytest.fixture(params=[0, 1])
+def small_forest(request):
+    """train_small_forest() for two seeds"""
+    return train_small_forest(request.param)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """A registry holding two versions, 'v1' (active) and 'v2'"""
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    for seed, version in enumerate(('v1', 'v2')):
+        model, scaler, X = train_small_forest(seed)
+        registry.save(model, scaler, {'version': version, 'accuracy': 0.9}, activate=version == 'v1', parity_sample=X)
+    return registry
+
+
+@pytest.fixture
+def predictor(registry):
+    return RacePredictionService(registry=registry)
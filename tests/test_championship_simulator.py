@@ -0,0 +1,57 @@
+# tests/test_championship_simulator.py
+from concurrent.futures import ThreadPoolExecutor
+
+import services.ChampionshipSimulator as championship
+from services.ChampionshipSimulator import ChampionshipSimulator, DEFAULT_SIMULATIONS
+
+
+class FakeResultsStore:
+    def get_season_results(self, year):
+        return []
+
+
+class FakeDataProcessor:
+    results_store = FakeResultsStore()
+
+    def get_driver_standings(self, year):
+        return [
+            {'driverId': driver_id, 'firstName': driver_id.title(), 'lastName': 'Driver', 'team': 'Team', 'points': points, 'wins': 0}
+            for driver_id, points in (('alpha', 30.0), ('bravo', 20.0), ('charlie', 10.0))
+        ]
+
+    def get_remaining_rounds(self, year):
+        return 2
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Stands in for the process pool and counts the chunks submitted to it"""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def simulator_with_pool(monkeypatch):
+    simulator = ChampionshipSimulator(FakeDataProcessor(), max_workers=1)
+    pool = RecordingPool()
+    monkeypatch.setattr(simulator, '_get_pool', lambda: pool)
+    return simulator, pool
+
+
+def test_default_run_goes_to_the_process_pool(monkeypatch):
+    simulator, pool = simulator_with_pool(monkeypatch)
+    result = simulator.get_odds(2024, DEFAULT_SIMULATIONS)
+
+    assert pool.submitted == DEFAULT_SIMULATIONS // championship.CHUNK_SIMULATIONS
+    assert result['final'] and result['simulations'] == DEFAULT_SIMULATIONS
+
+
+def test_small_run_stays_in_process(monkeypatch):
+    simulator, pool = simulator_with_pool(monkeypatch)
+    simulator.get_odds(2024, championship.PROCESS_POOL_THRESHOLD - 1)
+
+    assert pool.submitted == 0
@@ -0,0 +1,60 @@
+# tests/test_dashboard_service.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.DashboardService import DashboardService
+
+
+class FakeResultsStore:
+    def get_season_info(self, year):
+        return {'rows': 20, 'total': 20}
+
+
+class FakeDataProcessor:
+    current_year = 2024
+    results_store = FakeResultsStore()
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def get_drivers(self):
+        return []
+
+    def get_driver_standings(self, year):
+        return [{'driverId': 'alpha'}]
+
+    def get_data_version(self, resource, year=None):
+        return f'{resource}-v1', 60
+
+
+class FakePredictor:
+    def __init__(self):
+        self.version = 'model-v1'
+        self.calls = 0
+
+    def predict_next_race_podium(self):
+        self.calls += 1
+        return []
+
+    def get_data_version(self):
+        return self.version
+
+
+@pytest.fixture
+def dashboard():
+    return DashboardService(FakeDataProcessor(), FakePredictor())
+
+
+def test_bootstrap_without_predictions_runs_no_inference(dashboard):
+    bundle = dashboard.get_bootstrap(2024, 0, predictions=False)
+
+    assert dashboard.predictor.calls == 0
+    assert 'predictions' not in bundle and bundle['standings'] == [{'driverId': 'alpha'}]
+
+
+def test_model_swap_changes_the_version_only_when_predictions_are_included(dashboard):
+    with_predictions = dashboard.get_data_version(2024, 0)
+    without_predictions = dashboard.get_data_version(2024, 0, predictions=False)
+    dashboard.predictor.version = 'model-v2'
+
+    assert dashboard.get_data_version(2024, 0) != with_predictions
+    assert dashboard.get_data_version(2024, 0, predictions=False) == without_predictions
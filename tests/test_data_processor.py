@@ -0,0 +1,51 @@
+# tests/test_data_processor.py
+import pytest
+
+from services.DataProcessor import DataProcessor
+
+STANDINGS = [
+    {'driverId': 'alpha', 'firstName': 'Al', 'lastName': 'Pha', 'team': 'A', 'points': 60.0, 'wins': 2, 'position': 1},
+    {'driverId': 'bravo', 'firstName': 'Bra', 'lastName': 'Vo', 'team': 'B', 'points': 30.0, 'wins': 0, 'position': 2},
+]
+
+
+class EmptyResultsStore:
+    """A season that has not been ingested yet"""
+
+    def get_season_info(self, year):
+        return None
+
+    def get_season_results(self, year, from_round=None):
+        return []
+
+
+@pytest.fixture
+def cold_processor(monkeypatch):
+    data_processor = DataProcessor(cache=object(), results_store=EmptyResultsStore())
+    monkeypatch.setattr(data_processor, '_sync_season_in_background', lambda year: None)
+    monkeypatch.setattr(data_processor, 'get_driver_standings', lambda year: STANDINGS)
+    return data_processor
+
+
+def test_compare_many_counts_races_per_driver_before_the_season_is_ingested(cold_processor, monkeypatch):
+    races = {'alpha': 3, 'bravo': 2}
+    monkeypatch.setattr(cold_processor, '_get_driver_races', lambda driver_id, year: (None,) * races[driver_id])
+
+    result = cold_processor.compare_many(['alpha', 'bravo'], 2024)
+
+    assert [d['avgPoints'] for d in result['drivers']] == [20.0, 15.0]
+    assert result['differences']['avgPoints'] == [[0.0, 5.0], [-5.0, 0.0]]
+    assert result['complete']
+
+
+def test_compare_many_is_incomplete_when_a_race_count_cannot_be_fetched(cold_processor, monkeypatch):
+    def driver_races(driver_id, year):
+        if driver_id == 'bravo':
+            raise ConnectionError('upstream down')
+        return (None,) * 3
+    monkeypatch.setattr(cold_processor, '_get_driver_races', driver_races)
+
+    result = cold_processor.compare_many('all', 2024)
+
+    assert result['drivers'][0]['avgPoints'] == 20.0
+    assert not result['complete']
@@ -0,0 +1,81 @@
+# tests/test_feature_engineer.py
+import random
+
+import pytest
+
+from services.FeatureEngineer import FeatureEngineer
+from services.ResultsStore import ResultsStore
+
+YEAR = 2024
+DRIVERS = [f'driver_{i}' for i in range(12)]
+POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1, 0, 0]
+
+
+class StubDataProcessor:
+    """Just what FeatureEngineer reads: the results store, the year and driver names"""
+
+    def __init__(self, store):
+        self.results_store = store
+        self.current_year = YEAR
+
+    def get_driver_standings(self, year):
+        return []
+
+
+def race(round_, order):
+    """An Ergast race with results for the drivers in `order` (finishing order)"""
+    return {
+        'round': str(round_), 'raceName': f'Race {round_}', 'date': f'{YEAR}-01-01',
+        'Results': [
+            {
+                'Driver': {'driverId': driver_id}, 'Constructor': {'name': f'Team {DRIVERS.index(driver_id) // 2}'},
+                'grid': '1', 'position': str(i + 1), 'positionText': str(i + 1), 'points': str(POINTS[i]), 'status': 'Finished'
+            }
+            for i, driver_id in enumerate(order)
+        ]
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(str(tmp_path / 'results.sqlite3'))
+
+
+def features_by_driver(engineer):
+    features, _ = engineer.get_features(YEAR)
+    return {row['driverId']: row for row in features}
+
+
+def test_incremental_matches_full_rebuild(store, tmp_path):
+    rng = random.Random(1)
+    orders = [rng.sample(DRIVERS, len(DRIVERS)) for _ in range(8)]
+    incremental = FeatureEngineer(StubDataProcessor(store), feature_dir=str(tmp_path / 'incremental'))
+
+    # Each round arrives in two pages; the engineer checks after every page
+    for round_, order in enumerate(orders, start=1):
+        for page in (order[:5], order[5:]):
+            full_race = race(round_, order)
+            full_race['Results'] = [r for r in full_race['Results'] if r['Driver']['driverId'] in page]
+            store.insert_races(YEAR, [full_race])
+            incremental.refresh(YEAR)
+
+    rebuilt = FeatureEngineer(StubDataProcessor(store), feature_dir=str(tmp_path / 'rebuilt'))
+    assert features_by_driver(incremental) == features_by_driver(rebuilt)
+    assert incremental.get_features(YEAR)[1] == rebuilt.get_features(YEAR)[1]
+
+    # The saved state is the corrected one too
+    reloaded = FeatureEngineer(StubDataProcessor(store), feature_dir=str(tmp_path / 'incremental'))
+    assert features_by_driver(reloaded) == features_by_driver(rebuilt)
+
+
+def test_resynced_last_round_changes_version(store, tmp_path):
+    order = list(DRIVERS)
+    store.insert_races(YEAR, [race(1, order)])
+    engineer = FeatureEngineer(StubDataProcessor(store), feature_dir=str(tmp_path / 'features'))
+    version = engineer.refresh(YEAR)
+
+    # A late penalty swaps the first two finishers of the latest round
+    store.insert_races(YEAR, [race(1, [order[1], order[0]] + order[2:])])
+    assert engineer.refresh(YEAR) != version
+    assert features_by_driver(engineer)[order[1]]['wins'] == 1
+    assert features_by_driver(engineer)[order[0]]['wins'] == 0
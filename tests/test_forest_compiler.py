@@ -0,0 +1,43 @@
+# tests/test_forest_compiler.py
+import numpy as np
+
+from services.ForestCompiler import PARITY_TOLERANCE, CompiledForest, check_parity, compile_forest
+
+
+def boundary_rows(compiled, X):
+    """Rows whose features sit exactly on, and one ulp either side of, each split threshold"""
+    splits = np.isfinite(compiled.threshold)
+    rows = []
+    for feature, threshold in zip(compiled.feature[splits], compiled.threshold[splits]):
+        for value in (np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)):
+            row = X[len(rows) % len(X)].copy()
+            row[feature] = value
+            rows.append(row)
+    return np.array(rows)
+
+
+def test_compiled_forest_matches_sklearn(small_forest):
+    model, scaler, X = small_forest
+    compiled = compile_forest(model, scaler)
+    rows = np.vstack([X, boundary_rows(compiled, X)])
+
+    np.testing.assert_allclose(compiled.predict_proba(rows), model.predict_proba(scaler.transform(rows)), rtol=0, atol=PARITY_TOLERANCE)
+    assert check_parity(compiled, model, scaler, rows) <= PARITY_TOLERANCE
+
+
+def test_compiled_forest_without_scaler_matches_sklearn(small_forest):
+    model, scaler, X = small_forest
+    model.fit(X, model.predict(scaler.transform(X)))
+    compiled = compile_forest(model)
+
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_saved_forest_loads_memory_mapped_with_the_same_predictions(small_forest, tmp_path):
+    model, scaler, X = small_forest
+    compiled = compile_forest(model, scaler)
+    compiled.save(str(tmp_path))
+
+    loaded = CompiledForest.load(str(tmp_path))
+    assert isinstance(loaded.threshold, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
@@ -0,0 +1,76 @@
+# tests/test_history_backfill.py
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from services.HistoryBackfill import HistoryBackfill
+from services.ResultsStore import ResultsStore
+
+YEAR = 1950
+# Server-side page cap, below the PAGE_SIZE the backfill asks for
+MAX_LIMIT = 3
+
+
+def results():
+    """Two races; in round 2 'fangio' took over a second car, so he has two results"""
+    finishers = {1: ['farina', 'fagioli', 'parnell', 'fangio'], 2: ['fangio', 'ascari', 'fangio', 'villoresi']}
+    return [
+        (round_, {
+            'number': str(i), 'position': str(i + 1), 'positionText': str(i + 1), 'points': str(max(8 - 2 * i, 0)),
+            'grid': str(i + 1), 'status': 'Finished', 'Driver': {'driverId': driver_id}, 'Constructor': {'name': 'Alfa Romeo'}
+        })
+        for round_, drivers in finishers.items() for i, driver_id in enumerate(drivers)
+    ]
+
+
+class StubUpstream:
+    """The parts of DataProcessor the backfill uses, serving paged results like Ergast"""
+    ergast_base_url = 'http://ergast.test/api/f1'
+    current_year = 2025
+
+    def __init__(self, store):
+        self.results_store = store
+        self.requests = []
+
+    def _fetch_bytes(self, url):
+        self.requests.append(url)
+        query = parse_qs(urlparse(url).query)
+        limit = min(int(query['limit'][0]), MAX_LIMIT)
+        offset = int(query['offset'][0])
+        rows = results()
+        races = {}
+        for round_, result in rows[offset:offset + limit]:
+            races.setdefault(round_, {'season': str(YEAR), 'round': str(round_), 'raceName': f'Race {round_}', 'Results': []})
+            races[round_]['Results'].append(result)
+        return json.dumps({'MRData': {
+            'limit': str(limit), 'offset': str(offset), 'total': str(len(rows)),
+            'RaceTable': {'season': str(YEAR), 'Races': list(races.values())}
+        }}).encode()
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    return StubUpstream(ResultsStore(str(tmp_path / 'results.sqlite3')))
+
+
+def backfill(upstream):
+    return HistoryBackfill(upstream, fetch_workers=1, parse_workers=0, max_requests_per_second=0).run([YEAR], ['results'])
+
+
+def test_backfill_keeps_shared_drives_and_follows_server_page_size(upstream):
+    report = backfill(upstream)
+
+    assert report['results']['rows'] == len(results())
+    assert upstream.results_store.row_count(YEAR) == len(results())
+    fangio = upstream.results_store.get_driver_results('fangio', YEAR)
+    assert [(r.round, r.position) for r in fangio] == [(1, '4'), (2, '1'), (2, '3')]
+
+
+def test_complete_season_is_not_downloaded_again(upstream):
+    backfill(upstream)
+    upstream.requests.clear()
+
+    report = backfill(upstream)
+    assert upstream.requests == []
+    assert report['results']['seasons'] == 0
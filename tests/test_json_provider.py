@@ -0,0 +1,33 @@
+# tests/test_json_provider.py
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from services.JsonProvider import FastJSONProvider
+from services.Records import Prediction, Standing
+
+pytest.importorskip('orjson')
+
+PAYLOAD = {
+    'success': True,
+    'data': [
+        Standing(1, 437.0, 19, 'max_verstappen', 'Max', 'Verstappen', 'Dutch', 'Red Bull'),
+        Standing(2, 240.5, 2, 'perez', 'Sergio', 'Pérez', 'Mexican', 'Red Bull'),
+    ],
+    'predictions': [Prediction('Nico Hülkenberg', 'Haas F1 Team', np.float32(0.1), np.float64(0.35), 1.25, 'Low')],
+    'matrix': np.array([[0.1, 0.9], [0.75, 0.25]]),
+    'count': np.int64(3),
+    'nested': {'zeta': [], 'alpha': {'b': None, 'a': 'Räikkönen'}},
+    'timestamp': datetime(2024, 3, 2, 15, 0, tzinfo=timezone.utc),
+}
+
+
+@pytest.mark.parametrize('indent', [False, True])
+def test_orjson_and_stdlib_write_the_same_bytes(indent):
+    orjson_provider = FastJSONProvider(Flask('orjson'), encoder='orjson')
+    stdlib_provider = FastJSONProvider(Flask('stdlib'), encoder='stdlib')
+    assert orjson_provider.encoder == 'orjson'
+    assert orjson_provider.dumps_bytes(PAYLOAD, indent) == stdlib_provider.dumps_bytes(PAYLOAD, indent)
+    assert orjson_provider.dumps(PAYLOAD) == stdlib_provider.dumps(PAYLOAD)
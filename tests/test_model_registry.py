@@ -0,0 +1,44 @@
+# tests/test_model_registry.py
+import os
+
+import pytest
+
+from services.ModelRegistry import InvalidModel
+from services.RacePredictionService import RacePredictionService
+
+
+def test_activate_switches_version(predictor, registry):
+    predictor.activate_model('v2')
+    assert registry.current_version() == 'v2'
+    assert predictor.metadata['version'] == 'v2'
+
+
+@pytest.mark.parametrize('version', ['features', '..', '../models', 'missing'])
+def test_activate_rejects_unlisted_versions(predictor, registry, version):
+    # A directory without an artifact (e.g. another service's state) is not a version
+    os.makedirs(os.path.join(registry.model_dir, 'features'), exist_ok=True)
+    with pytest.raises(ValueError):
+        predictor.activate_model(version)
+    assert registry.current_version() == 'v1'
+    assert predictor.metadata['version'] == 'v1'
+
+
+def test_broken_artifact_is_not_activated(predictor, registry):
+    with open(os.path.join(registry.model_dir, 'v2', 'model.joblib'), 'wb') as f:
+        f.write(b'not a model')
+    with pytest.raises(InvalidModel):
+        predictor.activate_model('v2')
+    assert registry.current_version() == 'v1'
+    # A restart still loads the previous version
+    assert RacePredictionService(registry=registry).metadata['version'] == 'v1'
+
+
+def test_mismatched_metadata_is_not_activated(predictor, registry):
+    path = os.path.join(registry.model_dir, 'v2', 'metadata.json')
+    with open(path) as f:
+        text = f.read()
+    with open(path, 'w') as f:
+        f.write(text.replace('"v2"', '"v1"'))
+    with pytest.raises(InvalidModel):
+        predictor.activate_model('v2')
+    assert registry.current_version() == 'v1'
@@ -0,0 +1,29 @@
+# tests/test_predictions.py
+import pytest
+
+import services.RacePredictionService as prediction_service
+
+
+def scenario(avg_points):
+    return {'drivers': [{'name': 'A', 'avg_points': avg_points, 'recent_form': 0.5, 'team_performance': 0.5, 'wins': 1, 'podiums': 2}]}
+
+
+def test_prediction_cache_evicts_least_recently_used(predictor, monkeypatch):
+    monkeypatch.setattr(prediction_service, 'PREDICTION_CACHE_SIZE', 2)
+    predictor.predict_scenarios([scenario(1.0)])
+    predictor.predict_scenarios([scenario(2.0)])
+    # A hit makes 1.0 the most recently used, so 2.0 is evicted next
+    predictor.predict_scenarios([scenario(1.0)])
+    predictor.predict_scenarios([scenario(3.0)])
+
+    hits = predictor.cache_stats['hits']
+    predictor.predict_scenarios([scenario(1.0)])
+    assert predictor.cache_stats['hits'] == hits + 1
+    predictor.predict_scenarios([scenario(2.0)])
+    assert predictor.cache_stats['hits'] == hits + 1
+
+
+@pytest.mark.parametrize('drivers', [[{'name': 'A', 'avg_points': {}}], [['not', 'a', 'dict']], [{'name': 'A'}]])
+def test_invalid_driver_data_is_a_value_error(predictor, drivers):
+    with pytest.raises(ValueError):
+        predictor.predict_scenarios([{'drivers': drivers}])
@@ -0,0 +1,74 @@
+# tests/test_upstream_health.py
+import pytest
+import requests
+
+from services.DataProcessor import DataProcessor
+from services.UpstreamHealth import CircuitBreaker, UpstreamUnavailable
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, timeout=None):
+        return self.response
+
+
+def processor(response, breaker):
+    data_processor = DataProcessor(cache=object(), breaker=breaker, results_store=object())
+    data_processor.session = FakeSession(response)
+    return data_processor
+
+
+def test_throttling_is_a_failure_that_honours_retry_after():
+    breaker = CircuitBreaker(cooldown=30)
+    data_processor = processor(FakeResponse(429, {'Retry-After': '120'}), breaker)
+
+    with pytest.raises(requests.HTTPError):
+        data_processor._fetch(data_processor.ergast_base_url + '/2024/results.json')
+
+    status = breaker.get_status()
+    assert status['state'] == CircuitBreaker.OPEN
+    assert status['successes'] == 0 and status['failures'] == 1
+    assert 119 <= status['retryIn'] <= 120
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_request(data_processor.ergast_base_url + '/2024/drivers.json')
+
+
+@pytest.mark.parametrize('status_code', [403, 400])
+def test_client_errors_other_than_404_are_failures(status_code):
+    breaker = CircuitBreaker()
+    data_processor = processor(FakeResponse(status_code), breaker)
+
+    with pytest.raises(requests.HTTPError):
+        data_processor._fetch(data_processor.ergast_base_url + '/2024/drivers.json')
+    assert breaker.get_status()['failures'] == 1
+
+
+def test_404_is_negatively_cached_without_a_failure():
+    breaker = CircuitBreaker()
+    data_processor = processor(FakeResponse(404), breaker)
+    url = data_processor.ergast_base_url + '/2024/drivers/nobody/results.json'
+
+    assert data_processor._fetch(url) is None
+    assert breaker.get_status()['failures'] == 0
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_request(url)
+
+
+def test_expired_failed_urls_are_pruned(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.UpstreamHealth.time.time', lambda: now[0])
+    breaker = CircuitBreaker(negative_ttl=20)
+    for i in range(100):
+        breaker.record_not_found(f'/missing/{i}')
+
+    now[0] += 21
+    breaker.record_not_found('/missing/last')
+    assert list(breaker._failed_urls) == ['/missing/last']